@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
-import argparse, os, sys, json, datetime as dt
+import argparse, os, sys, json, datetime as dt, warnings
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, List, Tuple, Optional
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+import numpy as np
 import requests
 
 QUESTIONS = [f"q{i}" for i in range(1, 11)]
@@ -14,51 +17,85 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--token", default=os.getenv("API_TOKEN"),
                    help="Token DRF. También puedes ponerlo en env API_TOKEN")
     p.add_argument("--path", default="/api/feedback/",
-                   help="Path del endpoint. Por defecto /api/feedback/")
+                   help="Path del endpoint. Por defecto /api/feedback/ (solo las "
+                        "encuestas propias); con token de staff usa "
+                        "'/api/feedback/staff/?format=ndjson' para todas")
     p.add_argument("--start-date", help="Fecha mínima (ISO, ej. 2025-08-01)")
     p.add_argument("--end-date", help="Fecha máxima (ISO, ej. 2025-08-31)")
     p.add_argument("--output-csv", help="Ruta CSV de salida opcional")
+    p.add_argument("--server-stats", action="store_true",
+                   help="Pide las estadísticas ya calculadas a "
+                        "/api/feedback/staff/ratings/ (requiere token de staff) "
+                        "en lugar de descargar todas las encuestas")
+    p.add_argument("--survey-version", help="Versión de encuesta (solo con --server-stats)")
+    p.add_argument("--percentiles", default="25,50,75,90",
+                   help="Percentiles a calcular, separados por comas")
+    p.add_argument("--workers", type=int, default=8,
+                   help="Páginas descargadas en paralelo cuando se conoce el total")
     return p.parse_args()
 
 def iso_or_none(s: Optional[str]) -> Optional[dt.datetime]:
     if not s: return None
     return dt.datetime.fromisoformat(s.replace("Z", "+00:00"))
 
-def within_range(ts_iso: str, start: Optional[dt.datetime], end: Optional[dt.datetime]) -> bool:
-    ts = iso_or_none(ts_iso)
-    if ts is None: return False
-    if start and ts < start: return False
-    if end and ts > end: return False
-    return True
+def page_urls(next_url: str, page_size: int, count: int) -> List[str]:
+    """URLs de todas las páginas restantes a partir del enlace 'next' de DRF.
+    Devuelve [] si la paginación no es por número de página ni por offset."""
+    parts = urlsplit(next_url)
+    query = dict(parse_qsl(parts.query))
+    if "page" in query:
+        first, key = int(query["page"]), "page"
+        last = -(-count // page_size)  # número de páginas
+        values = range(first, last + 1)
+    elif "offset" in query:
+        first, key = int(query["offset"]), "offset"
+        values = range(first, count, page_size)
+    else:
+        return []
+    return [urlunsplit(parts._replace(query=urlencode({**query, key: v})))
+            for v in values]
 
-def fetch_all(base_url: str, path: str, headers: Dict[str, str]) -> List[Dict[str, Any]]:
-    """Tolera lista directa o paginación DRF (results/next)."""
+def fetch_all(base_url: str, path: str, headers: Dict[str, str],
+              workers: int = 8) -> List[Dict[str, Any]]:
+    """Tolera lista directa o paginación DRF (results/next). Si la respuesta
+    trae 'count', el resto de páginas se descarga en paralelo."""
     url = base_url.rstrip("/") + path
-    out: List[Dict[str, Any]] = []
+    session = requests.Session()
+    session.headers.update(headers)
 
-    r = requests.get(url, headers=headers, timeout=30)
-    r.raise_for_status()
-    data = r.json()
+    def get(u: str) -> Any:
+        r = session.get(u, timeout=30)
+        r.raise_for_status()
+        return r.json()
 
+    with session.get(url, timeout=30, stream=True) as r:
+        r.raise_for_status()
+        if r.headers.get("Content-Type", "").startswith("application/x-ndjson"):
+            # Todo en una respuesta en streaming: un objeto JSON por línea
+            return [json.loads(line) for line in r.iter_lines() if line]
+        data = r.json()
     if isinstance(data, list):
         return data
+    if not isinstance(data, dict) or not isinstance(data.get("results"), list):
+        raise ValueError("Respuesta inesperada: no es lista ni paginada con 'results'.")
+
+    out: List[Dict[str, Any]] = list(data["results"])
+    next_url = data.get("next")
+    urls = (page_urls(next_url, len(out), data["count"])
+            if next_url and out and isinstance(data.get("count"), int) else [])
 
-    # DRF paginated
-    if isinstance(data, dict):
-        while True:
-            results = data.get("results", [])
-            if not isinstance(results, list):
-                raise ValueError("Respuesta inesperada: no es lista ni paginada con 'results'.")
-            out.extend(results)
-            next_url = data.get("next")
-            if not next_url:
-                break
-            r = requests.get(next_url, headers=headers, timeout=30)
-            r.raise_for_status()
-            data = r.json()
+    if urls:
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+            for page in pool.map(get, urls):  # map conserva el orden
+                out.extend(page.get("results", []))
         return out
 
-    raise ValueError("Formato de respuesta no reconocido.")
+    # Sin total conocido: seguir los enlaces 'next' en serie
+    while next_url:
+        data = get(next_url)
+        out.extend(data.get("results", []))
+        next_url = data.get("next")
+    return out
 
 def coerce_survey(surv: Any) -> Dict[str, Any]:
     if isinstance(surv, dict):
@@ -70,68 +107,155 @@ def coerce_survey(surv: Any) -> Dict[str, Any]:
             return {}
     return {}
 
-def aggregate(rows: List[Dict[str, Any]],
-              start: Optional[dt.datetime],
-              end: Optional[dt.datetime]) -> Tuple[Dict[str, Dict[str, float]], int]:
-    # Acumuladores por pregunta
-    sums = {q: 0.0 for q in QUESTIONS}
-    counts = {q: 0 for q in QUESTIONS}
-    mins = {q: float("inf") for q in QUESTIONS}
-    maxs = {q: float("-inf") for q in QUESTIONS}
-    used = 0
+def to_number(val: Any) -> float:
+    if val is None or isinstance(val, bool):
+        return np.nan
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return np.nan
 
+def ratings_matrix(rows: List[Dict[str, Any]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Matriz respuestas x preguntas (NaN si falta) y la fecha de cada fila
+    como timestamp (NaN si no se puede leer). Solo se incluyen las
+    encuestas con 'rating_items'."""
+    values, times = [], []
     for item in rows:
-        completed_at = item.get("completed_at")
-        if (start or end) and not within_range(completed_at or "", start, end):
-            continue
-
-        survey = coerce_survey(item.get("survey"))
-        ratings = survey.get("rating_items", {}) if isinstance(survey, dict) else {}
+        ratings = coerce_survey(item.get("survey")).get("rating_items")
         if not isinstance(ratings, dict):
             continue
+        values.append([to_number(ratings.get(q)) for q in QUESTIONS])
+        ts = iso_or_none(item.get("completed_at"))
+        times.append(ts.timestamp() if ts else np.nan)
+    matrix = np.array(values, dtype=float).reshape(len(values), len(QUESTIONS))
+    return matrix, np.array(times, dtype=float)
 
-        used += 1
-        for q in QUESTIONS:
-            val = ratings.get(q)
-            if val is None:  # tolerar ausencias
-                continue
-            try:
-                x = float(val)
-            except Exception:
-                continue
-            sums[q] += x
-            counts[q] += 1
-            mins[q] = min(mins[q], x)
-            maxs[q] = max(maxs[q], x)
+def aggregate(rows: List[Dict[str, Any]],
+              start: Optional[dt.datetime],
+              end: Optional[dt.datetime],
+              percentiles: List[float] = (25, 50, 75, 90)) -> Tuple[Dict[str, Dict[str, Any]], int]:
+    matrix, times = ratings_matrix(rows)
+    if start or end:
+        keep = ~np.isnan(times)
+        if start: keep &= times >= start.timestamp()
+        if end: keep &= times <= end.timestamp()
+        matrix = matrix[keep]
+    used = matrix.shape[0]
+
+    present = ~np.isnan(matrix)
+    n = present.sum(axis=0)
+    with warnings.catch_warnings():  # columnas sin datos dan NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        avg = np.nanmean(matrix, axis=0)
+        mn = np.nanmin(matrix, axis=0) if used else np.full(len(QUESTIONS), np.nan)
+        mx = np.nanmax(matrix, axis=0) if used else np.full(len(QUESTIONS), np.nan)
+        med = np.nanmedian(matrix, axis=0)
+        pct = (np.nanpercentile(matrix, percentiles, axis=0) if used
+               else np.full((len(percentiles), len(QUESTIONS)), np.nan))
+
+    # Histograma con un bin por valor entero, común a todas las preguntas
+    if present.any():
+        lo, hi = np.floor(np.nanmin(matrix)), np.ceil(np.nanmax(matrix))
+        edges = np.arange(lo, hi + 2) - 0.5
+    else:
+        edges = np.array([])
 
     stats = {}
-    for q in QUESTIONS:
-        n = counts[q]
-        avg = (sums[q] / n) if n > 0 else float("nan")
-        mn = mins[q] if mins[q] != float("inf") else float("nan")
-        mx = maxs[q] if maxs[q] != float("-inf") else float("nan")
-        stats[q] = {"n": n, "avg": avg, "min": mn, "max": mx}
+    for j, q in enumerate(QUESTIONS):
+        hist = (np.histogram(matrix[present[:, j], j], bins=edges)[0]
+                if edges.size else np.array([], dtype=int))
+        stats[q] = {
+            "n": int(n[j]), "avg": float(avg[j]), "min": float(mn[j]),
+            "max": float(mx[j]), "median": float(med[j]),
+            "percentiles": {f"p{p:g}": float(v) for p, v in zip(percentiles, pct[:, j])},
+            "histogram": {f"{edge + 0.5:g}": int(c) for edge, c in zip(edges, hist)},
+        }
     return stats, used
 
-def print_table(stats: Dict[str, Dict[str, float]], used: int, total: int) -> None:
+def exclusive_end(s: Optional[str]) -> Optional[str]:
+    """--end-date es inclusivo; el endpoint espera un fin exclusivo."""
+    if not s: return None
+    if len(s) == 10:  # solo fecha: hasta el final de ese día
+        return (dt.date.fromisoformat(s) + dt.timedelta(days=1)).isoformat()
+    return s
+
+def fetch_server_stats(args: argparse.Namespace, headers: Dict[str, str]) -> Dict[str, Any]:
+    """Estadísticas calculadas en Postgres; la respuesta ocupa unos cientos de bytes."""
+    params = {"percentiles": args.percentiles}
+    if args.start_date: params["from"] = args.start_date
+    if args.end_date: params["to"] = exclusive_end(args.end_date)
+    if args.survey_version: params["version"] = args.survey_version
+    url = args.base_url.rstrip("/") + "/api/feedback/staff/ratings/"
+    r = requests.get(url, headers=headers, params=params, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+def print_server_table(data: Dict[str, Any]) -> None:
+    questions = data.get("questions", {})
+    pcts = list(next(iter(questions.values()))["percentiles"]) if questions else []
+    print(f"\nEncuestas consideradas: {data.get('responses', 0)}\n")
+    header = f"{'Pregunta':<8} {'N':>5} {'Promedio':>10} {'Mín':>6} {'Máx':>6} {'Desv.':>8}"
+    header += "".join(f" {p:>6}" for p in pcts)
+    print(header)
+    print("-" * len(header))
+    for q, s in questions.items():
+        std = f"{s['stddev']:.3f}" if s["stddev"] is not None else "NA"
+        line = f"{q:<8} {s['count']:>5} {s['mean']:>10.3f} {s['min']:>6g} {s['max']:>6g} {std:>8}"
+        line += "".join(f" {v:>6.2f}" for v in s["percentiles"].values())
+        print(line)
+
+def save_server_csv(data: Dict[str, Any], path: str) -> None:
+    import csv
+    questions = data.get("questions", {})
+    pcts = list(next(iter(questions.values()))["percentiles"]) if questions else []
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        w = csv.writer(f)
+        w.writerow(["question", "n", "avg", "min", "max", "stddev", *pcts])
+        for q, s in questions.items():
+            w.writerow([q, s["count"], f"{s['mean']:.6f}", s["min"], s["max"],
+                        "" if s["stddev"] is None else f"{s['stddev']:.6f}",
+                        *s["percentiles"].values()])
+    print(f"\nCSV escrito en: {path}")
+
+def print_table(stats: Dict[str, Dict[str, Any]], used: int, total: int) -> None:
+    pcts = list(stats[QUESTIONS[0]]["percentiles"])
     print(f"\nEncuestas consideradas: {used} de {total}\n")
-    print(f"{'Pregunta':<6} {'N':>5} {'Promedio':>10} {'Mín':>8} {'Máx':>8}")
-    print("-" * 42)
+    header = f"{'Pregunta':<6} {'N':>5} {'Promedio':>10} {'Mín':>8} {'Máx':>8} {'Mediana':>8}"
+    header += "".join(f" {p:>6}" for p in pcts)
+    print(header)
+    print("-" * len(header))
     for q in QUESTIONS:
         s = stats[q]
         avg = f"{s['avg']:.3f}" if s['n'] > 0 else "NA"
         mn  = f"{s['min']:.0f}" if s['n'] > 0 else "NA"
         mx  = f"{s['max']:.0f}" if s['n'] > 0 else "NA"
-        print(f"{q:<6} {s['n']:>5} {avg:>10} {mn:>8} {mx:>8}")
+        med = f"{s['median']:.1f}" if s['n'] > 0 else "NA"
+        line = f"{q:<6} {s['n']:>5} {avg:>10} {mn:>8} {mx:>8} {med:>8}"
+        line += "".join(f" {v:>6.2f}" if s['n'] > 0 else f" {'NA':>6}"
+                        for v in s["percentiles"].values())
+        print(line)
+
+    bins = list(stats[QUESTIONS[0]]["histogram"])
+    if bins:
+        print(f"\nHistograma\n{'Pregunta':<6}" + "".join(f" {b:>6}" for b in bins))
+        for q in QUESTIONS:
+            print(f"{q:<6}" + "".join(f" {c:>6}" for c in stats[q]["histogram"].values()))
 
-def save_csv(stats: Dict[str, Dict[str, float]], path: str) -> None:
+def save_csv(stats: Dict[str, Dict[str, Any]], path: str) -> None:
     import csv
+    pcts = list(stats[QUESTIONS[0]]["percentiles"])
+    bins = list(stats[QUESTIONS[0]]["histogram"])
     with open(path, "w", newline="", encoding="utf-8") as f:
         w = csv.writer(f)
-        w.writerow(["question", "n", "avg", "min", "max"])
+        w.writerow(["question", "n", "avg", "min", "max", "median", *pcts,
+                    *(f"count_{b}" for b in bins)])
         for q in QUESTIONS:
             s = stats[q]
-            w.writerow([q, s["n"], f"{s['avg']:.6f}" if s["n"]>0 else "", s["min"] if s["n"]>0 else "", s["max"] if s["n"]>0 else ""])
+            ok = s["n"] > 0
+            w.writerow([q, s["n"], f"{s['avg']:.6f}" if ok else "", s["min"] if ok else "",
+                        s["max"] if ok else "", s["median"] if ok else "",
+                        *(v if ok else "" for v in s["percentiles"].values()),
+                        *s["histogram"].values()])
     print(f"\nCSV escrito en: {path}")
 
 def main():
@@ -141,8 +265,20 @@ def main():
         sys.exit(1)
 
     headers = {"Authorization": f"Token {args.token}", "Accept": "application/json"}
+
+    if args.server_stats:
+        try:
+            data = fetch_server_stats(args, headers)
+        except requests.HTTPError as e:
+            print(f"HTTP error: {e} (respuesta: {getattr(e.response, 'text', '')[:300]})", file=sys.stderr)
+            sys.exit(2)
+        print_server_table(data)
+        if args.output_csv:
+            save_server_csv(data, args.output_csv)
+        return
+
     try:
-        rows = fetch_all(args.base_url, args.path, headers)
+        rows = fetch_all(args.base_url, args.path, headers, args.workers)
     except requests.HTTPError as e:
         print(f"HTTP error: {e} (respuesta: {getattr(e.response, 'text', '')[:300]})", file=sys.stderr)
         sys.exit(2)
@@ -150,7 +286,8 @@ def main():
     start = iso_or_none(args.start_date)
     end = iso_or_none(args.end_date)
 
-    stats, used = aggregate(rows, start, end)
+    percentiles = [float(p) for p in args.percentiles.split(",") if p.strip()]
+    stats, used = aggregate(rows, start, end, percentiles)
     print_table(stats, used, len(rows))
 
     if args.output_csv:
@@ -0,0 +1,122 @@
+"""
+Time series queries for the analytics API.
+
+Every requested metric is computed by a single SQL statement: one CTE per
+source table aggregates its rows per `date_trunc` bucket, using
+`FILTER` clauses so several metrics share one scan, and a
+`generate_series` of buckets left-joins them so empty buckets read 0.
+
+Buckets are computed on local wall-clock timestamps (`timestamp without
+time zone` in `TIME_ZONE`) so days and weeks keep their length across
+DST changes, and converted back to UTC instants for the response.
+"""
+from datetime import datetime
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.db import connection
+
+from core import models
+
+
+GRANULARITIES = ('hour', 'day', 'week', 'month')
+
+# Source name -> (model, timestamp column)
+SOURCES = {
+    'users': (models.User, 'created_at'),
+    'chats': (models.ChatSession, 'created_at'),
+    'saves': (models.SavedDocument, 'created_at'),
+    'authored': (models.AuthoredDocument, 'created_at'),
+    'surveys': (models.SatisfactionSurveyResponse, 'completed_at'),
+    'documents': (models.Document, 'created_at'),
+}
+
+# Metric name -> (source name, aggregate expression)
+METRICS = {
+    'registered_users': ('users', 'count(*) FILTER (WHERE NOT is_anonymous)'),
+    'anonymous_users': ('users', 'count(*) FILTER (WHERE is_anonymous)'),
+    'chat_sessions': ('chats', 'count(*)'),
+    'chat_users': ('chats', 'count(DISTINCT user_id)'),
+    'saved_documents': ('saves', 'count(*)'),
+    'saving_users': ('saves', 'count(DISTINCT user_id)'),
+    'authored_documents': ('authored', 'count(*)'),
+    'survey_responses': ('surveys', 'count(*)'),
+    'ingested_documents': ('documents', 'count(*)'),
+}
+
+
+def build_metrics_sql(metrics: List[str]) -> str:
+    """
+    Return the SQL computing `metrics` per bucket. It takes the
+    `granularity`, `start`, `end` and `tz` named parameters.
+    """
+    quote = connection.ops.quote_name
+    by_source: Dict[str, List[str]] = {}
+    for metric in metrics:
+        by_source.setdefault(METRICS[metric][0], []).append(metric)
+
+    ctes = [
+        'buckets AS ('
+        'SELECT local AS bucket, local AT TIME ZONE %(tz)s AS starts_at '
+        'FROM generate_series('
+        'date_trunc(%(granularity)s, '
+        '%(start)s::timestamptz AT TIME ZONE %(tz)s), '
+        '(%(end)s::timestamptz AT TIME ZONE %(tz)s) '
+        '- interval \'1 microsecond\', '
+        '(\'1 \' || %(granularity)s)::interval'
+        ') AS local)'
+    ]
+    for source, source_metrics in by_source.items():
+        model, column = SOURCES[source]
+        aggregates = ', '.join(
+            f'{METRICS[metric][1]} AS {quote(metric)}'
+            for metric in source_metrics
+        )
+        ctes.append(
+            f'{source} AS ('
+            f'SELECT date_trunc(%(granularity)s, '
+            f'{quote(column)} AT TIME ZONE %(tz)s) '
+            f'AS bucket, {aggregates} '
+            f'FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(column)} >= %(start)s '
+            f'AND {quote(column)} < %(end)s '
+            f'GROUP BY 1)'
+        )
+
+    columns = ', '.join(
+        f'COALESCE({METRICS[metric][0]}.{quote(metric)}, 0)'
+        for metric in metrics
+    )
+    joins = ' '.join(
+        f'LEFT JOIN {source} USING (bucket)' for source in by_source
+    )
+    return (
+        f'WITH {", ".join(ctes)} '
+        f'SELECT buckets.starts_at, {columns} FROM buckets {joins} '
+        f'ORDER BY buckets.bucket'
+    )
+
+
+def get_metrics(
+        metrics: List[str],
+        start: datetime,
+        end: datetime,
+        granularity: str) -> List[Dict[str, Any]]:
+    """
+    Return one row per `granularity` bucket in `[start, end)` with the
+    value of every metric in `metrics`.
+    """
+    params = {
+        'granularity': granularity,
+        'start': start,
+        'end': end,
+        'tz': settings.TIME_ZONE,
+    }
+    with connection.cursor() as cursor:
+        cursor.execute(build_metrics_sql(metrics), params)
+        rows = cursor.fetchall()
+
+    return [
+        {'bucket': row[0], **dict(zip(metrics, row[1:]))}
+        for row in rows
+    ]
@@ -0,0 +1,100 @@
+"""
+Serializers for the analytics API.
+"""
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from rest_framework import serializers
+
+from analytics.queries import GRANULARITIES, METRICS
+
+
+# Approximate bucket length, used to cap the size of a response
+BUCKET_LENGTH = {
+    'hour': timedelta(hours=1),
+    'day': timedelta(days=1),
+    'week': timedelta(weeks=1),
+    'month': timedelta(days=28),
+}
+
+
+class DateOrDateTimeField(serializers.DateTimeField):
+    """
+    DateTimeField that also accepts plain dates, as midnight.
+    """
+
+    def to_internal_value(self, value):
+        date = parse_date(value) if isinstance(value, str) else None
+        if date is not None:
+            return timezone.make_aware(datetime.combine(date, time.min))
+        return super().to_internal_value(value)
+
+
+class MetricsQuerySerializer(serializers.Serializer):
+    """
+    Serializer for the metrics query parameters.
+    """
+    metrics = serializers.CharField(
+        required=False,
+        help_text='Comma separated metric names (default: all).'
+    )
+    start = DateOrDateTimeField(
+        required=False,
+        help_text='Start of the range, inclusive (default: 30 days ago).'
+    )
+    end = DateOrDateTimeField(
+        required=False,
+        help_text='End of the range, exclusive (default: now).'
+    )
+    granularity = serializers.ChoiceField(
+        choices=GRANULARITIES,
+        default='day'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # `from` and `to` are reserved words in Python, so the fields are
+        # declared as `start` and `end` and renamed; their validated values
+        # keep the declared names.
+        self.fields['from'] = self.fields.pop('start')
+        self.fields['to'] = self.fields.pop('end')
+
+    def validate_metrics(self, value):
+        metrics = list(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()
+        ))
+        unknown = [name for name in metrics if name not in METRICS]
+        if unknown:
+            raise serializers.ValidationError(
+                f'Unknown metrics: {", ".join(unknown)}. '
+                f'Available: {", ".join(METRICS)}.'
+            )
+        return metrics
+
+    def validate(self, attrs):
+        # Default to the end of the current minute, so repeated queries
+        # without `to` share a cache entry.
+        end = attrs.get('end') or timezone.now().replace(
+            second=0,
+            microsecond=0
+        ) + timedelta(minutes=1)
+        start = attrs.get('start') or end - timedelta(days=30)
+
+        if start >= end:
+            raise serializers.ValidationError(
+                {'from': '`from` must be before `to`.'}
+            )
+        buckets = (end - start) / BUCKET_LENGTH[attrs['granularity']]
+        if buckets > settings.ANALYTICS_MAX_BUCKETS:
+            raise serializers.ValidationError({
+                'granularity': 'The range has too many buckets; use a '
+                               'shorter range or a coarser granularity.'
+            })
+
+        attrs['start'] = start
+        attrs['end'] = end
+        attrs['metrics'] = attrs.get('metrics') or list(METRICS)
+        return attrs
@@ -0,0 +1,201 @@
+"""
+Tests for the analytics API.
+"""
+
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import patch
+from zoneinfo import ZoneInfo
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import ChatSession, SavedDocument, User
+
+
+METRICS_URL = reverse('analytics:metrics')
+
+
+def create_user(**params):
+    """
+    Helper function to create a user.
+    """
+    return get_user_model().objects.create_user(**params)
+
+
+def at(day, hour=12):
+    return datetime(2026, 1, day, hour, tzinfo=dt_timezone.utc)
+
+
+class PublicAnalyticsApiTests(TestCase):
+    """
+    Test the analytics API for non-staff users.
+    """
+
+    def test_staff_required(self):
+        """
+        Test regular users cannot read metrics.
+        """
+        client = APIClient()
+        client.force_authenticate(create_user(email='user@example.com'))
+
+        res = client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class StaffAnalyticsApiTests(TestCase):
+    """
+    Test the analytics API for staff users.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.staff = create_user(email='staff@example.com', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(self.staff)
+
+        users = [create_user(is_anonymous=True) for _ in range(2)]
+        User.objects.filter(pk=users[0].pk).update(created_at=at(1))
+        User.objects.filter(pk=users[1].pk).update(created_at=at(3))
+        User.objects.filter(pk=self.staff.pk).update(created_at=at(3))
+
+        for i, (user, day) in enumerate(
+            [(users[0], 1), (users[0], 1), (users[1], 3)]
+        ):
+            ChatSession.objects.create(
+                session_id=str(i),
+                session_name='Session',
+                user=user,
+                assistant_id='assistant',
+            )
+            ChatSession.objects.filter(session_id=str(i)).update(
+                created_at=at(day)
+            )
+        SavedDocument.objects.create(user=users[0], document=None)
+        SavedDocument.objects.update(created_at=at(5))
+
+    def test_daily_metrics_are_gap_filled(self):
+        """
+        Test every day in [from, to) is returned, empty days as zero.
+        """
+        res = self.client.get(METRICS_URL, {
+            'metrics': 'chat_sessions,chat_users,anonymous_users',
+            'from': '2026-01-01',
+            'to': '2026-01-04',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (
+                    row['bucket'].day,
+                    row['chat_sessions'],
+                    row['chat_users'],
+                    row['anonymous_users'],
+                )
+                for row in res.data['results']
+            ],
+            [(1, 2, 1, 1), (2, 0, 0, 0), (3, 1, 1, 1)]
+        )
+
+    def test_range_end_is_exclusive(self):
+        """
+        Test rows at `to` fall outside the range.
+        """
+        res = self.client.get(METRICS_URL, {
+            'metrics': 'chat_sessions',
+            'from': '2026-01-01',
+            'to': at(3).isoformat(),
+        })
+
+        self.assertEqual(
+            [row['chat_sessions'] for row in res.data['results']],
+            [2, 0, 0]
+        )
+
+    def test_monthly_metrics(self):
+        """
+        Test coarser granularities aggregate several days.
+        """
+        res = self.client.get(METRICS_URL, {
+            'from': '2026-01-01',
+            'to': '2026-01-08',
+            'granularity': 'month',
+        })
+
+        self.assertEqual(len(res.data['results']), 1)
+        row = res.data['results'][0]
+        self.assertEqual(row['chat_sessions'], 3)
+        self.assertEqual(row['registered_users'], 1)
+        self.assertEqual(row['anonymous_users'], 2)
+        self.assertEqual(row['saved_documents'], 1)
+
+    def test_results_are_cached_per_range(self):
+        """
+        Test a repeated query is served from the cache.
+        """
+        now = at(10)
+        later = now.replace(second=30)
+
+        for params in ({'from': '2026-01-01', 'to': '2026-01-04'}, {}):
+            with patch('django.utils.timezone.now', return_value=now):
+                self.client.get(METRICS_URL, params)
+
+            with patch('django.utils.timezone.now', return_value=later), \
+                    self.assertNumQueries(0):
+                res = self.client.get(METRICS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_invalid_queries(self):
+        """
+        Test unknown metrics, inverted ranges and oversized ranges fail.
+        """
+        for params in (
+            {'metrics': 'unknown'},
+            {'from': '2026-01-05', 'to': '2026-01-01'},
+            {'from': '2000-01-01', 'to': '2026-01-01', 'granularity': 'hour'},
+        ):
+            res = self.client.get(METRICS_URL, params)
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(TIME_ZONE='America/New_York')
+    def test_daily_buckets_across_dst(self):
+        """
+        Test daily buckets follow local midnight across a DST change.
+        """
+        tz = ZoneInfo('America/New_York')
+        ChatSession.objects.all().delete()
+        for day in (7, 8, 9):
+            ChatSession.objects.create(
+                session_id=f'dst-{day}',
+                session_name='Session',
+                assistant_id='assistant',
+            )
+            ChatSession.objects.filter(session_id=f'dst-{day}').update(
+                created_at=datetime(2026, 3, day, 0, 30, tzinfo=tz)
+            )
+
+        res = self.client.get(METRICS_URL, {
+            'metrics': 'chat_sessions',
+            'from': '2026-03-07',
+            'to': '2026-03-10',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [
+                (row['bucket'], row['chat_sessions'])
+                for row in res.data['results']
+            ],
+            [
+                (datetime(2026, 3, day, tzinfo=tz), 1)
+                for day in (7, 8, 9)
+            ]
+        )
@@ -0,0 +1,14 @@
+"""
+URL mappings for the analytics API.
+"""
+
+from django.urls import path
+
+from analytics import views
+
+
+app_name = 'analytics'
+
+urlpatterns = [
+    path('metrics/', views.MetricsView.as_view(), name='metrics'),
+]
@@ -0,0 +1,68 @@
+"""
+Views for the analytics API.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+
+from analytics.queries import get_metrics
+from analytics.serializers import MetricsQuerySerializer
+
+
+class MetricsView(APIView):
+    """
+    Return product metrics per time bucket, for staff users.
+
+    Query parameters:
+    - metrics: comma separated metric names (default: all)
+    - from: start of the range, inclusive (default: 30 days before `to`)
+    - to: end of the range, exclusive (default: now)
+    - granularity: hour, day, week or month (default: day)
+    """
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        serializer = MetricsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+
+        key = 'analytics:metrics:' + hashlib.md5(repr((
+            query['metrics'],
+            query['start'].isoformat(),
+            query['end'].isoformat(),
+            query['granularity'],
+        )).encode()).hexdigest()
+
+        data = cache.get(key)
+        if data is None:
+            data = {
+                'from': query['start'],
+                'to': query['end'],
+                'granularity': query['granularity'],
+                'metrics': query['metrics'],
+                'computed_at': timezone.now(),
+                'results': get_metrics(
+                    query['metrics'],
+                    query['start'],
+                    query['end'],
+                    query['granularity'],
+                ),
+            }
+            cache.set(key, data, settings.ANALYTICS_CACHE_TTL)
+
+        return Response(data)
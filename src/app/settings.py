@@ -144,7 +144,8 @@ AUTH_USER_MODEL = 'core.User'
 REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
+        'core.authentication.CachedTokenAuthentication',
+        'core.authentication.SignedTokenAuthentication',
     ),
 }
 
@@ -152,5 +153,44 @@ CORS_ALLOWED_ORIGINS = [
     'http://localhost:4200',
 ]
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+if os.environ.get('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.environ.get('REDIS_URL'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Seconds an API token -> user lookup is served from the cache
+AUTH_TOKEN_CACHE_TTL = int(os.environ.get('AUTH_TOKEN_CACHE_TTL', 60))
+
+# Admin dashboard statistics are fresh for STATS_CACHE_TTL seconds, then
+# served stale for up to STATS_CACHE_STALE_TTL more while they refresh
+STATS_CACHE_TTL = int(os.environ.get('STATS_CACHE_TTL', 5 * 60))
+STATS_CACHE_STALE_TTL = int(
+    os.environ.get('STATS_CACHE_STALE_TTL', 60 * 60)
+)
+
+# Analytics API: cache lifetime (seconds) and maximum buckets per response
+ANALYTICS_CACHE_TTL = int(os.environ.get('ANALYTICS_CACHE_TTL', 5 * 60))
+ANALYTICS_MAX_BUCKETS = int(os.environ.get('ANALYTICS_MAX_BUCKETS', 1000))
+
+# Lifetimes (seconds) of the signed access and refresh tokens
+SIGNED_ACCESS_TOKEN_TTL = int(
+    os.environ.get('SIGNED_ACCESS_TOKEN_TTL', 5 * 60)
+)
+SIGNED_REFRESH_TOKEN_TTL = int(
+    os.environ.get('SIGNED_REFRESH_TOKEN_TTL', 30 * 24 * 60 * 60)
+)
+
 STATSD_HOST = 'statsd'
 STATSD_PORT = 8125
@@ -41,4 +41,5 @@ urlpatterns = [
     path('api/chat/', include('chat.urls')),
     path('api/feedback/', include('feedback.urls')),
     path('api/recommender/', include('recommender.urls')),
+    path('api/analytics/', include('analytics.urls')),
 ]
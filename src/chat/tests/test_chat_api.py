@@ -12,6 +12,7 @@ from rest_framework.test import APIClient
 from rest_framework import status
 
 from core.models import ChatSession
+from core.tests.utils import QueryBudgetMixin
 
 from chat.serializers import (
     ChatSessionSerializer,
@@ -57,7 +58,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PrivateChatApiTests(TestCase):
+class PrivateChatApiTests(QueryBudgetMixin, TestCase):
     """
     Test the private features of the chat API (authenticated).
     """
@@ -95,6 +96,16 @@ class PrivateChatApiTests(TestCase):
         self.assertEqual(len(response.data), 2)
         self.assertEqual(response.data, serializer.data)
 
+    def test_list_chat_sessions_query_count(self):
+        """
+        Test listing chat sessions runs one query regardless of row count.
+        """
+        self.assertConstantQueries(
+            lambda i: create_chat_session(user=self.user, session_id=str(i)),
+            lambda: self.client.get(CHAT_SESSION_URL),
+            budget=1,
+        )
+
     @patch('chat.views.RAGFlowService')
     def test_retrieve_chat_session(self, MockRagFlowService):
         """
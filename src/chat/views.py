@@ -8,8 +8,12 @@ from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
-from rest_framework import authentication, permissions
+from rest_framework import permissions
 
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from core.models import ChatSession
 from core.services.ragflow_service import RAGFlowService
 
@@ -93,7 +97,10 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
     Manage chat sessions in the database.
     """
     serializer_class = serializers.ChatSessionSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
     http_method_names = ['get', 'post', 'delete']
     queryset = ChatSession.objects.all()
@@ -22,6 +22,7 @@ from core.statistics import (
     get_user_activity_status_stats,
     get_chats_over_time_stats,
 )
+from core.stats_cache import get_cached_stats
 from core.export_stats import (
     export_user_field_of_study_csv,
     export_user_education_level_csv,
@@ -30,9 +31,22 @@ from core.export_stats import (
     export_most_consulted_authors_csv,
     export_document_keywords_csv,
     export_chats_over_time_csv,
+    export_saved_documents_csv,
+    export_chat_sessions_csv,
 )
 
 
+def add_stats_context(
+        extra_context: Dict[str, Any], name: str, stats_func) -> None:
+    """
+    Add the cached result of `stats_func` as JSON under `name`, and the
+    time it was computed under `<name>_computed_at`.
+    """
+    data, computed_at = get_cached_stats(stats_func)
+    extra_context[name] = json.dumps(data)
+    extra_context[f'{name}_computed_at'] = computed_at
+
+
 class UserAdmin(BaseUserAdmin):
     """
     Define the admin pages for users.
@@ -52,7 +66,10 @@ class UserAdmin(BaseUserAdmin):
                 )
             }
         ),
-        (_('Important dates'), {'fields': ('last_login',)}),
+        (
+            _('Important dates'),
+            {'fields': ('last_login', 'created_at')}
+        ),
         (_('Personal info'), {'fields': ('name', 'first_name', 'last_name')}),
         (
             _('Education info'),
@@ -64,7 +81,7 @@ class UserAdmin(BaseUserAdmin):
             }
         ),
     )
-    readonly_fields = ['last_login']
+    readonly_fields = ['last_login', 'created_at']
     add_fieldsets = (
         (None, {
             'classes': ('wide',),
@@ -88,12 +105,21 @@ class UserAdmin(BaseUserAdmin):
         the admin template context.
         """
         extra_context = extra_context or {}
-        extra_context['user_stats_data'] = json.dumps(
-            get_user_field_of_study_stats())
-        extra_context['user_edu_level_data'] = json.dumps(
-            get_user_education_level_stats())
-        extra_context['user_activity_status_data'] = json.dumps(
-            get_user_activity_status_stats())
+        add_stats_context(
+            extra_context,
+            'user_stats_data',
+            get_user_field_of_study_stats
+        )
+        add_stats_context(
+            extra_context,
+            'user_edu_level_data',
+            get_user_education_level_stats
+        )
+        add_stats_context(
+            extra_context,
+            'user_activity_status_data',
+            get_user_activity_status_stats
+        )
         return super().changelist_view(request, extra_context=extra_context)
 
     def get_urls(self) -> list[URLPattern]:
@@ -154,8 +180,11 @@ class DocumentAdmin(admin.ModelAdmin):
         the admin template context.
         """
         extra_context = extra_context or {}
-        extra_context['document_keywords_data'] = json.dumps(
-            get_document_keywords_stats())
+        add_stats_context(
+            extra_context,
+            'document_keywords_data',
+            get_document_keywords_stats
+        )
         return super().changelist_view(request, extra_context)
 
     def get_urls(self) -> list[URLPattern]:
@@ -196,8 +225,11 @@ class AuthoredDocumentAdmin(admin.ModelAdmin):
         the admin template context.
         """
         extra_context = extra_context or {}
-        extra_context['author_stats_data'] = json.dumps(
-            get_most_consulted_authors_stats())
+        add_stats_context(
+            extra_context,
+            'author_stats_data',
+            get_most_consulted_authors_stats
+        )
         return super().changelist_view(request, extra_context)
 
     def get_urls(self) -> list[URLPattern]:
@@ -238,8 +270,11 @@ class SavedDocumentAdmin(admin.ModelAdmin):
         the admin template context.
         """
         extra_context = extra_context or {}
-        extra_context['document_stats_data'] = json.dumps(
-            get_most_consulted_documents_stats())
+        add_stats_context(
+            extra_context,
+            'document_stats_data',
+            get_most_consulted_documents_stats
+        )
         return super().changelist_view(request, extra_context=extra_context)
 
     def get_urls(self) -> list[URLPattern]:
@@ -251,6 +286,9 @@ class SavedDocumentAdmin(admin.ModelAdmin):
             path('export-documents-csv/', self.admin_site.admin_view(
                 export_most_consulted_documents_csv),
                 name='most_consulted_documents_stats_export'),
+            path('export-saved-documents-csv/', self.admin_site.admin_view(
+                export_saved_documents_csv),
+                name='saved_documents_export'),
         ]
         return custom_urls + urls
 
@@ -281,8 +319,11 @@ class ChatSessionAdmin(admin.ModelAdmin):
         the admin template context.
         """
         extra_context = extra_context or {}
-        extra_context['sessions_by_day'] = json.dumps(
-            get_chats_over_time_stats())
+        add_stats_context(
+            extra_context,
+            'sessions_by_day',
+            get_chats_over_time_stats
+        )
         return super().changelist_view(request, extra_context=extra_context)
 
     def get_urls(self) -> list[URLPattern]:
@@ -294,13 +335,36 @@ class ChatSessionAdmin(admin.ModelAdmin):
             path('export-chats-csv/', self.admin_site.admin_view(
                 export_chats_over_time_csv),
                 name='chats_over_time_stats_export'),
+            path('export-chat-sessions-csv/', self.admin_site.admin_view(
+                export_chat_sessions_csv),
+                name='chat_sessions_export'),
         ]
         return custom_urls + urls
 
 
+class IngestRunAdmin(admin.ModelAdmin):
+    """
+    Define the admin pages for ingest runs.
+    """
+    ordering = ['-started_at']
+    list_display = [
+        'started_at',
+        'mode',
+        'status',
+        'watermark',
+        'items_seen',
+        'documents_created',
+        'documents_updated',
+        'errors',
+    ]
+    list_filter = ['mode', 'status']
+    readonly_fields = [field.name for field in models.IngestRun._meta.fields]
+
+
 admin.site.register(models.User, UserAdmin)
 admin.site.register(models.FieldOfStudy)
 admin.site.register(models.Document, DocumentAdmin)
 admin.site.register(models.AuthoredDocument, AuthoredDocumentAdmin)
 admin.site.register(models.SavedDocument, SavedDocumentAdmin)
 admin.site.register(models.ChatSession, ChatSessionAdmin)
+admin.site.register(models.IngestRun, IngestRunAdmin)
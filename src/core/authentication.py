@@ -0,0 +1,164 @@
+"""
+Authentication backends for the API.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core import signing
+from django.core.cache import cache
+
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication,
+    TokenAuthentication,
+    get_authorization_header,
+)
+
+
+ACCESS_TOKEN_SALT = 'core.authentication.access'
+REFRESH_TOKEN_SALT = 'core.authentication.refresh'
+
+
+def token_cache_key(key: str) -> str:
+    """
+    Return the cache key holding the (user, token) pair for a token key.
+    """
+    return f'auth-token:{key}'
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication that keeps the token -> user lookup in the shared
+    cache for `AUTH_TOKEN_CACHE_TTL` seconds.
+
+    Entries are dropped as soon as the token is deleted or its user is
+    saved (see `core.signals`), so deactivations apply immediately.
+    """
+
+    def authenticate_credentials(self, key):
+        """
+        Return the (user, token) pair for `key`, from cache when possible.
+        """
+        cache_key = token_cache_key(key)
+        credentials = cache.get(cache_key)
+        if credentials is not None:
+            return credentials
+
+        credentials = super().authenticate_credentials(key)
+        cache.set(cache_key, credentials, settings.AUTH_TOKEN_CACHE_TTL)
+        return credentials
+
+
+def create_access_token(user) -> str:
+    """
+    Return a signed, short-lived access token carrying the user's id and
+    the flags permission checks need.
+    """
+    claims = {
+        'uid': user.pk,
+        'anonymous': user.is_anonymous,
+        'staff': user.is_staff,
+        'superuser': user.is_superuser,
+        'author': user.is_author,
+    }
+    return signing.dumps(claims, salt=ACCESS_TOKEN_SALT, compress=True)
+
+
+def create_refresh_token(user) -> str:
+    """
+    Return a signed, long-lived refresh token for the user.
+
+    It embeds the session auth hash, so changing the password revokes it.
+    """
+    claims = {'uid': user.pk, 'hash': user.get_session_auth_hash()}
+    return signing.dumps(claims, salt=REFRESH_TOKEN_SALT)
+
+
+def create_token_pair(user) -> dict:
+    """
+    Return the signed token response for the user.
+    """
+    return {
+        'access': create_access_token(user),
+        'refresh': create_refresh_token(user),
+        'token_type': SignedTokenAuthentication.keyword,
+        'expires_in': settings.SIGNED_ACCESS_TOKEN_TTL,
+    }
+
+
+def get_refresh_token_user(refresh_token: str):
+    """
+    Return the active user a refresh token was issued to, or None when
+    the token is invalid, expired or revoked.
+    """
+    try:
+        claims = signing.loads(
+            refresh_token,
+            salt=REFRESH_TOKEN_SALT,
+            max_age=settings.SIGNED_REFRESH_TOKEN_TTL,
+        )
+    except signing.BadSignature:
+        return None
+
+    user = get_user_model().objects.filter(
+        pk=claims['uid'],
+        is_active=True
+    ).first()
+
+    if user is None or user.get_session_auth_hash() != claims['hash']:
+        return None
+
+    return user
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    Stateless authentication with signed access tokens.
+
+    Clients send `Authorization: Bearer <access token>`. The token is
+    verified with the secret key alone; no database or cache lookup is
+    made. `request.user` is an unsaved user built from the token claims,
+    so views needing the full user row must load it themselves.
+    """
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+
+        if len(auth) != 2:
+            msg = 'Invalid token header.'
+            raise exceptions.AuthenticationFailed(msg)
+
+        try:
+            claims = signing.loads(
+                auth[1].decode(),
+                salt=ACCESS_TOKEN_SALT,
+                max_age=settings.SIGNED_ACCESS_TOKEN_TTL,
+            )
+        except signing.SignatureExpired:
+            raise exceptions.AuthenticationFailed('Token has expired.')
+        except (signing.BadSignature, UnicodeError):
+            raise exceptions.AuthenticationFailed('Invalid token.')
+
+        return self.get_user(claims), claims
+
+    def get_user(self, claims):
+        """
+        Build the request user from the token claims.
+        """
+        user = get_user_model()(
+            pk=claims['uid'],
+            is_active=True,
+            is_anonymous=claims['anonymous'],
+            is_staff=claims['staff'],
+            is_superuser=claims['superuser'],
+            is_author=claims['author'],
+        )
+        user._state.adding = False
+        return user
+
+    def authenticate_header(self, request):
+        return self.keyword
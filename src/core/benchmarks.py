@@ -0,0 +1,336 @@
+"""
+Benchmarks for the hot paths of the application.
+
+Every benchmark builds its own fixtures inside a transaction that is
+rolled back at the end, so running one never leaves data behind.
+"""
+
+import io
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.utils import timezone
+
+from rest_framework.renderers import JSONRenderer
+
+from core import models
+from core.renderers import ORJSONRenderer
+
+
+BENCHMARKS: Dict[str, Callable[..., List[Dict[str, Any]]]] = {}
+
+
+def benchmark(name: str, default_rows: int):
+    """
+    Register a benchmark under `name`.
+    """
+    def decorator(func):
+        func.default_rows = default_rows
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+@contextmanager
+def rolled_back():
+    """
+    Run the block in a transaction that is always rolled back.
+    """
+    with transaction.atomic():
+        yield
+        transaction.set_rollback(True)
+
+
+def shadow_table(cursor, model, indexes: bool = True) -> None:
+    """
+    Shadow the table of `model` with an empty temporary copy until the
+    transaction ends. Temporary tables come first in the search path, so
+    the ORM reads and writes the copy and the real table is never locked.
+    Without `indexes`, the copy only gets a primary key.
+    """
+    table = connection.ops.quote_name(model._meta.db_table)
+    including = 'INCLUDING ALL' if indexes else (
+        'INCLUDING ALL EXCLUDING INDEXES'
+    )
+    cursor.execute(
+        f'CREATE TEMPORARY TABLE {table} (LIKE {table} {including}) '
+        'ON COMMIT DROP'
+    )
+    if not indexes:
+        cursor.execute(
+            f'ALTER TABLE {table} ADD PRIMARY KEY '
+            f'({connection.ops.quote_name(model._meta.pk.column)})'
+        )
+
+
+def best_of(func: Callable[[], Any], repeat: int) -> float:
+    """
+    Return the fastest wall time of `repeat` calls to `func`, in seconds.
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def result(
+        label: str,
+        rows: int,
+        seconds: float,
+        size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Build a result row, with the size in bytes of the output if any.
+    """
+    return {
+        'label': label,
+        'rows': rows,
+        'seconds': seconds,
+        'rows_per_second': rows / seconds if seconds else float('inf'),
+        'size': size,
+    }
+
+
+@benchmark('serializers', default_rows=10_000)
+def serializers_benchmark(rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compare the ModelSerializer + JSONRenderer path against the values
+    fast path + ORJSONRenderer for document list responses.
+    """
+    from documents import serializers
+
+    results = []
+
+    with rolled_back():
+        user = get_user_model().objects.create_user(
+            email='benchmark@example.com',
+            name='Benchmark',
+        )
+        documents = models.Document.objects.bulk_create(
+            models.Document(
+                id=f'benchmark-{i}',
+                title=f'Benchmark document {i}',
+                repository_uri=f'https://example.com/handle/{i}',
+                repository_id=f'benchmark-repo-{i}',
+            )
+            for i in range(rows)
+        )
+        models.SavedDocument.objects.bulk_create(
+            models.SavedDocument(user=user, document=document)
+            for document in documents
+        )
+
+        cases = [
+            (
+                'documents',
+                models.Document.objects.order_by('-created_at'),
+                serializers.DocumentSerializer,
+                serializers.DocumentValuesSerializer,
+            ),
+            (
+                'saved documents',
+                models.SavedDocument.objects.filter(user=user)
+                .order_by('-created_at'),
+                serializers.SavedDocumentSerializer,
+                serializers.SavedDocumentValuesSerializer,
+            ),
+        ]
+
+        for name, queryset, serializer_class, values_class in cases:
+            seconds = best_of(
+                lambda: JSONRenderer().render(
+                    serializer_class(queryset.all(), many=True).data
+                ),
+                repeat,
+            )
+            results.append(result(
+                f'{name}: {serializer_class.__name__} + JSONRenderer',
+                rows,
+                seconds,
+            ))
+
+            seconds = best_of(
+                lambda: ORJSONRenderer().render(
+                    values_class(queryset.all()).data
+                ),
+                repeat,
+            )
+            results.append(result(
+                f'{name}: {values_class.__name__} + ORJSONRenderer',
+                rows,
+                seconds,
+            ))
+
+    return results
+
+
+@benchmark('feedback_export', default_rows=20_000)
+def feedback_export_benchmark(
+        rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Compare the write speed and file size of the CSV and Parquet survey
+    exports.
+    """
+    from core.management.commands.export_feedback_parquet import (
+        write_parquet,
+    )
+
+    results = []
+
+    with rolled_back(), tempfile.TemporaryDirectory() as directory:
+        user = get_user_model().objects.create_user(
+            email='benchmark@example.com',
+            name='Benchmark',
+        )
+        models.SatisfactionSurveyResponse.objects.bulk_create(
+            models.SatisfactionSurveyResponse(
+                user=user,
+                version='1.0',
+                survey={
+                    'ease_of_use': i % 5 + 1,
+                    'relevance': (i * 7) % 5 + 1,
+                    'response_time': round(i % 100 / 10, 1),
+                    'would_recommend': i % 3 != 0,
+                    'features': ['chat', 'search', 'saved'][:i % 3 + 1],
+                    'comments': f'Benchmark comment {i % 50}',
+                },
+            )
+            for i in range(rows)
+        )
+        queryset = models.SatisfactionSurveyResponse.objects.all()
+
+        path = os.path.join(directory, 'feedback.csv')
+        seconds = best_of(
+            lambda: call_command(
+                'export_feedback_csv', outfile=path, stdout=io.StringIO()
+            ),
+            repeat,
+        )
+        results.append(result('csv', rows, seconds, os.path.getsize(path)))
+
+        for compression in ('none', 'snappy', 'zstd'):
+            path = os.path.join(directory, f'feedback.{compression}.parquet')
+            seconds = best_of(
+                lambda: write_parquet(queryset, path, compression),
+                repeat,
+            )
+            results.append(result(
+                f'parquet ({compression})',
+                rows,
+                seconds,
+                os.path.getsize(path),
+            ))
+
+    return results
+
+
+@benchmark('survey_indexes', default_rows=1_000_000)
+def survey_indexes_benchmark(
+        rows: int, repeat: int) -> List[Dict[str, Any]]:
+    """
+    Time the filtered survey export and aggregate queries with and without
+    the SatisfactionSurveyResponse indexes. Fixtures are generated in SQL
+    over a year, for two survey versions, in temporary copies of the
+    survey tables, so the real tables and their indexes are left alone.
+    """
+    from core.management.commands.export_feedback_csv import _survey_keys
+    from feedback.queries import get_rating_stats
+
+    Response = models.SatisfactionSurveyResponse
+    quote = connection.ops.quote_name
+    table = quote(Response._meta.db_table)
+    results = []
+
+    with rolled_back(), connection.cursor() as cursor:
+        shadow_table(cursor, Response, indexes=False)
+        shadow_table(cursor, models.SurveyRating)
+        with connection.schema_editor() as editor:
+            for index in Response._meta.indexes:
+                editor.add_index(Response, index)
+
+        # The copies have no foreign keys, so no user is needed
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (user_id, version, survey, completed_at)
+            SELECT 0,
+                   CASE WHEN i %% 4 = 0 THEN '1.0' ELSE '2.0' END,
+                   jsonb_build_object(
+                       'rating_items', jsonb_build_object(
+                           'q1', i %% 5 + 1,
+                           'q2', i * 7 %% 5 + 1,
+                           'q3', i * 13 %% 5 + 1
+                       ),
+                       'comments', 'Benchmark comment ' || i %% 50
+                   ),
+                   now() - (i %% 525600) * interval '1 minute'
+            FROM generate_series(1, %s) AS i
+            """,
+            [rows]
+        )
+        cursor.execute(
+            f"""
+            INSERT INTO {quote(models.SurveyRating._meta.db_table)}
+                (response_id, question, value)
+            SELECT response.id, rating.key, rating.value::float
+            FROM {table} AS response,
+                 jsonb_each(response.survey -> 'rating_items') AS rating
+            """
+        )
+        cursor.execute(f'ANALYZE {table}')
+
+        end = timezone.now() - timedelta(days=30)
+        window = Response.objects.filter(
+            version='2.0',
+            completed_at__gte=end - timedelta(days=7),
+            completed_at__lte=end,
+        )
+        cases = [
+            (
+                'export rows: version + 7 day range',
+                lambda: list(window.order_by('completed_at', 'pk')
+                             .values_list('pk', 'survey')),
+            ),
+            (
+                'export key discovery: version + 7 day range',
+                lambda: _survey_keys(window),
+            ),
+            (
+                'rating aggregates: version + 7 day range',
+                lambda: get_rating_stats(window, ['rating_items'], [50]),
+            ),
+            (
+                'JSON containment: survey__contains',
+                lambda: Response.objects.filter(
+                    survey__contains={'rating_items': {'q1': 5}}
+                ).count(),
+            ),
+        ]
+
+        timings = {}
+        for state in ('indexes', 'no indexes'):
+            if state == 'no indexes':
+                with connection.schema_editor() as editor:
+                    for index in Response._meta.indexes:
+                        editor.remove_index(Response, index)
+                cursor.execute(f'ANALYZE {table}')
+
+            for label, func in cases:
+                timings[label, state] = best_of(func, repeat)
+
+        for label, _ in cases:
+            for state in ('no indexes', 'indexes'):
+                results.append(result(
+                    f'{label} ({state})',
+                    rows,
+                    timings[label, state],
+                ))
+
+    return results
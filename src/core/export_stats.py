@@ -1,141 +1,269 @@
 """
 Export statistics to CSV files.
+
+Exports are streamed: rows are read from server-side cursors and written
+to the response as they are produced, so memory stays flat no matter how
+many rows are exported. Add `?full=1` to export every row instead of the
+dashboard's top entries, and `?gzip=1` to download a gzipped file.
 """
 import csv
-from django.http import HttpRequest, HttpResponse
+import zlib
+from typing import Iterable, Iterator, List
+
+from django.http import HttpRequest, StreamingHttpResponse
+
+from core import models
 from core.statistics import (get_user_field_of_study_stats,
-                             get_most_consulted_documents_stats,
-                             get_most_consulted_authors_stats,
-                             get_document_keywords_stats,
+                             most_consulted_documents_rows,
+                             most_consulted_authors_rows,
+                             document_keywords_rows,
                              get_user_education_level_stats,
                              get_user_activity_status_stats,
                              get_chats_over_time_stats,
+                             CHUNK_SIZE,
                              )
 
 
-def export_user_field_of_study_csv(request: HttpRequest) -> HttpResponse:
+# Entries exported without `?full=1`, matching the dashboards
+TOP_LIMIT = 10
+
+# Size of the chunks handed to the server (and to the compressor)
+BUFFER_SIZE = 64 * 1024
+
+
+class Echo:
     """
-    Export user field of study statistics to a CSV file.
+    Pseudo-buffer that returns what is written, for `csv.writer`.
     """
-    data = get_user_field_of_study_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=user_\
-        field_of_study_stats.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Field', 'Count'])
 
-    labels = data['labels']
-    values = data['values']
+    def write(self, value: str) -> str:
+        return value
 
-    for label, value in zip(labels, values):
-        writer.writerow(['user_field_of_study', label, value])
 
-    return response
+def csv_lines(header: List[str], rows: Iterable) -> Iterator[str]:
+    """
+    Yield the header and every row as CSV lines.
+    """
+    writer = csv.writer(Echo())
+    yield writer.writerow(header)
+    for row in rows:
+        yield writer.writerow(row)
 
 
-def export_user_education_level_csv(request: HttpRequest) -> HttpResponse:
+def buffered(lines: Iterable[str]) -> Iterator[bytes]:
     """
-    Export user education level statistics to a CSV file.
+    Join lines into chunks of about BUFFER_SIZE bytes.
+    """
+    buffer, size = [], 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer).encode()
+            buffer, size = [], 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def gzipped(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Compress chunks into a gzip stream.
     """
-    data = get_user_education_level_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=user_\
-        education_level_stats.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Field', 'Count'])
+    compressor = zlib.compressobj(wbits=31)  # 31: gzip header and trailer
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
 
-    labels = data['labels']
-    values = data['values']
 
-    for label, value in zip(labels, values):
-        writer.writerow(['user_education_level', label, value])
+def stream_csv(
+        request: HttpRequest,
+        filename: str,
+        header: List[str],
+        rows: Iterable) -> StreamingHttpResponse:
+    """
+    Stream `rows` as a CSV attachment, gzipped when `?gzip=1` is given.
+    """
+    chunks = buffered(csv_lines(header, rows))
 
+    if request.GET.get('gzip') == '1':
+        response = StreamingHttpResponse(
+            gzipped(chunks),
+            content_type='application/gzip'
+        )
+        filename = f'{filename}.gz'
+    else:
+        response = StreamingHttpResponse(chunks, content_type='text/csv')
+
+    response['Content-Disposition'] = f'attachment; filename={filename}'
     return response
 
 
-def export_user_activity_status_csv(request: HttpRequest) -> HttpResponse:
+def export_limit(request: HttpRequest):
     """
-    Export user activity status statistics to a CSV file.
+    Return the number of entries to export: all of them with `?full=1`.
     """
-    data = get_user_activity_status_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=\
-        user_activity_status_stats.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Field', 'Count'])
+    return None if request.GET.get('full') == '1' else TOP_LIMIT
 
-    labels = data['labels']
-    values = data['values']
 
-    for label, value in zip(labels, values):
-        writer.writerow(['user_activity_status', label, value])
+def stats_rows(category: str, data) -> Iterator[List]:
+    for label, value in zip(data['labels'], data['values']):
+        yield [category, label, value]
 
-    return response
+
+def export_user_field_of_study_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Export user field of study statistics to a CSV file.
+    """
+    return stream_csv(
+        request,
+        'user_field_of_study_stats.csv',
+        ['Category', 'Field', 'Count'],
+        stats_rows('user_field_of_study', get_user_field_of_study_stats())
+    )
 
 
-def export_most_consulted_documents_csv(request: HttpRequest) -> HttpResponse:
+def export_user_education_level_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
     """
-    Export most consulted documents statistics to a CSV file.
+    Export user education level statistics to a CSV file.
     """
-    data = get_most_consulted_documents_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=most_\
-        consulted_documents.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Title', 'Count'])
+    return stream_csv(
+        request,
+        'user_education_level_stats.csv',
+        ['Category', 'Field', 'Count'],
+        stats_rows('user_education_level', get_user_education_level_stats())
+    )
 
-    for label, value in zip(data['labels'], data['values']):
-        writer.writerow(['most_consulted_documents', label, value])
 
-    return response
+def export_user_activity_status_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Export user activity status statistics to a CSV file.
+    """
+    return stream_csv(
+        request,
+        'user_activity_status_stats.csv',
+        ['Category', 'Field', 'Count'],
+        stats_rows('user_activity_status', get_user_activity_status_stats())
+    )
 
 
-def export_most_consulted_authors_csv(request: HttpRequest) -> HttpResponse:
+def export_most_consulted_documents_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
     """
-    Export most consulted authors statistics to a CSV file.
+    Export most consulted documents statistics to a CSV file.
     """
-    data = get_most_consulted_authors_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=most_\
-        consulted_authors.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Author', 'Count'])
+    return stream_csv(
+        request,
+        'most_consulted_documents.csv',
+        ['Category', 'Title', 'Count'],
+        (
+            ['most_consulted_documents', title, count]
+            for title, count in most_consulted_documents_rows(
+                export_limit(request)
+            )
+        )
+    )
 
-    for label, value in zip(data['labels'], data['values']):
-        writer.writerow(['most_consulted_authors', label, value])
 
-    return response
+def export_most_consulted_authors_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Export most consulted authors statistics to a CSV file.
+    """
+    return stream_csv(
+        request,
+        'most_consulted_authors.csv',
+        ['Category', 'Author', 'Count'],
+        (
+            ['most_consulted_authors', name, count]
+            for name, count in most_consulted_authors_rows(
+                export_limit(request)
+            )
+        )
+    )
 
 
-def export_document_keywords_csv(request: HttpRequest) -> HttpResponse:
+def export_document_keywords_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
     """
     Export document keyword statistics to a CSV file.
     """
-    data = get_document_keywords_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=document\
-        _keywords.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Keyword', 'Count'])
+    return stream_csv(
+        request,
+        'document_keywords.csv',
+        ['Category', 'Keyword', 'Count'],
+        (
+            ['document_keywords', word, count]
+            for word, count in document_keywords_rows(export_limit(request))
+        )
+    )
 
-    for label, value in zip(data['labels'], data['values']):
-        writer.writerow(['document_keywords', label, value])
 
-    return response
+def export_chats_over_time_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Export chat session statistics over time to a CSV file.
+    """
+    return stream_csv(
+        request,
+        'chats_over_time.csv',
+        ['Category', 'Date', 'Count'],
+        stats_rows('chats_over_time', get_chats_over_time_stats())
+    )
 
 
-def export_chats_over_time_csv(request: HttpRequest) -> HttpResponse:
+def export_saved_documents_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
     """
-    Export chat session statistics over time to a CSV file.
+    Export every saved document row to a CSV file.
     """
-    data = get_chats_over_time_stats()
-    response = HttpResponse(content_type='text/csv')
-    response['Content-Disposition'] = 'attachment; filename=chats_\
-        over_time.csv'
-    writer = csv.writer(response)
-    writer.writerow(['Category', 'Date', 'Count'])
+    rows = models.SavedDocument.objects.order_by('id').values_list(
+        'id',
+        'user_id',
+        'user__email',
+        'document_id',
+        'document__title',
+        'created_at',
+    ).iterator(chunk_size=CHUNK_SIZE)
 
-    for label, value in zip(data['labels'], data['values']):
-        writer.writerow(['chats_over_time', label, value])
+    return stream_csv(
+        request,
+        'saved_documents.csv',
+        ['ID', 'User ID', 'User email', 'Document ID', 'Title', 'Saved at'],
+        rows
+    )
 
-    return response
+
+def export_chat_sessions_csv(
+        request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Export every chat session row to a CSV file.
+    """
+    rows = models.ChatSession.objects.order_by('created_at').values_list(
+        'session_id',
+        'session_name',
+        'user_id',
+        'user__email',
+        'assistant_id',
+        'created_at',
+        'updated_at',
+    ).iterator(chunk_size=CHUNK_SIZE)
+
+    return stream_csv(
+        request,
+        'chat_sessions.csv',
+        [
+            'Session ID',
+            'Session name',
+            'User ID',
+            'User email',
+            'Assistant ID',
+            'Created at',
+            'Updated at',
+        ],
+        rows
+    )
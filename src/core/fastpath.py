@@ -0,0 +1,85 @@
+"""
+Read-only fast path for large list responses.
+"""
+
+from rest_framework import serializers, status
+from rest_framework.response import Response
+
+from core.renderers import ORJSONRenderer
+
+
+# Same output as a ModelSerializer DateTimeField, without the field binding.
+format_datetime = serializers.DateTimeField().to_representation
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer that builds rows straight from `.values_list()`
+    tuples instead of going through ModelSerializer fields for every row.
+
+    Subclasses declare the `lookups` they read and turn each tuple into an
+    output row in `to_representation`.
+    """
+    lookups = ()
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    def to_representation(self, row):
+        """
+        Return the output representation of a single values tuple.
+        """
+        raise NotImplementedError(
+            '`to_representation()` must be implemented.'
+        )
+
+    def iterator(self, chunk_size=2000):
+        """
+        Yield output rows read from a server-side cursor.
+        """
+        to_representation = self.to_representation
+        for row in self.queryset.values_list(*self.lookups).iterator(
+            chunk_size=chunk_size
+        ):
+            yield to_representation(row)
+
+    @property
+    def data(self):
+        to_representation = self.to_representation
+        return [
+            to_representation(row)
+            for row in self.queryset.values_list(*self.lookups)
+        ]
+
+
+class FastPathListMixin:
+    """
+    Serve list responses through a `ValuesSerializer` rendered with orjson.
+
+    Views opt in by setting `fast_serializer_class`; leaving it as `None`
+    keeps the regular serializer and renderers.
+    """
+    fast_serializer_class = None
+
+    def get_renderers(self):
+        """
+        Put the orjson renderer in place of the stock JSON renderer.
+        """
+        renderers = super().get_renderers()
+        if self.fast_serializer_class is None:
+            return renderers
+
+        return [ORJSONRenderer()] + [
+            renderer for renderer in renderers if renderer.format != 'json'
+        ]
+
+    def list_response(self, queryset):
+        """
+        Return a 200 response listing every object in `queryset`.
+        """
+        if self.fast_serializer_class is None:
+            data = self.get_serializer(queryset, many=True).data
+        else:
+            data = self.fast_serializer_class(queryset).data
+
+        return Response(data, status=status.HTTP_200_OK)
@@ -0,0 +1,54 @@
+"""
+Django command to run the application benchmarks.
+"""
+
+from django.core.management.base import BaseCommand
+
+from core.benchmarks import BENCHMARKS
+
+
+class Command(BaseCommand):
+    help = (
+        "Run one or more benchmarks. Fixtures are created inside a "
+        "transaction that is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "names",
+            nargs="*",
+            choices=sorted(BENCHMARKS),
+            help="Benchmarks to run (default: all).",
+        )
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=None,
+            help="Number of fixture rows (default depends on the benchmark).",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=3,
+            help="Timed runs per case; the fastest one is reported.",
+        )
+
+    def handle(self, *args, **options):
+        names = options["names"] or sorted(BENCHMARKS)
+        repeat = max(options["repeat"], 1)
+
+        for name in names:
+            func = BENCHMARKS[name]
+            rows = options["rows"] or func.default_rows
+
+            self.stdout.write(self.style.MIGRATE_HEADING(
+                f"{name} ({rows} rows, best of {repeat})"
+            ))
+            for row in func(rows=rows, repeat=repeat):
+                line = (
+                    f"  {row['label']:<66} {row['seconds']:>9.4f}s "
+                    f"{row['rows_per_second']:>14,.0f} rows/s"
+                )
+                if row.get('size') is not None:
+                    line += f" {row['size'] / 1024:>12,.1f} KiB"
+                self.stdout.write(line)
@@ -1,18 +1,37 @@
 """
 Generate a CSV for the application, in base of the feedback answer of the users
+
+The export runs in two passes so memory stays flat however many responses
+are exported: Postgres first walks the filtered surveys to find the union
+of their keys (the CSV header), then the rows are streamed from a
+server-side cursor straight to the writer. The `--summary` value counts
+are grouped in Postgres as well.
+
+With `--since-last`, a high-water mark `(completed_at, pk)` is kept next
+to the output file in `<outfile>.watermark.json`, and each run appends
+only the responses completed after it.
 """
 import csv
 import json
+import os
 import sys
+import tempfile
 from datetime import datetime, time
-from typing import Dict, Any
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Q, QuerySet
 from django.utils import timezone
 
 from core.models import SatisfactionSurveyResponse
 
 
+FIXED_COLS = [
+    "response_id", "user_id", "user_email", "version", "completed_at"
+]
+
+
 def _parse_date(date_str: str, is_end: bool = False):
     """
     Parse ISO-like date strings:
@@ -40,23 +59,199 @@ def _parse_date(date_str: str, is_end: bool = False):
 
 
 def _flatten_json(d: Any, parent_key: str = "",
-                  sep: str = ".") -> Dict[str, Any]:
+                  sep: str = ".", dump_lists: bool = True) -> Dict[str, Any]:
     """
     Flatten arbitrarily nested JSON into a single dict with dotted keys.
-    Arrays are JSON-serialized to keep one column per question key.
+    Arrays are JSON-serialized to keep one column per question key, unless
+    `dump_lists` is False.
     """
     flat = {}
     if isinstance(d, dict):
         for k, v in d.items():
             new_key = f"{parent_key}{sep}{k}" if parent_key else str(k)
-            flat.update(_flatten_json(v, new_key, sep=sep))
-    elif isinstance(d, list):
+            flat.update(_flatten_json(v, new_key, sep, dump_lists))
+    elif isinstance(d, list) and dump_lists:
         flat[parent_key] = json.dumps(d, ensure_ascii=False)
     else:
         flat[parent_key] = d
     return flat
 
 
+def _filtered_responses(options: Dict[str, Any]) -> QuerySet:
+    """
+    Return the survey responses matching the --from, --to and
+    --survey-version options.
+    """
+    date_from = _parse_date(options.get("date_from"))
+    date_to = _parse_date(options.get("date_to"), is_end=True)
+    version = options.get("survey_version")
+
+    qs = SatisfactionSurveyResponse.objects.all()
+    if date_from:
+        qs = qs.filter(completed_at__gte=date_from)
+    if date_to:
+        qs = qs.filter(completed_at__lte=date_to)
+    if version:
+        qs = qs.filter(version=version)
+    return qs
+
+
+def _walk_sql(queryset: QuerySet, sep: str) -> Tuple[str, tuple]:
+    """
+    Return the `walk(path, value)` CTE, yielding every nested value of the
+    surveys in `queryset` under its dotted path, with its parameters.
+    """
+    inner_sql, params = queryset.values("survey").query.sql_with_params()
+    sql = f"""
+        walk(path, value) AS (
+            SELECT NULL::text, filtered.survey
+            FROM ({inner_sql}) AS filtered
+            WHERE jsonb_typeof(filtered.survey) = 'object'
+          UNION ALL
+            SELECT CASE WHEN walk.path IS NULL THEN child.key
+                        ELSE walk.path || %s || child.key END,
+                   child.value
+            FROM walk, jsonb_each(walk.value) AS child
+            WHERE jsonb_typeof(walk.value) = 'object'
+        )
+    """
+    return sql, (*params, sep)
+
+
+def _survey_keys(queryset: QuerySet, sep: str = ".") -> List[str]:
+    """
+    Return the sorted union of the flattened keys of the surveys in
+    `queryset`, as `_flatten_json` would produce them.
+    """
+    walk_sql, params = _walk_sql(queryset, sep)
+    sql = f"""
+        WITH RECURSIVE {walk_sql}
+        SELECT DISTINCT path FROM walk
+        WHERE path IS NOT NULL AND jsonb_typeof(value) <> 'object'
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # Sort in Python: the database collation may order differently.
+        return sorted(row[0] for row in cursor.fetchall())
+
+
+def _survey_summary(
+        queryset: QuerySet,
+        keys: List[str],
+        sep: str = ".") -> Iterator[Tuple[str, str, int]]:
+    """
+    Yield `(key, value, count)` for every answer to `keys` in `queryset`,
+    ordered by key and by decreasing count. Values are formatted as in
+    the CSV export, and responses without the key count as ''.
+    """
+    walk_sql, walk_params = _walk_sql(queryset, sep)
+    total_sql, total_params = queryset.values("pk").query.sql_with_params()
+    # COLLATE "C" orders UTF-8 text by code point, like Python's sorted().
+    sql = f"""
+        WITH RECURSIVE {walk_sql},
+        counts AS (
+            SELECT path,
+                   CASE jsonb_typeof(value)
+                       WHEN 'null' THEN ''
+                       WHEN 'boolean' THEN
+                           CASE WHEN value::boolean THEN 'True'
+                                ELSE 'False' END
+                       ELSE value #>> '{{}}'
+                   END AS answer,
+                   count(*) AS n
+            FROM walk
+            WHERE path = ANY(%s) AND jsonb_typeof(value) <> 'object'
+            GROUP BY 1, 2
+        ),
+        missing AS (
+            SELECT key AS path, '' AS answer,
+                   (SELECT count(*) FROM ({total_sql}) AS filtered)
+                   - COALESCE(sum(counts.n), 0) AS n
+            FROM unnest(%s::text[]) AS key
+            LEFT JOIN counts ON counts.path = key
+            GROUP BY key
+        )
+        SELECT path, answer, sum(n)::bigint
+        FROM (
+            SELECT path, answer, n FROM counts
+            UNION ALL
+            SELECT path, answer, n FROM missing WHERE n > 0
+        ) AS answers
+        GROUP BY path, answer
+        ORDER BY path COLLATE "C", 3 DESC, answer COLLATE "C"
+    """
+    params = (*walk_params, keys, *total_params, keys)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        yield from cursor
+
+
+def _survey_values(survey: Any, dump_lists: bool = True) -> Dict[str, Any]:
+    """
+    Flatten a stored survey; only JSON objects have keys.
+    """
+    if not isinstance(survey, dict):
+        return {}
+    return _flatten_json(survey, dump_lists=dump_lists)
+
+
+def _watermark_path(outfile: str) -> str:
+    return outfile + ".watermark.json"
+
+
+def _read_watermark(outfile: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the watermark of the last export to `outfile`, or None if
+    there was no successful export to it.
+    """
+    if not os.path.exists(outfile):
+        return None
+    try:
+        with open(_watermark_path(outfile), encoding="utf-8") as f:
+            watermark = json.load(f)
+    except FileNotFoundError:
+        return None
+    watermark["completed_at"] = datetime.fromisoformat(
+        watermark["completed_at"]
+    )
+    return watermark
+
+
+def _write_watermark(outfile: str, watermark: Dict[str, Any]):
+    """
+    Atomically replace the watermark of `outfile`.
+    """
+    path = _watermark_path(outfile)
+    with tempfile.NamedTemporaryFile(
+            "w", dir=os.path.dirname(os.path.abspath(path)),
+            delete=False, encoding="utf-8") as f:
+        completed_at = watermark["completed_at"].isoformat()
+        json.dump({**watermark, "completed_at": completed_at}, f)
+    os.replace(f.name, path)
+
+
+def _add_columns(outfile: str, headers: List[str], added: int,
+                 delimiter: str, encoding: str):
+    """
+    Rewrite `outfile` with the new `headers`, padding the existing rows
+    with `added` empty cells.
+    """
+    with open(outfile, newline="", encoding=encoding) as src, \
+            tempfile.NamedTemporaryFile(
+                "w", dir=os.path.dirname(os.path.abspath(outfile)),
+                delete=False, newline="", encoding=encoding) as dst:
+        reader = csv.reader(src, delimiter=delimiter)
+        writer = csv.writer(
+            dst, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL
+        )
+        next(reader, None)
+        writer.writerow(headers)
+        padding = [""] * added
+        for row in reader:
+            writer.writerow(row + padding)
+    os.replace(dst.name, outfile)
+
+
 class Command(BaseCommand):
     help = (
         "Export SatisfactionSurveyResponse data to CSV. "
@@ -105,6 +300,20 @@ class Command(BaseCommand):
             help="Also write per-question value counts to "
                  "'<outfile>.summary.csv' (requires --outfile).",
         )
+        parser.add_argument(
+            "--summary-only",
+            dest="summary_only",
+            action="store_true",
+            help="Only write the per-question value counts, to --outfile "
+                 "or stdout, without the full export.",
+        )
+        parser.add_argument(
+            "--since-last",
+            dest="since_last",
+            action="store_true",
+            help="Append only the responses completed since the last "
+                 "--since-last export to --outfile.",
+        )
         parser.add_argument(
             "--limit-keys",
             dest="limit_keys",
@@ -114,30 +323,44 @@ class Command(BaseCommand):
         )
 
     def handle(self, *args, **options):
-        date_from = _parse_date(options.get("date_from"))
-        date_to = _parse_date(options.get("date_to"), is_end=True)
-        version = options.get("survey_version")
         outfile = options.get("outfile")
         delimiter = options.get("delimiter") or ","
         encoding = options.get("encoding") or "utf-8"
         do_summary = options.get("summary")
+        summary_only = options.get("summary_only")
+        since_last = options.get("since_last")
         limit_keys = set(options.get("limit_keys") or [])
 
-        if do_summary and not outfile:
+        if do_summary and not outfile and not summary_only:
             raise CommandError(
                 "--summary requires --outfile so we can create a second CSV."
             )
 
-        qs = SatisfactionSurveyResponse.objects.all().select_related("user")
+        if since_last and not outfile:
+            raise CommandError("--since-last requires --outfile.")
+        if since_last and (do_summary or summary_only):
+            raise CommandError(
+                "--since-last cannot be combined with --summary."
+            )
+
+        qs = _filtered_responses(options)
 
-        if date_from:
-            qs = qs.filter(completed_at__gte=date_from)
-        if date_to:
-            qs = qs.filter(completed_at__lte=date_to)
-        if version:
-            qs = qs.filter(version=version)
+        watermark = _read_watermark(outfile) if since_last else None
+        if watermark:
+            qs = qs.filter(
+                Q(completed_at__gt=watermark["completed_at"])
+                | Q(
+                    completed_at=watermark["completed_at"],
+                    pk__gt=watermark["pk"]
+                )
+            )
 
         if not qs.exists():
+            if watermark:
+                self.stdout.write(
+                    "No new survey responses since the last export."
+                )
+                return
             self.stdout.write(
                 self.style.WARNING(
                     "No survey responses match the given filters."
@@ -145,84 +368,118 @@ class Command(BaseCommand):
             )
             return
 
-        dynamic_keys = set()
-        flattened_rows = []
-
-        for resp in qs.iterator(chunk_size=1000):
-            survey_json = resp.survey or {}
-            flat = _flatten_json(survey_json)
-
-            if limit_keys:
-                flat = {k: v for k, v in flat.items() if k in limit_keys}
-            dynamic_keys.update(flat.keys())
-
-            row = {
-                "response_id": resp.pk,
-                "user_id": getattr(resp.user, "id", None),
-                "user_email": getattr(resp.user, "email", "") or "",
-                "version": resp.version,
-                "completed_at": timezone.localtime(
-                    resp.completed_at
-                ).isoformat(),
-                **flat,
-            }
-            flattened_rows.append(row)
-
-        fixed_cols = [
-            "response_id", "user_id", "user_email", "version", "completed_at"
+        dynamic_cols = [
+            key for key in _survey_keys(qs)
+            if not limit_keys or key in limit_keys
         ]
-        dynamic_cols = sorted(dynamic_keys)
-        headers = fixed_cols + dynamic_cols
+        if watermark:
+            # Keep the existing columns in place and add new keys after
+            # them, so only a new key forces rewriting the file.
+            known = set(watermark["columns"])
+            added = [key for key in dynamic_cols if key not in known]
+            dynamic_cols = watermark["columns"] + added
+
+            # Drop rows a failed run may have appended.
+            with open(outfile, "r+b") as f:
+                f.truncate(watermark["size"])
+            if added:
+                _add_columns(
+                    outfile,
+                    FIXED_COLS + dynamic_cols,
+                    len(added),
+                    delimiter,
+                    encoding
+                )
+        headers = FIXED_COLS + dynamic_cols
+
+        if summary_only:
+            self._write_summary(
+                qs, dynamic_cols, outfile, delimiter, encoding
+            )
+            return
+
+        rows = qs.order_by("completed_at", "pk").values_list(
+            "pk", "user_id", "user__email", "version", "completed_at",
+            "survey",
+        ).iterator(chunk_size=1000)
 
         if outfile:
-            out_stream = open(outfile, "w", newline="", encoding=encoding)
+            out_stream = open(
+                outfile, "a" if watermark else "w",
+                newline="", encoding=encoding
+            )
             close_after = True
         else:
             out_stream = sys.stdout
             close_after = False
 
-        writer = csv.DictWriter(
-            out_stream, fieldnames=headers, delimiter=delimiter,
-            quoting=csv.QUOTE_MINIMAL
+        writer = csv.writer(
+            out_stream, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL
         )
-        writer.writeheader()
-        for row in flattened_rows:
-            for k in dynamic_cols:
-                row.setdefault(k, "")
-            writer.writerow(row)
+        if not watermark:
+            writer.writerow(headers)
+
+        exported = 0
+        last = None
+        try:
+            for pk, user_id, email, resp_version, completed_at, survey in rows:
+                flat = _survey_values(survey)
+                values = [flat.get(k, "") for k in dynamic_cols]
+                writer.writerow([
+                    pk,
+                    user_id,
+                    email or "",
+                    resp_version,
+                    timezone.localtime(completed_at).isoformat(),
+                    *values,
+                ])
+                exported += 1
+                last = (completed_at, pk)
+        finally:
+            if close_after:
+                out_stream.close()
 
-        if close_after:
-            out_stream.close()
+        if since_last and last:
+            _write_watermark(outfile, {
+                "completed_at": last[0],
+                "pk": last[1],
+                "columns": dynamic_cols,
+                "size": os.path.getsize(outfile),
+            })
 
         self.stdout.write(
-            self.style.SUCCESS(f"Exported {len(flattened_rows)} responses.")
+            self.style.SUCCESS(f"Exported {exported} responses.")
         )
 
         if do_summary:
-            summary_counts = {}
-            for row in flattened_rows:
-                for k in dynamic_cols:
-                    val = row.get(k, "")
-                    if isinstance(val, (dict, list)):
-                        val = json.dumps(val, ensure_ascii=False)
-                    val = "" if val is None else str(val)
-                    summary_counts.setdefault(k, {}).setdefault(val, 0)
-                    summary_counts[k][val] += 1
-
-            summary_path = outfile + ".summary.csv"
-            with open(summary_path, "w", newline="",
-                      encoding=encoding) as sf:
-                s_writer = csv.writer(
-                    sf, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL
-                )
-                s_writer.writerow(["question_key", "answer_value", "count"])
-                for key in sorted(summary_counts.keys()):
-                    for value, count in sorted(
-                        summary_counts[key].items(),
-                        key=lambda x: (-x[1], x[0])
-                    ):
-                        s_writer.writerow([key, value, count])
+            self._write_summary(
+                qs,
+                dynamic_cols,
+                outfile + ".summary.csv",
+                delimiter,
+                encoding
+            )
+
+    def _write_summary(self, qs, keys, path, delimiter, encoding):
+        """
+        Write the per-question value counts to `path`, or to stdout.
+        """
+        if path:
+            out_stream = open(path, "w", newline="", encoding=encoding)
+        else:
+            out_stream = sys.stdout
+
+        try:
+            writer = csv.writer(
+                out_stream, delimiter=delimiter, quoting=csv.QUOTE_MINIMAL
+            )
+            writer.writerow(["question_key", "answer_value", "count"])
+            writer.writerows(_survey_summary(qs, keys))
+        finally:
+            if path:
+                out_stream.close()
 
+        if path:
             self.stdout.write(
-                self.style.SUCCESS(f"Wrote summary counts - {summary_path}")
+                self.style.SUCCESS(f"Wrote summary counts - {path}")
             )
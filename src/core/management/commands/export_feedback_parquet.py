@@ -0,0 +1,262 @@
+"""
+Export the feedback answers of the users to a typed Parquet file.
+
+Unlike the CSV export, every survey key keeps its JSON type: numeric
+ratings are written as integer or float columns, booleans as booleans and
+arrays as list columns. Postgres infers the column types while it
+discovers the keys, then rows are streamed from a server-side cursor and
+written in row groups, so memory is bounded by the row group size.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import QuerySet
+
+from core.management.commands.export_feedback_csv import (
+    _filtered_responses,
+    _survey_values,
+    _walk_sql,
+)
+
+
+COMPRESSIONS = ("zstd", "snappy", "gzip", "brotli", "lz4", "none")
+
+
+def _survey_types(queryset: QuerySet, sep: str = ".") -> Dict[str, tuple]:
+    """
+    Return, for every flattened survey key in `queryset`, the JSON types
+    of its values and of its array elements, and whether all the numbers
+    among them are integral.
+    """
+    walk_sql, params = _walk_sql(queryset, sep)
+    sql = f"""
+        WITH RECURSIVE {walk_sql}
+        SELECT walk.path,
+               array_agg(DISTINCT jsonb_typeof(walk.value))
+                   FILTER (WHERE jsonb_typeof(walk.value) <> 'null'),
+               bool_and(CASE WHEN jsonb_typeof(walk.value) = 'number'
+                        THEN walk.value::numeric %% 1 = 0 END),
+               array_agg(DISTINCT jsonb_typeof(element))
+                   FILTER (WHERE jsonb_typeof(element) <> 'null'),
+               bool_and(CASE WHEN jsonb_typeof(element) = 'number'
+                        THEN element::numeric %% 1 = 0 END)
+        FROM walk
+        LEFT JOIN LATERAL jsonb_array_elements(
+            CASE WHEN jsonb_typeof(walk.value) = 'array'
+                 THEN walk.value END
+        ) AS elements(element) ON true
+        WHERE walk.path IS NOT NULL AND jsonb_typeof(walk.value) <> 'object'
+        GROUP BY walk.path
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return {
+            path: (types or [], integral, element_types or [],
+                   elements_integral)
+            for path, types, integral, element_types, elements_integral
+            in cursor.fetchall()
+        }
+
+
+def _text(value: Any) -> Optional[str]:
+    """
+    Format a value of a mixed-type key as the CSV export does.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def _integer(value: Any) -> Optional[int]:
+    """
+    Convert an integral JSON number to int. Postgres compares numbers by
+    value, so `4.0` counts as integral and arrives here as a float.
+    """
+    if type(value) is float and value.is_integer():
+        return int(value)
+    return value if type(value) is int else None
+
+
+def _scalar_column(types: List[str], integral: bool):
+    """
+    Return `(arrow type, converter)` for values of the JSON `types`.
+    Mixed types fall back to text.
+    """
+    if types == ["boolean"]:
+        return pa.bool_(), lambda v: v if isinstance(v, bool) else None
+    if types == ["number"] and integral:
+        return pa.int64(), _integer
+    if types == ["number"]:
+        return pa.float64(), lambda v: (
+            float(v) if type(v) in (int, float) else None
+        )
+    return pa.string(), _text
+
+
+def _column(types: List[str], integral: bool, element_types: List[str],
+            elements_integral: bool):
+    """
+    Return `(arrow type, converter)` for a survey key.
+    """
+    if types == ["array"]:
+        element_type, convert = _scalar_column(
+            element_types, elements_integral
+        )
+        return pa.list_(element_type), lambda v: (
+            [convert(e) for e in v] if isinstance(v, list) else None
+        )
+    return _scalar_column(types, integral)
+
+
+def _batches(rows, size: int):
+    """
+    Group `rows` into lists of at most `size` rows.
+    """
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def write_parquet(
+        qs: QuerySet,
+        outfile: str,
+        compression: str = "zstd",
+        row_group_size: int = 10_000,
+        limit_keys: Optional[set] = None) -> int:
+    """
+    Write the survey responses in `qs` to `outfile` and return how many
+    were written.
+    """
+    columns: Dict[str, Callable] = {}
+    fields = [
+        pa.field("response_id", pa.int64(), nullable=False),
+        pa.field("user_id", pa.int64()),
+        pa.field("user_email", pa.string()),
+        pa.field("version", pa.string()),
+        pa.field("completed_at", pa.timestamp("us", tz="UTC")),
+    ]
+    for key, types in sorted(_survey_types(qs).items()):
+        if limit_keys and key not in limit_keys:
+            continue
+        arrow_type, convert = _column(*types)
+        fields.append(pa.field(key, arrow_type))
+        columns[key] = convert
+    schema = pa.schema(fields)
+
+    rows = qs.order_by("completed_at", "pk").values_list(
+        "pk", "user_id", "user__email", "version", "completed_at", "survey",
+    ).iterator(chunk_size=min(row_group_size, 10_000))
+
+    written = 0
+    with pq.ParquetWriter(
+            outfile,
+            schema,
+            compression=None if compression == "none" else compression) as w:
+        for batch in _batches(rows, row_group_size):
+            data = {
+                "response_id": [row[0] for row in batch],
+                "user_id": [row[1] for row in batch],
+                "user_email": [row[2] for row in batch],
+                "version": [row[3] for row in batch],
+                "completed_at": [row[4] for row in batch],
+            }
+            flat = [
+                _survey_values(row[5], dump_lists=False) for row in batch
+            ]
+            for key, convert in columns.items():
+                data[key] = [convert(values.get(key)) for values in flat]
+
+            w.write_table(
+                pa.Table.from_pydict(data, schema=schema),
+                row_group_size=row_group_size
+            )
+            written += len(batch)
+
+    return written
+
+
+class Command(BaseCommand):
+    help = (
+        "Export SatisfactionSurveyResponse data to a typed Parquet file, "
+        "one column per survey key."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--from",
+            dest="date_from",
+            help="Start datetime (inclusive). Accepts 'YYYY-MM-DD' or "
+                 "ISO 'YYYY-MM-DDTHH:MM[:SS]'.",
+        )
+        parser.add_argument(
+            "--to",
+            dest="date_to",
+            help="End datetime (inclusive). Accepts 'YYYY-MM-DD' or "
+                 "ISO 'YYYY-MM-DDTHH:MM[:SS]'.",
+        )
+        parser.add_argument(
+            "--survey-version",
+            dest="survey_version",
+            help="Filter by survey version (exact match).",
+        )
+        parser.add_argument(
+            "--outfile",
+            dest="outfile",
+            required=True,
+            help="Path to write the Parquet file.",
+        )
+        parser.add_argument(
+            "--compression",
+            choices=COMPRESSIONS,
+            default="zstd",
+            help="Parquet compression codec (default 'zstd').",
+        )
+        parser.add_argument(
+            "--row-group-size",
+            dest="row_group_size",
+            type=int,
+            default=10_000,
+            help="Rows per Parquet row group (default 10000).",
+        )
+        parser.add_argument(
+            "--limit-keys",
+            dest="limit_keys",
+            nargs="*",
+            help="Optional list of survey keys to include (dotted notation). "
+                 "Others are ignored.",
+        )
+
+    def handle(self, *args, **options):
+        qs = _filtered_responses(options)
+
+        if not qs.exists():
+            self.stdout.write(
+                self.style.WARNING(
+                    "No survey responses match the given filters."
+                )
+            )
+            return
+
+        written = write_parquet(
+            qs,
+            options["outfile"],
+            compression=options["compression"],
+            row_group_size=max(options["row_group_size"], 1),
+            limit_keys=set(options.get("limit_keys") or []),
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(f"Exported {written} responses.")
+        )
@@ -4,27 +4,64 @@ Django command to run the ingest pipeline from RI to Rag Flow.
 
 import asyncio
 import os
+import tempfile
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from functools import partial
+from itertools import batched, islice
 
 from django.core.management.base import BaseCommand, CommandError
-from ingest_ragflow.dspace_api.files import (
-    get_files_from_metadata,
-    get_item_details,
-)
+from django.db import connection, transaction
+from django.utils import timezone
 from ingest_ragflow.rag.dataset import get_dataset_by_id
-from ingest_ragflow.rag.files import (
-    get_docs_ids,
-    get_orphaned_documents,
-    remove_temp_pdf,
-)
-from ingest_ragflow.rag.parsing import (
-    filter_done_documents,
-    monitor_parsing,
-    process_items_in_parallel,
-)
+from ingest_ragflow.rag.files import get_orphaned_documents
+from ingest_ragflow.rag.parsing import filter_done_documents, monitor_parsing
 from ingest_ragflow.rag.reporting import display_final_summary
 from ragflow_sdk import RAGFlow
 from tqdm import tqdm
 
+from core.services.dspace_service import DSpaceService
+from core.services.ragflow_service import RAGFlowService
+
+# Documents written per INSERT ... ON CONFLICT statement
+BATCH_SIZE = 500
+
+# Fields refreshed when a repository item is registered again. The primary
+# key is left alone so saves and authorships keep pointing at the document.
+UPSERT_FIELDS = ["title", "repository_uri", "status", "updated_at"]
+
+# Bytes of a streamed document kept in memory before spilling to disk
+SPOOL_SIZE = 8 * 1024 * 1024
+
+# Postgres advisory lock held while the command runs, so runs never
+# overlap
+INGEST_LOCK_KEY = 0x696E6765
+
+# Seconds to wait before the first retry of a metadata request, doubled
+# on every further retry
+RETRY_BACKOFF = 1.0
+
+
+@contextmanager
+def ingest_lock():
+    """
+    Hold the ingest advisory lock in this block, failing if another
+    process holds it. The lock is released if the process dies.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_try_advisory_lock(%s)", [INGEST_LOCK_KEY])
+        if not cursor.fetchone()[0]:
+            raise CommandError("Another ingest run is in progress")
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT pg_advisory_unlock(%s)", [INGEST_LOCK_KEY]
+            )
+
 
 class Command(BaseCommand):
     help = "Run the ingest pipeline from RI to RAG Flow"
@@ -59,8 +96,143 @@ class Command(BaseCommand):
             help="Interval (in seconds) between \
             status checks",
         )
+        parser.add_argument(
+            "--batch_size",
+            required=False,
+            default=BATCH_SIZE,
+            type=int,
+            help="Number of documents registered per database statement",
+        )
+        parser.add_argument(
+            "--request_timeout",
+            required=False,
+            default=30.0,
+            type=float,
+            help="Timeout (in seconds) of each metadata request to the RI",
+        )
+        parser.add_argument(
+            "--retries",
+            required=False,
+            default=3,
+            type=int,
+            help="Number of retries of a failed metadata request",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help="Only ingest the items modified in the RI since the last \
+            successful run. Items already in the database only get their \
+            metadata refreshed: a changed PDF is not uploaded again",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the last run from its checkpoints if it did not \
+            finish successfully",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Stream each PDF from the RI to RAGFlow instead of \
+            downloading it to the folder path",
+        )
+        parser.add_argument(
+            "--spool_size",
+            required=False,
+            default=SPOOL_SIZE,
+            type=int,
+            help="Bytes of a streamed PDF buffered in memory before \
+            spilling to a temporary file",
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.counts = Counter()
 
     def handle(self, *args, **options):
+        with ingest_lock():
+            self._start(**options)
+
+    def _start(self, **options):
+        from core.models import IngestRun
+
+        if options["resume"]:
+            # Only the last run can be resumed: later runs supersede the
+            # earlier ones. The lock is held, so if it is still marked
+            # running its process died.
+            run = IngestRun.objects.order_by("-started_at").first()
+            if run is None or run.status == "S":
+                self.stdout.write("There is no unfinished run to resume")
+                return
+            self.stdout.write(f"Resuming {run}")
+            run.status = "R"
+            run.save(update_fields=["status"])
+            # Errors of the interrupted attempt are retried, not carried
+            self.counts = Counter(
+                seen=run.items_seen,
+                created=run.documents_created,
+                updated=run.documents_updated,
+            )
+            self._run(run, **options)
+            return
+
+        since = None
+        if options["incremental"]:
+            last_run = (
+                IngestRun.objects.filter(
+                    status="S", watermark__isnull=False
+                )
+                .order_by("-watermark")
+                .first()
+            )
+            if last_run:
+                since = last_run.watermark
+            else:
+                self.stdout.write(
+                    "No previous successful run, running a full ingest"
+                )
+
+        run = IngestRun.objects.create(
+            mode="I" if since else "F", since=since
+        )
+        self.counts = Counter()
+        self._run(run, **options)
+
+    def _run(self, run, **options) -> None:
+        """
+        Run the pipeline and record its outcome in `run`.
+        """
+        try:
+            self._ingest(run, **options)
+        except Exception as e:
+            self._finish_run(run, "F", message=str(e))
+            raise
+        # A limited full run leaves items behind, so it sets no watermark
+        self._finish_run(
+            run, "S", complete=run.mode == "I" or options["li"] is None
+        )
+
+    def _finish_run(
+        self, run, status: str, complete: bool = False, message: str = ""
+    ) -> None:
+        """
+        Record the outcome and statistics of an ingest run. Complete
+        successful runs move the watermark forward, even past the items
+        that failed: those are recorded as failed items and retried by the
+        next incremental run.
+        """
+        run.status = status
+        run.finished_at = timezone.now()
+        run.items_seen = self.counts["seen"]
+        run.documents_created = self.counts["created"]
+        run.documents_updated = self.counts["updated"]
+        run.errors = self.counts["errors"]
+        run.message = message
+        if status == "S" and complete:
+            run.watermark = run.started_at
+        run.save()
+
+    def _ingest(self, run, **options):
         try:
             # Configuration from environment variables
             RI_BASE_URL = os.getenv("RI_BASE_URL")
@@ -84,6 +256,9 @@ class Command(BaseCommand):
             MAX_CONCURRENT_TASKS = options["max_tasks"]
             POLL_INTERVAL = options["poll_interval"]
             FOLDER_PATH = options["folder_path"]
+            BATCH_SIZE_DB = options["batch_size"]
+            REQUEST_TIMEOUT = options["request_timeout"]
+            RETRIES = options["retries"]
 
             # Validate environment variables
             if not RI_BASE_URL:
@@ -118,85 +293,116 @@ class Command(BaseCommand):
             # Get Dataset
             dataset_rf = get_dataset_by_id(rag_object, DATASET_ID)
 
-            # Get existing repository UUIDs from database
-            existing_repository_uuids = self._get_existing_repository_uuids()
-            self.stdout.write(
-                f"Found {len(existing_repository_uuids)} existing documents"
-                " in database"
-            )
-
-            document_ids = []
-            metadata_map = {}
-
-            self.stdout.write(f"Limit items: {LIMIT_ITEMS}")
-
-            if dataset_rf:
-                # Remove failed/canceled documents
-                failed_documents_ids = get_docs_ids(
-                    dataset=dataset_rf, statuses=["FAIL", "CANCEL"]
+            ragflow_api = None
+            if options["stream"]:
+                ragflow_api = RAGFlowService(
+                    base_url=f"{RAGFLOW_BASE_URL}/api/v1", api_key=API_KEY
                 )
 
-                if len(failed_documents_ids) > 0:
-                    self.stdout.write(
-                        f"Found {len(failed_documents_ids)} "
-                        "documents with FAIL/CANCEL status."
-                    )
-                    dataset_rf.delete_documents(ids=failed_documents_ids)
-
-                # recover orphaned documents mechanism
-                orphaned_documents = get_orphaned_documents(
-                    dataset=dataset_rf,
-                    existing_uuids=existing_repository_uuids,
-                    status="DONE",
-                )
-
-                self.stdout.write(
-                    f"There are {len(orphaned_documents)} "
-                    "orphaned documents.\n"
+            if dataset_rf:
+                dspace = DSpaceService(
+                    base_url=RI_BASE_URL,
+                    base_url_rest=RI_BASE_URL_REST,
+                    proxies=proxies,
+                    timeout=REQUEST_TIMEOUT,
+                    retries=RETRIES,
                 )
-
-                if orphaned_documents:
-                    self.stdout.write(
-                        "Registering orphaned documents in database..."
-                    )
-                    orphaned_metadata_map = {}
-                    for (
-                        ragflow_id,
-                        uuid,
-                    ) in orphaned_documents.items():
-                        metadata = get_item_details(
-                            base_url_rest=RI_BASE_URL_REST,
-                            item_id=uuid,
-                            proxies=proxies,
-                        )
-                        orphaned_metadata_map[ragflow_id] = metadata
-                    self._create_documents(orphaned_metadata_map)
+                if run.mode == "I":
                     self.stdout.write(
-                        f"Successfully registered {len(orphaned_documents)} "
-                        "orphaned documents"
+                        f"Ingesting items modified since {run.since}"
                     )
-                    display_final_summary(
-                        dataset=dataset_rf, metadata_map=orphaned_metadata_map
+                    self._ingest_changed_items(
+                        run,
+                        dspace,
+                        max_workers=MAX_CONCURRENT_TASKS,
+                        retries=RETRIES,
+                        batch_size=BATCH_SIZE_DB,
                     )
+                else:
+                    # Get existing repository UUIDs from database
                     existing_repository_uuids = (
                         self._get_existing_repository_uuids()
                     )
                     self.stdout.write(
-                        f"Found {len(existing_repository_uuids)} "
-                        "existing documents in database"
+                        f"Found {len(existing_repository_uuids)} existing "
+                        "documents in database"
                     )
+                    self.stdout.write(f"Limit items: {LIMIT_ITEMS}")
 
-                metadata_map = process_items_in_parallel(
-                    base_url=RI_BASE_URL,
-                    base_url_rest=RI_BASE_URL_REST,
+                    # recover orphaned documents mechanism
+                    orphaned_documents = get_orphaned_documents(
+                        dataset=dataset_rf,
+                        existing_uuids=existing_repository_uuids,
+                        status="DONE",
+                    )
+
+                    self.stdout.write(
+                        f"There are {len(orphaned_documents)} "
+                        "orphaned documents.\n"
+                    )
+                    self.counts["seen"] += len(orphaned_documents)
+
+                    if orphaned_documents:
+                        self.stdout.write(
+                            "Registering orphaned documents in database..."
+                        )
+                        orphaned_metadata_map = (
+                            self._register_orphaned_documents(
+                                orphaned_documents,
+                                dspace,
+                                max_workers=MAX_CONCURRENT_TASKS,
+                                retries=RETRIES,
+                                batch_size=BATCH_SIZE_DB,
+                            )
+                        )
+                        self.stdout.write(
+                            f"Successfully registered "
+                            f"{len(orphaned_metadata_map)} of "
+                            f"{len(orphaned_documents)} orphaned documents"
+                        )
+                        display_final_summary(
+                            dataset=dataset_rf,
+                            metadata_map=orphaned_metadata_map,
+                        )
+                        existing_repository_uuids = (
+                            self._get_existing_repository_uuids()
+                        )
+                        self.stdout.write(
+                            f"Found {len(existing_repository_uuids)} "
+                            "existing documents in database"
+                        )
+
+                    self._ingest_changed_items(
+                        run,
+                        dspace,
+                        max_workers=MAX_CONCURRENT_TASKS,
+                        retries=RETRIES,
+                        batch_size=BATCH_SIZE_DB,
+                        limit=LIMIT_ITEMS,
+                    )
+
+                # Carry the items of this run, including those checkpointed
+                # before an interruption, on to parsing
+                self._advance_items(
+                    run,
+                    dspace,
+                    dataset=dataset_rf,
                     folder_path=FOLDER_PATH,
-                    ragflow_dataset=dataset_rf,
-                    document_ids=document_ids,
-                    max_concurrent_tasks=MAX_CONCURRENT_TASKS,
-                    limit_items=LIMIT_ITEMS,
-                    exclude_uuids=existing_repository_uuids,
-                    proxies=proxies,
+                    max_workers=MAX_CONCURRENT_TASKS,
+                    streamer=partial(
+                        self._stream_item,
+                        dspace,
+                        ragflow_api,
+                        DATASET_ID,
+                        spool_size=options["spool_size"],
+                    ) if ragflow_api else None,
                 )
+                metadata_map = dict(
+                    run.items.filter(state="parsing").values_list(
+                        "ragflow_id", "metadata"
+                    )
+                )
+                document_ids = list(metadata_map)
             else:
                 raise CommandError(f"Dataset {DATASET_ID} is NONE")
 
@@ -219,21 +425,38 @@ class Command(BaseCommand):
 
             # Filter metadata_map to only include documents with DONE status
             metadata_map_done = filter_done_documents(dataset_rf, metadata_map)
+            self.counts["errors"] += len(metadata_map) - len(metadata_map_done)
             self.stdout.write(
                 f"Documents with DONE status: {len(metadata_map_done)} out\
                  of {len(metadata_map)}"
             )
 
             # populate metadata in Document table
-            self._create_documents(metadata_map_done)
-
-            # get list of processed files (status DONE)
-            processed_file_names = get_files_from_metadata(metadata_map_done)
+            self._create_documents(
+                metadata_map_done, batch_size=BATCH_SIZE_DB
+            )
+            run.items.filter(ragflow_id__in=list(metadata_map_done)).update(
+                state="done", error="", updated_at=timezone.now()
+            )
 
-            # remove files
-            remove_temp_pdf(
-                folder_path=FOLDER_PATH,
-                processed_file_names=processed_file_names,
+            # Remove the failed/canceled documents of this run, so their
+            # items are uploaded again when they are retried
+            failed_documents_ids = [
+                ragflow_id
+                for ragflow_id in metadata_map
+                if ragflow_id not in metadata_map_done
+            ]
+            if failed_documents_ids:
+                self.stdout.write(
+                    f"Removing {len(failed_documents_ids)} documents "
+                    "that did not finish parsing."
+                )
+                dataset_rf.delete_documents(ids=failed_documents_ids)
+            run.items.filter(state="parsing").update(
+                state="failed",
+                ragflow_id="",
+                error="Parsing did not finish",
+                updated_at=timezone.now(),
             )
 
             # Final document status
@@ -244,6 +467,375 @@ class Command(BaseCommand):
         except Exception as e:
             raise CommandError(f"Error during ingest process: {e}")
 
+    def _fetch_item_details(
+        self, dspace: DSpaceService, uuid: str, retries: int
+    ) -> dict:
+        """
+        Fetch the metadata of a repository item, retrying failed requests
+        with exponential backoff.
+        """
+        for attempt in range(retries + 1):
+            try:
+                metadata = dspace.item_details(uuid)
+                if not metadata:
+                    raise ValueError("empty item details")
+                return metadata
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2**attempt)
+
+    def _register_orphaned_documents(
+        self,
+        orphaned_documents: dict,
+        dspace: DSpaceService,
+        max_workers: int,
+        retries: int,
+        batch_size: int = BATCH_SIZE,
+    ) -> dict:
+        """
+        Fetch the metadata of the orphaned documents with up to
+        `max_workers` concurrent requests and register them in batches of
+        `batch_size` as they arrive. Return the fetched metadata by
+        RAGFlow ID.
+        """
+        metadata_map = {}
+        pending = {}
+        fetched = self._fetch_concurrently(
+            lambda uuid: self._fetch_item_details(dspace, uuid, retries),
+            orphaned_documents,
+            max_workers=max_workers,
+            desc="Fetching orphaned metadata",
+        )
+        for ragflow_id, metadata in fetched:
+            pending[ragflow_id] = metadata
+            if len(pending) >= batch_size:
+                self._create_documents(pending, batch_size=batch_size)
+                metadata_map.update(pending)
+                pending = {}
+
+        if pending:
+            self._create_documents(pending, batch_size=batch_size)
+            metadata_map.update(pending)
+        return metadata_map
+
+    def _fetch_concurrently(
+        self, fetch, items: dict, max_workers: int, desc: str, on_error=None
+    ):
+        """
+        Call `fetch` on the values of `items` with up to `max_workers`
+        concurrent calls and yield `(key, result)` as they complete.
+        Failed calls are reported, passed to `on_error` and skipped.
+        """
+        with ThreadPoolExecutor(max_workers=max(max_workers, 1)) as pool:
+            futures = {
+                pool.submit(fetch, value): (key, value)
+                for key, value in items.items()
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc=desc
+            ):
+                key, value = futures[future]
+                try:
+                    yield key, future.result()
+                except Exception as e:
+                    self.counts["errors"] += 1
+                    self.stderr.write(f"Error fetching item {value}: {e}")
+                    if on_error:
+                        on_error(key, e)
+
+    def _ingest_changed_items(
+        self,
+        run,
+        dspace: DSpaceService,
+        max_workers: int,
+        retries: int,
+        batch_size: int = BATCH_SIZE,
+        limit=None,
+    ) -> None:
+        """
+        Checkpoint the items created, modified or withdrawn in the RI since
+        the watermark of `run`, plus the items that failed in the run that
+        set it. Known items only get their metadata refreshed, so a changed
+        PDF is not uploaded again; withdrawn ones are restricted and new
+        ones are left `discovered`. Items the run already checkpointed are
+        skipped, and items whose metadata cannot be fetched are
+        checkpointed as failed.
+
+        A run without a watermark lists every item and only checkpoints
+        the ones not in the database, at most `limit` of them.
+        """
+        from core.models import Document, IngestItem
+
+        def uri(handle):
+            return f"{dspace.base_url}/xmlui/handle/{handle}"
+
+        # Items whose metadata could not be fetched are fetched again
+        recorded = set(
+            run.items.exclude(repository_id="")
+            .values_list("handle", flat=True)
+        )
+        handles = {}
+        withdrawn = []
+        for handle, deleted in dspace.changed_items(run.since):
+            if deleted:
+                withdrawn.append(uri(handle))
+            elif handle not in recorded:
+                handles[handle] = handle
+
+        if run.since is not None:
+            retried = (
+                IngestItem.objects.filter(
+                    run__status="S",
+                    run__watermark=run.since,
+                    state="failed",
+                )
+                .exclude(handle="")
+                .values_list("handle", flat=True)
+            )
+            for handle in retried:
+                if handle not in recorded:
+                    handles[handle] = handle
+
+        if run.since is None:
+            for chunk in batched(list(handles), batch_size):
+                for known in Document.objects.filter(
+                    repository_uri__in=[uri(handle) for handle in chunk]
+                ).values_list("repository_uri", flat=True):
+                    handles.pop(known.rsplit("/handle/", 1)[-1], None)
+        if limit is not None:
+            handles = dict(islice(handles.items(), limit))
+        self.counts["seen"] += len(handles) + len(withdrawn)
+        self.stdout.write(
+            f"Found {len(handles)} modified and {len(withdrawn)} withdrawn "
+            "items"
+        )
+
+        if withdrawn:
+            Document.objects.filter(repository_uri__in=withdrawn).update(
+                status="R", updated_at=timezone.now()
+            )
+
+        def fetch(handle):
+            uuid = dspace.item_by_handle(handle)["uuid"]
+            return self._fetch_item_details(dspace, uuid, retries)
+
+        def failed(handle, error):
+            IngestItem.objects.update_or_create(
+                run=run,
+                repository_id="",
+                handle=handle,
+                defaults={"state": "failed", "error": str(error)},
+            )
+
+        pending = []
+        fetched = self._fetch_concurrently(
+            fetch,
+            handles,
+            max_workers=max_workers,
+            desc="Fetching metadata",
+            on_error=failed,
+        )
+        for _, metadata in fetched:
+            pending.append(metadata)
+            if len(pending) >= batch_size:
+                self._record_items(run, pending)
+                pending = []
+        if pending:
+            self._record_items(run, pending)
+
+    def _record_items(self, run, items: list) -> None:
+        """
+        Update the documents of the `items` already in the database and
+        checkpoint the others as discovered.
+        """
+        from core.models import Document, IngestItem
+
+        by_uuid = {item.get("uuid", ""): item for item in items}
+        known = dict(
+            Document.objects.filter(repository_id__in=by_uuid)
+            .values_list("repository_id", "id")
+        )
+        if known:
+            self._create_documents(
+                {known[uuid]: by_uuid[uuid] for uuid in known},
+                batch_size=len(known),
+            )
+        IngestItem.objects.bulk_create(
+            [
+                IngestItem(
+                    run=run,
+                    repository_id=uuid,
+                    handle=item.get("handle", ""),
+                    ragflow_id=known.get(uuid, ""),
+                    state="done" if uuid in known else "discovered",
+                    metadata=item,
+                )
+                for uuid, item in by_uuid.items()
+            ],
+            ignore_conflicts=True,
+        )
+        run.items.filter(
+            repository_id="",
+            handle__in=[item.get("handle", "") for item in items],
+        ).delete()
+
+    def _advance_items(
+        self,
+        run,
+        dspace: DSpaceService,
+        dataset,
+        folder_path: str,
+        max_workers: int,
+        streamer=None,
+    ) -> None:
+        """
+        Move the unfinished items of `run` forward to parsing: download
+        the items with no file, upload the downloaded ones and start
+        parsing the uploaded ones. Every step is checkpointed, so nothing
+        is downloaded or uploaded twice.
+
+        With a `streamer`, items with no file are streamed straight to
+        RAGFlow instead and go from discovered to uploaded.
+        """
+        items = {
+            item.repository_id: item
+            for item in run.items.filter(
+                state__in=["discovered", "downloaded", "uploaded", "failed"]
+            ).exclude(repository_id="")
+        }
+
+        def path(uuid):
+            return os.path.join(folder_path, f"{uuid}.pdf")
+
+        def failed(uuid, error):
+            self._checkpoint(items[uuid], "failed", error=str(error))
+
+        downloads = {
+            uuid: uuid
+            for uuid, item in items.items()
+            if not item.ragflow_id and not os.path.exists(path(uuid))
+        }
+        if streamer:
+            streamed = self._fetch_concurrently(
+                lambda uuid: streamer(uuid, items[uuid].metadata),
+                downloads,
+                max_workers=max_workers,
+                desc="Streaming documents",
+                on_error=failed,
+            )
+            for uuid, ragflow_id in streamed:
+                self._checkpoint(
+                    items[uuid], "uploaded", ragflow_id=ragflow_id
+                )
+        else:
+            downloaded = self._fetch_concurrently(
+                lambda uuid: self._download_item(
+                    dspace, items[uuid].metadata, path(uuid)
+                ),
+                downloads,
+                max_workers=max_workers,
+                desc="Downloading documents",
+                on_error=failed,
+            )
+            for uuid, _ in downloaded:
+                self._checkpoint(items[uuid], "downloaded")
+
+        uploads = {
+            uuid: uuid
+            for uuid, item in items.items()
+            if not item.ragflow_id and os.path.exists(path(uuid))
+        }
+        uploaded = self._fetch_concurrently(
+            lambda uuid: self._upload_item(dataset, uuid, path(uuid)),
+            uploads,
+            max_workers=max_workers,
+            desc="Uploading documents",
+            on_error=failed,
+        )
+        for uuid, ragflow_id in uploaded:
+            self._checkpoint(items[uuid], "uploaded", ragflow_id=ragflow_id)
+            os.remove(path(uuid))
+
+        document_ids = [
+            item.ragflow_id for item in items.values() if item.ragflow_id
+        ]
+        if document_ids:
+            dataset.async_parse_documents(document_ids)
+            run.items.filter(ragflow_id__in=document_ids).update(
+                state="parsing", error="", updated_at=timezone.now()
+            )
+
+    def _checkpoint(self, item, state: str, error: str = "", **fields):
+        """
+        Persist the new state of an ingest item.
+        """
+        item.state = state
+        item.error = error
+        for field, value in fields.items():
+            setattr(item, field, value)
+        item.save(update_fields=["state", "error", "updated_at", *fields])
+
+    def _pdf_bitstream(self, item) -> dict:
+        """
+        Return the PDF bitstream of a repository item.
+        """
+        bitstream = next(
+            (
+                bitstream
+                for bitstream in item.get("bitstreams") or []
+                if bitstream.get("mimeType") == "application/pdf"
+                and bitstream.get("bundleName", "ORIGINAL") == "ORIGINAL"
+            ),
+            None,
+        )
+        if bitstream is None:
+            raise ValueError(f"no PDF bitstream in item {item.get('uuid')}")
+        return bitstream
+
+    def _download_item(self, dspace: DSpaceService, item, path: str):
+        """
+        Download the PDF of a repository item to `path`.
+        """
+        dspace.download_bitstream(self._pdf_bitstream(item)["uuid"], path)
+
+    def _stream_item(
+        self,
+        dspace: DSpaceService,
+        ragflow: RAGFlowService,
+        dataset_id: str,
+        uuid: str,
+        item,
+        spool_size: int = SPOOL_SIZE,
+    ) -> str:
+        """
+        Copy the PDF of a repository item to `dataset_id` through a buffer
+        of `spool_size` bytes in memory, spilling to a temporary file only
+        beyond it, and return its RAGFlow ID.
+        """
+        bitstream = self._pdf_bitstream(item)
+        with tempfile.SpooledTemporaryFile(max_size=spool_size) as buffer:
+            dspace.copy_bitstream(bitstream["uuid"], buffer)
+            response = ragflow.upload_document(
+                dataset_id, f"{uuid}.pdf", buffer
+            )
+        if response.get("code"):
+            raise ValueError(response.get("message"))
+        return response["data"][0]["id"]
+
+    def _upload_item(self, dataset, uuid: str, path: str) -> str:
+        """
+        Upload a downloaded PDF to `dataset` and return its RAGFlow ID.
+        """
+        # Uploads are named after the item so orphan recovery can map
+        # them back to the repository
+        with open(path, "rb") as f:
+            documents = dataset.upload_documents([{
+                "display_name": f"{uuid}.pdf",
+                "blob": f.read(),
+            }])
+        return documents[0].id
+
     def _get_existing_repository_uuids(self) -> set[str]:
         """
         Get all existing repository IDs (UUIDs) from the Document table.
@@ -296,60 +888,124 @@ class Command(BaseCommand):
 
         return "R"
 
-    def _create_documents(self, metadata_map: dict) -> None:
+    def _document(self, ragflow_id: str, item_metadata: dict, base_url):
         """
-        Create Document records in database.
+        Build the Document record of a RAGFlow document from its metadata.
         """
-        try:
-            from core.models import Document
+        from core.models import Document
+
+        # Documents are upserted by repository ID, so it is required
+        uuid = item_metadata.get("uuid")
+        if not uuid:
+            raise ValueError("item has no repository UUID")
+        handle = item_metadata.get("handle", "")
+        return Document(
+            id=ragflow_id,
+            title=item_metadata.get("name", "Unknown Title"),
+            repository_id=uuid,
+            repository_uri=(
+                f"{base_url}/xmlui/handle/{handle}" if handle else ""
+            ),
+            status=self._determine_document_status(
+                item_metadata=item_metadata
+            ),
+        )
+
+    def _upsert_documents(self, documents: list) -> set[str]:
+        """
+        Insert or update `documents` by repository ID in one statement and
+        return the repository IDs that were created.
+        """
+        from core import rollups
+        from core.models import Document
+
+        keys = [document.repository_id for document in documents]
+        with transaction.atomic(), rollups.paused():
+            existing = dict(
+                Document.objects.select_for_update()
+                .filter(repository_id__in=keys)
+                .values_list("repository_id", "title")
+            )
+            rollups.document_titles_changed(
+                [(title,) for title in existing.values()], -1
+            )
+            Document.objects.bulk_create(
+                documents,
+                update_conflicts=True,
+                unique_fields=["repository_id"],
+                update_fields=UPSERT_FIELDS,
+            )
+            rollups.instances_changed(Document, documents, 1)
+        return set(keys) - set(existing)
 
+    def _create_documents(
+        self, metadata_map: dict, batch_size: int = BATCH_SIZE
+    ) -> None:
+        """
+        Create or update Document records in database, `batch_size` at a
+        time. A failing batch is retried one document at a time so errors
+        are reported per document.
+        """
+        try:
             created_count = 0
             update_count = 0
             error_count = 0
 
             RI_BASE_URL = os.getenv("RI_BASE_URL")
 
+            # The last metadata of a repository item wins, as it did when
+            # the documents were saved one by one.
+            documents = {}
             for ragflow_id, item_metadata in metadata_map.items():
                 try:
-                    title = item_metadata.get("name", "Unknown Title")
-                    repository_id = item_metadata.get("uuid", "")
-                    handle = item_metadata.get("handle", "")
-
-                    if handle:
-                        repository_uri = (
-                            f"{RI_BASE_URL}/xmlui/handle/{handle}"
-                            if handle
-                            else ""
-                        )
-                    else:
-                        repository_uri = ""
-
-                    status = self._determine_document_status(
-                        item_metadata=item_metadata
+                    document = self._document(
+                        ragflow_id, item_metadata, RI_BASE_URL
                     )
-
-                    _, created = Document.objects.update_or_create(
-                        repository_id=repository_id,
-                        defaults={
-                            "id": ragflow_id,
-                            "title": title,
-                            "repository_uri": repository_uri,
-                            "status": status,
-                        },
-                    )
-
-                    if created:
-                        created_count += 1
-                        self.stdout.write(f"Created document: {title}")
-                    else:
-                        update_count += 1
-                        self.stdout.write(f"Updated document: {title}")
+                    documents.pop(document.repository_id, None)
+                    documents[document.repository_id] = document
                 except Exception as e:
                     error_count += 1
                     self.stderr.write(
                         f"Error processing document rf_id: {ragflow_id}: {e}"
                     )
 
+            documents = list(documents.values())
+            batch_size = max(batch_size, 1)
+            for start in range(0, len(documents), batch_size):
+                batch = documents[start:start + batch_size]
+                try:
+                    results = [(batch, self._upsert_documents(batch))]
+                except Exception:
+                    results = []
+                    for document in batch:
+                        try:
+                            created = self._upsert_documents([document])
+                            results.append(([document], created))
+                        except Exception as e:
+                            error_count += 1
+                            self.stderr.write(
+                                "Error processing document rf_id: "
+                                f"{document.id}: {e}"
+                            )
+
+                for saved, created in results:
+                    for document in saved:
+                        if document.repository_id in created:
+                            created_count += 1
+                            self.stdout.write(
+                                f"Created document: {document.title}"
+                            )
+                        else:
+                            update_count += 1
+                            self.stdout.write(
+                                f"Updated document: {document.title}"
+                            )
+
+            self.counts.update(
+                created=created_count,
+                updated=update_count,
+                errors=error_count,
+            )
             self.stdout.write(
                 f"Successfully processed {len(metadata_map)} documents: "
                 f"{created_count} created, {update_count} updated,"
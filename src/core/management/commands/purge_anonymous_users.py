@@ -0,0 +1,204 @@
+"""
+Django command to delete anonymous users that have been inactive for a
+number of days, together with their data.
+"""
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from core import rollups
+from core.models import (
+    AuthoredDocument,
+    ChatSession,
+    SatisfactionSurveyResponse,
+    SavedDocument,
+    User,
+    UserProfile,
+)
+from core.services.ragflow_service import RAGFlowService
+
+
+# Children are deleted explicitly, one statement per table, before the
+# users themselves so no single statement cascades through every table.
+DELETE_ORDER = [
+    (Token, 'user_id'),
+    (ChatSession, 'user_id'),
+    (SavedDocument, 'user_id'),
+    (AuthoredDocument, 'author_id'),
+    (SatisfactionSurveyResponse, 'user_id'),
+    (UserProfile, 'user_id'),
+]
+
+
+def stale_anonymous_users(cutoff):
+    """
+    Return anonymous users created before `cutoff` with no activity since.
+    """
+    def active(model, user_field, timestamp_field):
+        return Exists(model.objects.filter(**{
+            user_field: OuterRef('pk'),
+            f'{timestamp_field}__gte': cutoff,
+        }))
+
+    return User.objects.filter(
+        is_anonymous=True,
+        created_at__lt=cutoff,
+    ).exclude(
+        Q(last_login__gte=cutoff)
+        | active(Token, 'user', 'created')
+        | active(ChatSession, 'user', 'updated_at')
+        | active(SavedDocument, 'user', 'created_at')
+        | active(SatisfactionSurveyResponse, 'user', 'completed_at')
+        | active(UserProfile, 'user', 'updated_at')
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete anonymous users inactive for --days days, in batches. "
+        "Their RAGFlow chat sessions are deleted first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="Delete users with no activity in this many days "
+                 "(default: 30).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Users deleted per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.5,
+            help="Seconds to pause between batches (default: 0.5).",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report how many users would be deleted.",
+        )
+        parser.add_argument(
+            "--skip-ragflow",
+            action="store_true",
+            help="Do not delete the chat sessions in RAGFlow.",
+        )
+
+    def handle(self, *args, **options):
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        cutoff = timezone.now() - timedelta(days=options["days"])
+        stale = stale_anonymous_users(cutoff)
+
+        if options["dry_run"]:
+            sessions = ChatSession.objects.filter(user__in=stale).count()
+            self.stdout.write(
+                f"Would delete {stale.count()} anonymous users "
+                f"and {sessions} chat sessions."
+            )
+            return
+
+        ragflow = None if options["skip_ragflow"] else RAGFlowService()
+        deleted = skipped = batches = 0
+        last_id = 0
+        start = time.perf_counter()
+
+        while True:
+            ids = list(
+                stale.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:options["batch_size"]]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            batches += 1
+
+            if ragflow and not self.delete_sessions(ragflow, ids):
+                skipped += len(ids)
+                continue
+
+            batch_start = time.perf_counter()
+            with transaction.atomic(), rollups.paused():
+                for model, user_field in DELETE_ORDER:
+                    self.delete(
+                        model.objects.filter(**{f"{user_field}__in": ids})
+                    )
+                count = self.delete(User.objects.filter(pk__in=ids))
+            deleted += count
+
+            self.stdout.write(
+                f"Batch {batches}: deleted {count} users in "
+                f"{time.perf_counter() - batch_start:.2f}s"
+            )
+            time.sleep(options["sleep"])
+
+        elapsed = time.perf_counter() - start
+        rate = deleted / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {deleted} anonymous users in {batches} batches "
+            f"({elapsed:.2f}s, {rate:.1f} users/s)."
+        ))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Skipped {skipped} users whose RAGFlow sessions could "
+                f"not be deleted."
+            ))
+
+    def delete(self, queryset):
+        """
+        Delete `queryset`, applying its statistics rollup deltas in one go
+        instead of once per row. Return the number of rows deleted.
+        """
+        if queryset.model in rollups.SOURCES:
+            rollups.queryset_changed(queryset, -1)
+        return queryset.delete()[1].get(queryset.model._meta.label, 0)
+
+    def delete_sessions(self, ragflow, user_ids):
+        """
+        Delete the RAGFlow sessions of `user_ids` with one call per
+        assistant. Return False if any call failed.
+        """
+        sessions = defaultdict(list)
+        for assistant_id, session_id in ChatSession.objects.filter(
+            user_id__in=user_ids
+        ).values_list("assistant_id", "session_id"):
+            sessions[assistant_id].append(session_id)
+
+        for assistant_id, session_ids in sessions.items():
+            try:
+                response = ragflow.delete_session(
+                    assistant_id=assistant_id,
+                    session_ids=session_ids
+                )
+            except requests.RequestException as e:
+                self.stderr.write(
+                    f"Failed to delete sessions of assistant "
+                    f"{assistant_id}: {e}"
+                )
+                return False
+
+            if response.get("code") != 0:
+                self.stderr.write(
+                    f"Failed to delete sessions of assistant "
+                    f"{assistant_id}: {response.get('message')}"
+                )
+                return False
+
+        return True
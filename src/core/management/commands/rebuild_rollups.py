@@ -0,0 +1,23 @@
+"""
+Django command to recompute the statistics rollups from the base tables.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily statistics rollups from the base tables. "
+        "Run it after writes that bypass the model signals, such as raw "
+        "SQL or queryset updates."
+    )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups in {time.perf_counter() - start:.2f}s."
+        ))
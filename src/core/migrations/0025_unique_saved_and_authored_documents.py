@@ -0,0 +1,38 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_document_repository_id'),
+    ]
+
+    operations = [
+        # Keep the oldest row of any duplicate pair before adding the
+        # unique constraints.
+        migrations.RunSQL(
+            sql="""
+                DELETE FROM core_authoreddocument a
+                USING core_authoreddocument b
+                WHERE a.author_id = b.author_id
+                  AND a.document_id = b.document_id
+                  AND a.id > b.id;
+                DELETE FROM core_saveddocument a
+                USING core_saveddocument b
+                WHERE a.user_id = b.user_id
+                  AND a.document_id = b.document_id
+                  AND a.id > b.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+        migrations.AddConstraint(
+            model_name='authoreddocument',
+            constraint=models.UniqueConstraint(fields=('author', 'document'), name='unique_authored_document'),
+        ),
+        migrations.AddConstraint(
+            model_name='saveddocument',
+            constraint=models.UniqueConstraint(fields=('user', 'document'), name='unique_saved_document'),
+        ),
+    ]
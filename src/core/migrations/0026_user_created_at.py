@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_unique_saved_and_authored_documents'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='created_at',
+            field=models.DateTimeField(
+                auto_now_add=True,
+                default=django.utils.timezone.now
+            ),
+            preserve_default=False,
+        ),
+    ]
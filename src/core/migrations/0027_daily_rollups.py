@@ -0,0 +1,67 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:27
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_rollups(apps, schema_editor):
+    from core.rollups import rebuild_daily_counts
+
+    rebuild_daily_counts(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_user_created_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyChatCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField(unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyAuthorSaveCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('author', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'author'), name='unique_daily_author_save_count', nulls_distinct=False)],
+            },
+        ),
+        migrations.CreateModel(
+            name='DailyDocumentSaveCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('count', models.IntegerField(default=0)),
+                ('document', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.document')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('day', 'document'), name='unique_daily_document_save_count', nulls_distinct=False)],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserSegmentCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('education_level', models.CharField(max_length=255)),
+                ('is_active', models.BooleanField()),
+                ('count', models.IntegerField(default=0)),
+                ('field_of_study', models.ForeignKey(db_constraint=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.fieldofstudy')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('field_of_study', 'education_level', 'is_active'), name='unique_user_segment_count', nulls_distinct=False)],
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
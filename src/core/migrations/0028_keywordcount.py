@@ -0,0 +1,34 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:33
+
+from django.db import migrations, models
+
+
+def backfill_keyword_counts(apps, schema_editor):
+    from core.rollups import rebuild_keyword_counts
+
+    rebuild_keyword_counts(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='KeywordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=255, unique=True)),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-count'], name='keyword_count_idx')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_keyword_counts,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_survey_ratings(apps, schema_editor):
+    from core.models import extract_ratings
+
+    SatisfactionSurveyResponse = apps.get_model(
+        'core', 'SatisfactionSurveyResponse'
+    )
+    SurveyRating = apps.get_model('core', 'SurveyRating')
+
+    ratings = []
+    for pk, survey in SatisfactionSurveyResponse.objects.values_list(
+        'pk', 'survey'
+    ).iterator(chunk_size=2000):
+        ratings.extend(
+            SurveyRating(response_id=pk, question=question, value=value)
+            for question, value in extract_ratings(survey).items()
+        )
+        if len(ratings) >= 2000:
+            SurveyRating.objects.bulk_create(ratings)
+            ratings = []
+    SurveyRating.objects.bulk_create(ratings)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_keywordcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SurveyRating',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question', models.CharField(max_length=255)),
+                ('value', models.FloatField()),
+                ('response', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ratings', to='core.satisfactionsurveyresponse')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'value'], name='survey_rating_question_idx')],
+                'constraints': [models.UniqueConstraint(fields=('response', 'question'), name='unique_survey_rating')],
+            },
+        ),
+        migrations.RunPython(
+            backfill_survey_ratings,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.15 on 2026-10-19 04:56
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build the indexes without blocking writes to the survey table.
+    atomic = False
+
+    dependencies = [
+        ('core', '0029_surveyrating'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='satisfactionsurveyresponse',
+            index=models.Index(fields=['version', 'completed_at'], name='survey_version_completed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='satisfactionsurveyresponse',
+            index=models.Index(fields=['completed_at', 'id'], name='survey_completed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='satisfactionsurveyresponse',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['survey'], name='survey_json_path_idx', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:00
+
+from django.db import migrations, models
+
+
+# Values stored for documents whose repository item is unknown: 0024 gave
+# the existing documents 'test' and the ingest wrote '' for items without
+# a UUID. They do not identify an item, so they become NULL.
+PLACEHOLDER_REPOSITORY_IDS = ['', 'test']
+
+
+def merge_duplicate_documents(apps, schema_editor):
+    """
+    Clear the placeholder repository IDs and keep the most recently
+    updated document of every repository item, moving the saves and
+    authorships of its duplicates onto it.
+    """
+    from core.rollups import rebuild
+
+    Document = apps.get_model('core', 'Document')
+    SavedDocument = apps.get_model('core', 'SavedDocument')
+    AuthoredDocument = apps.get_model('core', 'AuthoredDocument')
+
+    Document.objects.filter(
+        repository_id__in=PLACEHOLDER_REPOSITORY_IDS
+    ).update(repository_id=None)
+
+    duplicated = (
+        Document.objects.filter(repository_id__isnull=False)
+        .values('repository_id')
+        .annotate(total=models.Count('id'))
+        .filter(total__gt=1)
+        .values_list('repository_id', flat=True)
+    )
+    merged = False
+    for repository_id in duplicated:
+        kept, *duplicates = Document.objects.filter(
+            repository_id=repository_id
+        ).order_by('-updated_at', 'id').values_list('id', flat=True)
+        for duplicate in duplicates:
+            users = SavedDocument.objects.filter(
+                document_id=kept
+            ).values('user_id')
+            SavedDocument.objects.filter(
+                document_id=duplicate, user_id__in=users
+            ).delete()
+            SavedDocument.objects.filter(document_id=duplicate).update(
+                document_id=kept
+            )
+            authors = AuthoredDocument.objects.filter(
+                document_id=kept
+            ).values('author_id')
+            AuthoredDocument.objects.filter(
+                document_id=duplicate, author_id__in=authors
+            ).delete()
+            AuthoredDocument.objects.filter(document_id=duplicate).update(
+                document_id=kept
+            )
+        Document.objects.filter(id__in=duplicates).delete()
+        merged = True
+
+    if merged:
+        # Check the deferred foreign keys now, as the table cannot be
+        # altered below with pending trigger events
+        schema_editor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+        rebuild(apps)
+
+
+def restore_placeholder_repository_ids(apps, schema_editor):
+    Document = apps.get_model('core', 'Document')
+    Document.objects.filter(repository_id__isnull=True).update(
+        repository_id='test'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_survey_response_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='repository_id',
+            field=models.CharField(blank=True, max_length=255, null=True),
+        ),
+        migrations.RunPython(
+            merge_duplicate_documents,
+            restore_placeholder_repository_ids
+        ),
+        migrations.AlterField(
+            model_name='document',
+            name='repository_id',
+            field=models.CharField(
+                blank=True, max_length=255, null=True, unique=True
+            ),
+        ),
+    ]
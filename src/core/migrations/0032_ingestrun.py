@@ -0,0 +1,32 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:08
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_document_repository_id_unique'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mode', models.CharField(choices=[('F', 'Full'), ('I', 'Incremental')], default='F', max_length=1)),
+                ('status', models.CharField(choices=[('R', 'Running'), ('S', 'Succeeded'), ('F', 'Failed')], default='R', max_length=1)),
+                ('started_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('watermark', models.DateTimeField(blank=True, null=True)),
+                ('items_seen', models.IntegerField(default=0)),
+                ('documents_created', models.IntegerField(default=0)),
+                ('documents_updated', models.IntegerField(default=0)),
+                ('errors', models.IntegerField(default=0)),
+                ('message', models.TextField(blank=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['status', '-watermark'], name='ingest_run_watermark_idx')],
+            },
+        ),
+    ]
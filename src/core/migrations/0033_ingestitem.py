@@ -0,0 +1,37 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0032_ingestrun'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ingestrun',
+            name='since',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='IngestItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('repository_id', models.CharField(max_length=255)),
+                ('handle', models.CharField(blank=True, max_length=255)),
+                ('ragflow_id', models.CharField(blank=True, max_length=255)),
+                ('state', models.CharField(choices=[('discovered', 'Discovered'), ('downloaded', 'Downloaded'), ('uploaded', 'Uploaded'), ('parsing', 'Parsing'), ('done', 'Done'), ('failed', 'Failed')], default='discovered', max_length=10)),
+                ('metadata', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='core.ingestrun')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run', 'state'], name='ingest_item_state_idx')],
+                'constraints': [models.UniqueConstraint(fields=('run', 'repository_id'), name='unique_ingest_item')],
+            },
+        ),
+    ]
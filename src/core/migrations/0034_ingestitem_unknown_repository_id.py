@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-19 05:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_ingestitem'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='ingestitem',
+            name='unique_ingest_item',
+        ),
+        migrations.AddConstraint(
+            model_name='ingestitem',
+            constraint=models.UniqueConstraint(condition=models.Q(('repository_id', ''), _negated=True), fields=('run', 'repository_id'), name='unique_ingest_item'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.1.15 on 2026-10-19 06:10
+
+from django.db import migrations
+from django.db.models import F, Min, OuterRef, Subquery
+from django.db.models.functions import Least
+
+
+def backfill_user_created_at(apps, schema_editor):
+    """
+    Give the users that existed before 0026, which got the migration time
+    as `created_at`, the time of their first login or activity instead.
+    Users without any keep the migration time.
+    """
+    User = apps.get_model('core', 'User')
+
+    def first(app_label, model_name, user_field, timestamp_field):
+        model = apps.get_model(app_label, model_name)
+        return Subquery(
+            model.objects.filter(**{user_field: OuterRef('pk')})
+            .values(user_field)
+            .annotate(first=Min(timestamp_field))
+            .values('first')[:1]
+        )
+
+    # LEAST skips NULLs on PostgreSQL
+    first_seen = Least(
+        'last_login',
+        first('authtoken', 'Token', 'user', 'created'),
+        first('core', 'ChatSession', 'user', 'created_at'),
+        first('core', 'SavedDocument', 'user', 'created_at'),
+        first('core', 'AuthoredDocument', 'author', 'created_at'),
+        first('core', 'SatisfactionSurveyResponse', 'user', 'completed_at'),
+        first('core', 'UserProfile', 'user', 'created_at'),
+    )
+    User.objects.alias(first_seen=first_seen).filter(
+        first_seen__lt=F('created_at')
+    ).update(created_at=first_seen)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authtoken', '0002_auto_20160226_1747'),
+        ('core', '0034_ingestitem_unknown_repository_id'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            backfill_user_created_at,
+            migrations.RunPython.noop
+        ),
+    ]
@@ -2,8 +2,10 @@
 Database models.
 """
 
+import re
 import uuid
 
+from django.contrib.postgres.indexes import GinIndex
 from django.db import models
 
 from django.contrib.auth.models import (
@@ -101,6 +103,8 @@ class User(AbstractBaseUser, PermissionsMixin):
         null=True
     )
 
+    created_at = models.DateTimeField(auto_now_add=True)
+
     objects = UserManager()
 
     USERNAME_FIELD = 'email'  # Default field for authentication
@@ -129,7 +133,13 @@ class Document(models.Model):
     id = models.CharField(primary_key=True, max_length=255)
     title = models.CharField(max_length=255)
     repository_uri = models.URLField()
-    repository_id = models.CharField(max_length=255)
+    # NULL for documents registered before their repository item was known
+    repository_id = models.CharField(
+        max_length=255,
+        unique=True,
+        null=True,
+        blank=True
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -165,6 +175,14 @@ class AuthoredDocument(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['author', 'document'],
+                name='unique_authored_document',
+            ),
+        ]
+
     def __str__(self):
         return f'{self.author} - {self.document}'
 
@@ -185,6 +203,14 @@ class SavedDocument(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'document'],
+                name='unique_saved_document',
+            ),
+        ]
+
     def __str__(self):
         return f'{self.user} - {self.document}'
 
@@ -221,10 +247,82 @@ class SatisfactionSurveyResponse(models.Model):
     survey = models.JSONField()
     completed_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['version', 'completed_at'],
+                name='survey_version_completed_idx'
+            ),
+            models.Index(
+                fields=['completed_at', 'id'],
+                name='survey_completed_idx'
+            ),
+            # Serves containment (`survey__contains`) and JSON path queries
+            GinIndex(
+                fields=['survey'],
+                opclasses=['jsonb_path_ops'],
+                name='survey_json_path_idx'
+            ),
+        ]
+
     def __str__(self):
         return f'{self.user} - {self.completed_at.strftime('%Y-%m-%d')}'
 
 
+# Key of the survey object holding the numeric rating questions
+RATING_ITEMS_KEY = 'rating_items'
+
+NUMERIC_RE = re.compile(r'^\s*-?[0-9]+(\.[0-9]+)?\s*$')
+
+
+def extract_ratings(survey):
+    """
+    Return `{question: value}` for the numeric ratings of a survey.
+    Ratings stored as plain numeric strings are included.
+    """
+    items = survey.get(RATING_ITEMS_KEY) if isinstance(survey, dict) else None
+    if not isinstance(items, dict):
+        return {}
+
+    ratings = {}
+    for question, value in items.items():
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            ratings[question] = float(value)
+        elif isinstance(value, str) and NUMERIC_RE.match(value):
+            ratings[question] = float(value)
+    return ratings
+
+
+class SurveyRating(models.Model):
+    """
+    Numeric rating of a survey response, extracted from its JSON.
+    """
+    response = models.ForeignKey(
+        SatisfactionSurveyResponse,
+        on_delete=models.CASCADE,
+        related_name='ratings'
+    )
+    question = models.CharField(max_length=255)
+    value = models.FloatField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['response', 'question'],
+                name='unique_survey_rating',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['question', 'value'],
+                name='survey_rating_question_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.response_id} - {self.question}: {self.value}'
+
+
 class UserProfile(models.Model):
     """
     User profile model.
@@ -240,3 +338,205 @@ class UserProfile(models.Model):
 
     def __str__(self):
         return f'{self.user} profile - {self.created_at.strftime('%Y-%m-%d')}'
+
+
+class DailyChatCount(models.Model):
+    """
+    Rollup of chat sessions created per day.
+    """
+    day = models.DateField(unique=True)
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.day}: {self.count}'
+
+
+class DailyDocumentSaveCount(models.Model):
+    """
+    Rollup of saved documents per document and day.
+    """
+    day = models.DateField()
+    document = models.ForeignKey(
+        Document,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'document'],
+                name='unique_daily_document_save_count',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.day} - {self.document_id}: {self.count}'
+
+
+class DailyAuthorSaveCount(models.Model):
+    """
+    Rollup of saves of authored documents per author and day.
+    """
+    day = models.DateField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['day', 'author'],
+                name='unique_daily_author_save_count',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.day} - {self.author_id}: {self.count}'
+
+
+class UserSegmentCount(models.Model):
+    """
+    Rollup of users per field of study, education level and activity.
+    """
+    field_of_study = models.ForeignKey(
+        FieldOfStudy,
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        null=True,
+        related_name='+'
+    )
+    education_level = models.CharField(max_length=255)
+    is_active = models.BooleanField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['field_of_study', 'education_level', 'is_active'],
+                name='unique_user_segment_count',
+                nulls_distinct=False,
+            ),
+        ]
+
+    def __str__(self):
+        return (
+            f'{self.field_of_study_id} - {self.education_level} - '
+            f'{self.is_active}: {self.count}'
+        )
+
+
+class KeywordCount(models.Model):
+    """
+    Rollup of keyword occurrences across document titles.
+    """
+    word = models.CharField(max_length=255, unique=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-count'], name='keyword_count_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.word}: {self.count}'
+
+
+class IngestRun(models.Model):
+    """
+    Run of the ingest pipeline from the RI to RAGFlow.
+    """
+    MODES = {
+        'F': 'Full',
+        'I': 'Incremental',
+    }
+    STATUSES = {
+        'R': 'Running',
+        'S': 'Succeeded',
+        'F': 'Failed',
+    }
+
+    mode = models.CharField(max_length=1, choices=MODES, default='F')
+    status = models.CharField(max_length=1, choices=STATUSES, default='R')
+    started_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    # Watermark an incremental run started from
+    since = models.DateTimeField(null=True, blank=True)
+    # Items modified before the watermark were ingested by this run
+    watermark = models.DateTimeField(null=True, blank=True)
+    items_seen = models.IntegerField(default=0)
+    documents_created = models.IntegerField(default=0)
+    documents_updated = models.IntegerField(default=0)
+    errors = models.IntegerField(default=0)
+    message = models.TextField(blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['status', '-watermark'],
+                name='ingest_run_watermark_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.get_mode_display()} run {self.started_at}'
+
+
+class IngestItem(models.Model):
+    """
+    Checkpoint of a repository item through an ingest run.
+    """
+    STATES = {
+        'discovered': 'Discovered',
+        'downloaded': 'Downloaded',
+        'uploaded': 'Uploaded',
+        'parsing': 'Parsing',
+        'done': 'Done',
+        'failed': 'Failed',
+    }
+
+    run = models.ForeignKey(
+        IngestRun,
+        on_delete=models.CASCADE,
+        related_name='items'
+    )
+    repository_id = models.CharField(max_length=255)
+    handle = models.CharField(max_length=255, blank=True)
+    ragflow_id = models.CharField(max_length=255, blank=True)
+    state = models.CharField(
+        max_length=10,
+        choices=STATES,
+        default='discovered'
+    )
+    metadata = models.JSONField(default=dict)
+    error = models.TextField(blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Items whose metadata could not be fetched have no ID yet
+            models.UniqueConstraint(
+                fields=['run', 'repository_id'],
+                condition=~models.Q(repository_id=''),
+                name='unique_ingest_item',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['run', 'state'],
+                name='ingest_item_state_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.repository_id}: {self.state}'
@@ -0,0 +1,80 @@
+"""
+Custom renderers for the API.
+"""
+
+from typing import Iterable, Iterator
+
+import orjson
+
+from rest_framework.renderers import BaseRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Types orjson does not know natively (lazy strings, decimals,
+    querysets...) fall back to DRF's own encoder.
+    """
+    media_type = 'application/json'
+    format = 'json'
+    charset = None
+    options = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `data` into JSON bytes.
+        """
+        if data is None:
+            return b''
+
+        return orjson.dumps(
+            data,
+            default=JSONEncoder().default,
+            option=self.options
+        )
+
+
+class NDJSONRenderer(ORJSONRenderer):
+    """
+    Newline delimited JSON renderer: one JSON document per line.
+
+    Views stream large results by passing an iterable of rows to
+    `stream()`; `render()` handles regular, already built responses.
+    """
+    media_type = 'application/x-ndjson'
+    format = 'ndjson'
+
+    # Size of the chunks handed to the server
+    buffer_size = 64 * 1024
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render a list as one line per item, anything else as one line.
+        """
+        if data is None:
+            return b''
+        if not isinstance(data, list):
+            data = [data]
+        return b''.join(self.stream(data))
+
+    def stream(self, rows: Iterable) -> Iterator[bytes]:
+        """
+        Yield `rows` as NDJSON, in chunks of about `buffer_size` bytes.
+        """
+        default = JSONEncoder().default
+        buffer, size = [], 0
+        for row in rows:
+            line = orjson.dumps(
+                row,
+                default=default,
+                option=self.options | orjson.OPT_APPEND_NEWLINE
+            )
+            buffer.append(line)
+            size += len(line)
+            if size >= self.buffer_size:
+                yield b''.join(buffer)
+                buffer, size = [], 0
+        if buffer:
+            yield b''.join(buffer)
@@ -0,0 +1,306 @@
+"""
+Daily rollup tables backing the admin statistics.
+
+The rollups are kept current by the signal handlers in `core.signals`,
+which apply +1/-1 deltas with `INSERT ... ON CONFLICT DO UPDATE`. Bulk
+writes run inside `paused()` and call the `*_changed` functions once for
+the whole batch. `rebuild()` recomputes every rollup from the base tables.
+"""
+import threading
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Any, Iterable, List, Tuple
+
+from django.apps import apps as global_apps
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from core import models
+from core.statistics import count_document_keywords, title_keywords
+
+
+_local = threading.local()
+
+
+@contextmanager
+def paused():
+    """
+    Skip the signal driven updates in this thread. The caller applies the
+    deltas of its writes itself.
+    """
+    previous = is_paused()
+    _local.paused = True
+    try:
+        yield
+    finally:
+        _local.paused = previous
+
+
+def is_paused() -> bool:
+    return getattr(_local, 'paused', False)
+
+
+def increment(model, key_fields: List[str], deltas: Counter):
+    """
+    Add `deltas`, a mapping of key tuples to counts, to the rollup rows
+    of `model` in a single statement.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+
+    quote = connection.ops.quote_name
+    table = quote(model._meta.db_table)
+    keys = [quote(model._meta.get_field(f).column) for f in key_fields]
+    row = '(' + ', '.join(['%s'] * (len(keys) + 1)) + ')'
+    sql = (
+        f'INSERT INTO {table} ({", ".join(keys)}, "count") '
+        f'VALUES {", ".join([row] * len(deltas))} '
+        f'ON CONFLICT ({", ".join(keys)}) '
+        f'DO UPDATE SET "count" = {table}."count" + EXCLUDED."count"'
+    )
+    params = [
+        value
+        for key, delta in deltas.items()
+        for value in (*key, delta)
+    ]
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def _authors_by_document(document_ids) -> defaultdict:
+    authors = defaultdict(list)
+    document_ids = {pk for pk in document_ids if pk is not None}
+    if document_ids:
+        for author_id, document_id in models.AuthoredDocument.objects.filter(
+            document_id__in=document_ids
+        ).values_list('author_id', 'document_id'):
+            authors[document_id].append(author_id)
+    return authors
+
+
+def chat_sessions_changed(rows: Iterable[Tuple[Any]], sign: int):
+    """
+    Apply created (+1) or deleted (-1) chat sessions, given as
+    `(created_at,)` rows.
+    """
+    days = Counter()
+    for (created_at,) in rows:
+        days[(timezone.localdate(created_at),)] += sign
+    increment(models.DailyChatCount, ['day'], days)
+
+
+def saved_documents_changed(rows: Iterable[Tuple[Any, Any]], sign: int):
+    """
+    Apply created (+1) or deleted (-1) saved documents, given as
+    `(document_id, created_at)` rows.
+    """
+    documents = Counter()
+    for document_id, created_at in rows:
+        documents[(timezone.localdate(created_at), document_id)] += sign
+    increment(models.DailyDocumentSaveCount, ['day', 'document'], documents)
+
+    authors = Counter()
+    authors_by_document = _authors_by_document(
+        document_id for _, document_id in documents
+    )
+    for (day, document_id), delta in documents.items():
+        for author_id in authors_by_document[document_id]:
+            authors[(day, author_id)] += delta
+    increment(models.DailyAuthorSaveCount, ['day', 'author'], authors)
+
+
+def authored_documents_changed(rows: Iterable[Tuple[Any, Any]], sign: int):
+    """
+    Apply created (+1) or deleted (-1) authored documents, given as
+    `(author_id, document_id)` rows, moving the existing saves of each
+    document to or from its author.
+    """
+    authors_by_document = defaultdict(list)
+    for author_id, document_id in rows:
+        if document_id is not None:
+            authors_by_document[document_id].append(author_id)
+    if not authors_by_document:
+        return
+
+    saves = models.SavedDocument.objects.filter(
+        document_id__in=authors_by_document
+    ).annotate(
+        day=TruncDate('created_at')
+    ).values('day', 'document_id').annotate(count=Count('id'))
+
+    authors = Counter()
+    for save in saves:
+        for author_id in authors_by_document[save['document_id']]:
+            authors[(save['day'], author_id)] += sign * save['count']
+    increment(models.DailyAuthorSaveCount, ['day', 'author'], authors)
+
+
+def document_titles_changed(rows: Iterable[Tuple[Any]], sign: int):
+    """
+    Apply created (+1) or deleted (-1) documents, given as `(title,)`
+    rows, to the keyword counts.
+    """
+    words = Counter()
+    for (title,) in rows:
+        for word in title_keywords(title or ''):
+            words[(word,)] += sign
+    increment(models.KeywordCount, ['word'], words)
+
+
+def users_changed(rows: Iterable[Tuple[Any, Any, Any]], sign: int):
+    """
+    Apply created (+1) or deleted (-1) users, given as
+    `(field_of_study_id, education_level, is_active)` rows.
+    """
+    segments = Counter()
+    for row in rows:
+        segments[tuple(row)] += sign
+    increment(
+        models.UserSegmentCount,
+        ['field_of_study', 'education_level', 'is_active'],
+        segments
+    )
+
+
+# Source model -> (fields identifying its rollup rows, update function)
+SOURCES = {
+    models.ChatSession: (('created_at',), chat_sessions_changed),
+    models.SavedDocument: (
+        ('document_id', 'created_at'),
+        saved_documents_changed
+    ),
+    models.AuthoredDocument: (
+        ('author_id', 'document_id'),
+        authored_documents_changed
+    ),
+    models.User: (
+        ('field_of_study_id', 'education_level', 'is_active'),
+        users_changed
+    ),
+    models.Document: (('title',), document_titles_changed),
+}
+
+
+def snapshot(instance):
+    """
+    Return the rollup row of a source instance, or None if any of its
+    fields is deferred.
+    """
+    fields, _ = SOURCES[type(instance)]
+    values = instance.__dict__
+    if any(field not in values for field in fields):
+        return None
+    return tuple(values[field] for field in fields)
+
+
+def instances_changed(model, instances, sign: int):
+    """
+    Apply source model instances, e.g. the result of `bulk_create`, which
+    sends no signals.
+    """
+    _, changed = SOURCES[model]
+    changed([snapshot(instance) for instance in instances], sign)
+
+
+def queryset_changed(queryset, sign: int):
+    """
+    Apply every row of a source model queryset, e.g. right before
+    deleting it inside `paused()`.
+    """
+    fields, changed = SOURCES[queryset.model]
+    changed(list(queryset.values_list(*fields)), sign)
+
+
+def rebuild(apps=global_apps):
+    """
+    Recompute every rollup from the base tables.
+    """
+    with transaction.atomic():
+        rebuild_daily_counts(apps)
+        rebuild_keyword_counts(apps)
+
+
+def rebuild_keyword_counts(apps=global_apps):
+    """
+    Recompute the keyword counts, streaming the document titles.
+    """
+    KeywordCount = apps.get_model('core', 'KeywordCount')
+    Document = apps.get_model('core', 'Document')
+
+    with transaction.atomic():
+        KeywordCount.objects.all().delete()
+        KeywordCount.objects.bulk_create(
+            (
+                KeywordCount(word=word, count=count)
+                for word, count in count_document_keywords(
+                    Document.objects.all()
+                ).items()
+            ),
+            batch_size=2000,
+        )
+
+
+def rebuild_daily_counts(apps=global_apps):
+    """
+    Recompute the daily chat, save and user segment rollups.
+    """
+    def model(name):
+        return apps.get_model('core', name)
+
+    ChatSession = model('ChatSession')
+    SavedDocument = model('SavedDocument')
+    User = model('User')
+
+    DailyChatCount = model('DailyChatCount')
+    DailyDocumentSaveCount = model('DailyDocumentSaveCount')
+    DailyAuthorSaveCount = model('DailyAuthorSaveCount')
+    UserSegmentCount = model('UserSegmentCount')
+
+    saves = SavedDocument.objects.annotate(day=TruncDate('created_at'))
+
+    with transaction.atomic():
+        for rollup in (
+            DailyChatCount,
+            DailyDocumentSaveCount,
+            DailyAuthorSaveCount,
+            UserSegmentCount,
+        ):
+            rollup.objects.all().delete()
+
+        DailyChatCount.objects.bulk_create(
+            DailyChatCount(**row)
+            for row in ChatSession.objects.annotate(
+                day=TruncDate('created_at')
+            ).values('day').annotate(count=Count('pk'))
+        )
+        DailyDocumentSaveCount.objects.bulk_create(
+            DailyDocumentSaveCount(**row)
+            for row in saves.values('day', 'document_id').annotate(
+                count=Count('id')
+            )
+        )
+        DailyAuthorSaveCount.objects.bulk_create(
+            DailyAuthorSaveCount(
+                day=row['day'],
+                author_id=row['document__authoreddocument__author_id'],
+                count=row['count'],
+            )
+            for row in saves.filter(
+                document__authoreddocument__isnull=False
+            ).values(
+                'day',
+                'document__authoreddocument__author_id'
+            ).annotate(count=Count('id'))
+        )
+        UserSegmentCount.objects.bulk_create(
+            UserSegmentCount(**row)
+            for row in User.objects.values(
+                'field_of_study_id',
+                'education_level',
+                'is_active'
+            ).annotate(count=Count('id'))
+        )
@@ -0,0 +1,135 @@
+import os
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Any, BinaryIO, Dict, Iterator, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+OAI_NS = {'oai': 'http://www.openarchives.org/OAI/2.0/'}
+
+
+class DSpaceService:
+    """
+    Class that provides an interface to interact with the DSpace REST and
+    OAI-PMH APIs of the institutional repository (RI).
+    """
+
+    def __init__(
+            self,
+            base_url=None,
+            base_url_rest=None,
+            oai_url=None,
+            proxies=None,
+            timeout: float = 30.0,
+            retries: int = 3,
+    ):
+        self.base_url = base_url or os.environ.get('RI_BASE_URL')
+        self.base_url_rest = (
+            base_url_rest or os.environ.get('RI_BASE_URL_REST')
+        )
+        self.oai_url = (
+            oai_url
+            or os.environ.get('RI_OAI_URL')
+            or f'{self.base_url}/oai/request'
+        )
+        self.timeout = timeout
+        self.session = requests.Session()
+        if proxies:
+            self.session.proxies.update(proxies)
+        adapter = HTTPAdapter(max_retries=Retry(
+            total=retries,
+            backoff_factor=1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            allowed_methods=('GET',),
+        ))
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        response = self.session.get(url, timeout=self.timeout, **kwargs)
+        response.raise_for_status()
+        return response
+
+    def changed_items(
+            self,
+            since: Optional[datetime],
+    ) -> Iterator[Tuple[str, bool]]:
+        """
+        Yield `(handle, deleted)` for every item created, modified or
+        deleted since `since`, or for every item if it is None, following
+        the OAI-PMH resumption tokens.
+        """
+        params = {'verb': 'ListIdentifiers', 'metadataPrefix': 'oai_dc'}
+        if since is not None:
+            params['from'] = since.astimezone(timezone.utc).strftime(
+                '%Y-%m-%dT%H:%M:%SZ'
+            )
+        while params:
+            response = self._get(self.oai_url, params=params)
+            root = ET.fromstring(response.content)
+            error = root.find('oai:error', OAI_NS)
+            if error is not None:
+                if error.get('code') == 'noRecordsMatch':
+                    return
+                raise ValueError(f'OAI-PMH error: {error.text}')
+
+            for header in root.iterfind('.//oai:header', OAI_NS):
+                identifier = header.findtext('oai:identifier', '', OAI_NS)
+                yield (
+                    identifier.rsplit(':', 1)[-1],
+                    header.get('status') == 'deleted',
+                )
+
+            token = root.findtext('.//oai:resumptionToken', '', OAI_NS)
+            params = None
+            if token.strip():
+                params = {
+                    'verb': 'ListIdentifiers',
+                    'resumptionToken': token.strip(),
+                }
+
+    def item_by_handle(self, handle: str) -> Dict[str, Any]:
+        """
+        Get the REST representation of the item with the given handle.
+        """
+        return self._get(f'{self.base_url_rest}/handle/{handle}').json()
+
+    def item_details(self, uuid: str) -> Dict[str, Any]:
+        """
+        Get the REST representation of an item with its bitstreams and its
+        metadata as a dictionary of the last value of every field.
+        """
+        item = self._get(
+            f'{self.base_url_rest}/items/{uuid}',
+            params={'expand': 'metadata,bitstreams'},
+        ).json()
+        item['metadata'] = {
+            entry['key']: entry['value']
+            for entry in item.get('metadata') or []
+        }
+        return item
+
+    def copy_bitstream(self, uuid: str, file: BinaryIO) -> None:
+        """
+        Stream the content of a bitstream into `file`.
+        """
+        response = self._get(
+            f'{self.base_url_rest}/bitstreams/{uuid}/retrieve',
+            stream=True
+        )
+        with response:
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                file.write(chunk)
+
+    def download_bitstream(self, uuid: str, path: str) -> None:
+        """
+        Download the content of a bitstream to `path`. The file only
+        appears once the download is complete.
+        """
+        partial = f'{path}.part'
+        with open(partial, 'wb') as f:
+            self.copy_bitstream(uuid, f)
+        os.replace(partial, path)
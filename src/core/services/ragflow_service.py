@@ -1,6 +1,63 @@
 import os
+import uuid
 import requests
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, BinaryIO, List, Optional
+from urllib3.fields import format_multipart_header_param
+
+
+class MultipartStream:
+    """
+    File-like multipart/form-data body holding a single file, read from
+    the file as the request is sent instead of being built in memory.
+    """
+
+    def __init__(
+            self,
+            field: str,
+            file_name: str,
+            file: BinaryIO,
+            content_type: str = 'application/octet-stream'
+    ):
+        self.boundary = uuid.uuid4().hex
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(0)
+        head = (
+            f'--{self.boundary}\r\n'
+            'Content-Disposition: form-data; '
+            f'{format_multipart_header_param("name", field)}; '
+            f'{format_multipart_header_param("filename", file_name)}\r\n'
+            f'Content-Type: {content_type}\r\n\r\n'
+        ).encode()
+        tail = f'\r\n--{self.boundary}--\r\n'.encode()
+        self.length = len(head) + size + len(tail)
+        self.parts = [head, file, tail]
+
+    @property
+    def content_type(self) -> str:
+        return f'multipart/form-data; boundary={self.boundary}'
+
+    def __len__(self) -> int:
+        return self.length
+
+    def read(self, size: int = -1) -> bytes:
+        chunks = []
+        while self.parts and size != 0:
+            part = self.parts[0]
+            if isinstance(part, bytes):
+                chunk = part if size < 0 else part[:size]
+                if len(chunk) < len(part):
+                    self.parts[0] = part[len(chunk):]
+                else:
+                    self.parts.pop(0)
+            else:
+                chunk = part.read(size)
+                if not chunk or size < 0:
+                    self.parts.pop(0)
+            chunks.append(chunk)
+            if size > 0:
+                size -= len(chunk)
+        return b''.join(chunks)
 
 
 class RAGFlowService:
@@ -134,6 +191,27 @@ class RAGFlowService:
         response.raise_for_status()
         return response.json()
 
+    def upload_document(
+            self,
+            dataset_id: str,
+            file_name: str,
+            file: BinaryIO,
+            content_type: str = 'application/pdf'
+    ) -> Dict[str, Any]:
+        """
+        Upload a document to a dataset, streaming `file` in the request
+        body.
+        """
+        url = f'{self.base_url}/datasets/{dataset_id}/documents'
+        body = MultipartStream('file', file_name, file, content_type)
+        headers = {
+            'Authorization': self.headers['Authorization'],
+            'Content-Type': body.content_type,
+        }
+        response = requests.post(url, headers=headers, data=body)
+        response.raise_for_status()
+        return response.json()
+
 
 if __name__ == '__main__':
     ragflow_service = RAGFlowService()
@@ -0,0 +1,131 @@
+"""
+Signal handlers for the core app.
+"""
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import (
+    post_delete,
+    post_init,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+
+from rest_framework.authtoken.models import Token
+
+from core import rollups
+from core.authentication import token_cache_key
+from core.models import (
+    SatisfactionSurveyResponse,
+    SurveyRating,
+    extract_ratings,
+)
+
+
+@receiver(post_delete, sender=Token)
+def forget_deleted_token(sender, instance, **kwargs):
+    """
+    Drop a deleted token from the authentication cache.
+    """
+    cache.delete(token_cache_key(instance.key))
+
+
+@receiver(post_save, sender=get_user_model())
+def forget_user_tokens(sender, instance, created, **kwargs):
+    """
+    Drop a user's tokens from the authentication cache whenever the user
+    changes, so deactivations and profile updates apply immediately.
+    """
+    if created:
+        return
+
+    keys = Token.objects.filter(user_id=instance.pk).values_list(
+        'key',
+        flat=True
+    )
+    cache.delete_many([token_cache_key(key) for key in keys])
+
+
+@receiver(post_save, sender=SatisfactionSurveyResponse)
+def sync_survey_ratings(
+        sender, instance, created, raw=False, update_fields=None, **kwargs):
+    """
+    Keep the extracted ratings of a survey response in step with its JSON.
+    """
+    if raw or (update_fields is not None and 'survey' not in update_fields):
+        return
+
+    if not created:
+        SurveyRating.objects.filter(response=instance).delete()
+    SurveyRating.objects.bulk_create(
+        SurveyRating(response=instance, question=question, value=value)
+        for question, value in extract_ratings(instance.survey).items()
+    )
+
+
+def remember_rollup_row(sender, instance, **kwargs):
+    """
+    Keep the rollup row an instance was loaded with, so updates and
+    deletes know which counts to move.
+    """
+    instance._rollup_row = rollups.snapshot(instance)
+
+
+def stored_rollup_row(sender, instance):
+    """
+    Read the rollup row of an instance from the database.
+    """
+    fields, _ = rollups.SOURCES[sender]
+    return sender._base_manager.filter(
+        pk=instance.pk
+    ).values_list(*fields).first()
+
+
+def load_rollup_row(sender, instance, raw=False, **kwargs):
+    """
+    Read the stored rollup row of instances loaded with deferred fields.
+    """
+    if raw or instance._state.adding or instance._rollup_row is not None:
+        return
+
+    instance._rollup_row = stored_rollup_row(sender, instance)
+
+
+def update_rollups_on_save(sender, instance, created, raw=False, **kwargs):
+    """
+    Move the rollup counts of a created or updated instance.
+    """
+    old = None if created else instance._rollup_row
+    new = rollups.snapshot(instance)
+    if new is None:
+        new = stored_rollup_row(sender, instance)
+    instance._rollup_row = new
+
+    if raw or old == new or rollups.is_paused():
+        return
+
+    _, changed = rollups.SOURCES[sender]
+    if old is not None:
+        changed([old], -1)
+    changed([new], 1)
+
+
+def update_rollups_on_delete(sender, instance, **kwargs):
+    """
+    Remove the rollup counts of a deleted instance.
+    """
+    if rollups.is_paused() or instance._rollup_row is None:
+        return
+
+    _, changed = rollups.SOURCES[sender]
+    changed([instance._rollup_row], -1)
+
+
+for model in rollups.SOURCES:
+    post_init.connect(remember_rollup_row, sender=model)
+    pre_save.connect(load_rollup_row, sender=model)
+    pre_delete.connect(load_rollup_row, sender=model)
+    post_save.connect(update_rollups_on_save, sender=model)
+    post_delete.connect(update_rollups_on_delete, sender=model)
@@ -1,20 +1,43 @@
 """
 Generate statistics for the application.
+
+User, saved document, author, keyword and chat statistics read the
+rollups maintained by `core.rollups`, so their cost does not grow with
+history.
 """
-from django.db.models.functions import TruncDate
-from django.db.models import Count
+from django.db.models import Count, Sum
 from core import models
 from collections import Counter
 import re
-from typing import List, Dict, Union
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
+
+
+# Rows fetched per round trip when streaming from a server-side cursor
+CHUNK_SIZE = 2000
+
+
+STOP_WORDS = frozenset({
+    "the", "and", "of", "in", "a", "to", "for", "on",
+    "with", "by", "an", "at", "as", "from", "is", "that",
+    "this", "it", "or", "are", "was", "be", "not", "but",
+    "all", "any", "some", "such", "which", "who", "whom",
+    "el", "la", "los", "las", "de", "que", "en", "del",
+    "y", "un", "una", "se", "al", "por", "no", "es",
+    "su", "como", "más", "este", "esta", "estos",
+    "estas", "todo", "toda", "todos", "todas",
+    "ese", "esa", "esos", "esas", "aquel", "aquella",
+    "aquellos", "aquellas",
+})
+WORD_RE = re.compile(r'\b\w+\b')
 
 
 def get_user_field_of_study_stats() -> Dict[str, List[Union[str, int]]]:
     """
     Return statistics on user fields of study with counts per field.
     """
-    queryset = models.User.objects.values('field_of_study__name')\
-        .annotate(count=Count('id')).order_by('-count')
+    queryset = models.UserSegmentCount.objects\
+        .values('field_of_study__name')\
+        .annotate(count=Sum('count')).filter(count__gt=0).order_by('-count')
 
     labels = [item['field_of_study__name'] or 'No field' for item in queryset]
     values = [item['count'] for item in queryset]
@@ -25,22 +48,51 @@ def get_user_field_of_study_stats() -> Dict[str, List[Union[str, int]]]:
     }
 
 
+def _stats(rows: Iterable[Tuple[str, int]]) -> Dict[str, List]:
+    labels, values = [], []
+    for label, value in rows:
+        labels.append(label)
+        values.append(value)
+    return {"labels": labels, "values": values}
+
+
+def most_consulted_documents_rows(
+        limit: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Yield `(title, saves)` for the most saved documents, streamed from a
+    server-side cursor. With no limit, yield every document.
+    """
+    queryset = models.DailyDocumentSaveCount.objects\
+        .values('document__title')\
+        .annotate(count=Sum('count')).filter(count__gt=0)\
+        .order_by('-count')[:limit]
+
+    for item in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield item['document__title'] or 'No title', item['count']
+
+
 def get_most_consulted_documents_stats(
         limit: int = 10) -> Dict[str, List[Union[str, int]]]:
     """
     Return statistics on the most consulted documents,
     limited by the given number.
     """
-    queryset = models.SavedDocument.objects.values('document__title')\
-        .annotate(count=Count('id'))\
+    return _stats(most_consulted_documents_rows(limit))
+
+
+def most_consulted_authors_rows(
+        limit: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Yield `(author name, saves)` for the most consulted authors, streamed
+    from a server-side cursor. With no limit, yield every author.
+    """
+    queryset = models.DailyAuthorSaveCount.objects\
+        .values('author__name')\
+        .annotate(count=Sum('count')).filter(count__gt=0)\
         .order_by('-count')[:limit]
 
-    labels = [item['document__title'] or 'No title' for item in queryset]
-    values = [item['count'] for item in queryset]
-    return {
-        "labels": labels,
-        "values": values
-    }
+    for item in queryset.iterator(chunk_size=CHUNK_SIZE):
+        yield item['author__name'] or 'No name', item['count']
 
 
 def get_most_consulted_authors_stats(
@@ -48,61 +100,63 @@ def get_most_consulted_authors_stats(
     """
     Return statistics on the most consulted authors, based on saved documents.
     """
-    queryset = models.AuthoredDocument.objects\
-        .filter(document__saveddocument__isnull=False)\
-        .values('author__name') \
-        .annotate(count=Count('document__saveddocument'))\
-        .order_by('-count')[:limit]
+    return _stats(most_consulted_authors_rows(limit))
 
-    labels = [item['author__name'] or 'No name' for item in queryset]
-    values = [item['count'] for item in queryset]
 
-    return {
-        "labels": labels,
-        "values": values
-    }
+def title_keywords(title: str) -> List[str]:
+    """
+    Return the keywords of a document title, in order, with repeats.
+    """
+    return [
+        word for word in WORD_RE.findall(title.lower())
+        if word not in STOP_WORDS and len(word) > 2
+    ]
 
 
-def get_document_keywords_stats(
-        limit: int = 10) -> Dict[str, List[Union[str, int]]]:
+def count_document_keywords(
+        queryset=None, chunk_size: int = CHUNK_SIZE) -> Counter:
     """
-    Return keyword frequency statistics extracted from document titles.
+    Count the keywords of every document title, streaming the titles so
+    memory only grows with the vocabulary.
     """
-    documents = models.Document.objects.values_list('title', flat=True)
-    text = ' '.join(documents).lower()
-    words = re.findall(r'\b\w+\b', text)
+    if queryset is None:
+        queryset = models.Document.objects.all()
+
+    counts = Counter()
+    titles = queryset.values_list('title', flat=True)
+    for title in titles.iterator(chunk_size=chunk_size):
+        counts.update(title_keywords(title))
+    return counts
+
 
-    stop_words = {"the", "and", "of", "in", "a", "to", "for", "on",
-                  "with", "by", "an", "at", "as", "from", "is", "that",
-                  "this", "it", "or", "are", "was", "be", "not", "but",
-                  "all", "any", "some", "such", "which", "who", "whom",
-                  "el", "la", "los", "las", "de", "que", "en", "del",
-                  "y", "un", "una", "se", "al", "por", "no", "es",
-                  "su", "como", "más", "este", "esta", "este", "estos",
-                  "estas", "todo", "toda", "todos", "todas", "este",
-                  "esta", "estos", "estas", "ese", "esa", "esos",
-                  "esas", "aquel", "aquella", "aquellos", "aquellas", }
+def document_keywords_rows(
+        limit: Optional[int] = None) -> Iterator[Tuple[str, int]]:
+    """
+    Yield `(keyword, occurrences)` for the most frequent title keywords,
+    streamed from a server-side cursor. With no limit, yield every one.
+    """
+    queryset = models.KeywordCount.objects.filter(count__gt=0)\
+        .order_by('-count', 'word')[:limit]
 
-    filtered_words = [
-        word for word in words if word not in stop_words and len(word) > 2]
-    most_common = Counter(filtered_words).most_common(limit)
+    yield from queryset.values_list('word', 'count')\
+        .iterator(chunk_size=CHUNK_SIZE)
 
-    labels = [word for word, _ in most_common]
-    values = [count for _, count in most_common]
 
-    return {
-        "labels": labels,
-        "values": values
-    }
+def get_document_keywords_stats(
+        limit: int = 10) -> Dict[str, List[Union[str, int]]]:
+    """
+    Return keyword frequency statistics extracted from document titles.
+    """
+    return _stats(document_keywords_rows(limit))
 
 
 def get_user_education_level_stats() -> Dict[str, List[Union[str, int]]]:
     """
     Return statistics on users' education levels.
     """
-    queryset = models.User.objects.values('education_level')\
-        .annotate(count=Count('id')).\
-        order_by('-count')
+    queryset = models.UserSegmentCount.objects.values('education_level')\
+        .annotate(count=Sum('count')).filter(count__gt=0)\
+        .order_by('-count')
 
     labels = [models.User.EDUCATION_LEVELS.get(
         item['education_level'], 'Unknown') for item in queryset]
@@ -114,8 +168,8 @@ def get_user_activity_status_stats() -> Dict[str, List[Union[str, int]]]:
     """
     Return statistics on user activity status (active vs inactive).
     """
-    queryset = models.User.objects.values(
-        'is_active').annotate(count=Count('id'))
+    queryset = models.UserSegmentCount.objects.values(
+        'is_active').annotate(count=Sum('count')).filter(count__gt=0)
     labels = ['Active' if item['is_active']
               else 'Inactive' for item in queryset]
     values = [item['count'] for item in queryset]
@@ -149,11 +203,10 @@ def get_chats_over_time_stats() -> Dict[str, List[Union[str, int]]]:
     """
     Return statistics on number of chat sessions per day over time.
     """
-    queryset = models.ChatSession.objects.annotate(
-        date=TruncDate('created_at')
-    ).values('date').annotate(count=Count('session_id')).order_by('date')
+    queryset = models.DailyChatCount.objects.filter(count__gt=0)\
+        .order_by('day')
 
-    labels = [item['date'].strftime("%Y-%m-%d") for item in queryset]
-    values = [item['count'] for item in queryset]
+    labels = [item.day.strftime("%Y-%m-%d") for item in queryset]
+    values = [item.count for item in queryset]
 
     return {"labels": labels, "values": values}
@@ -0,0 +1,91 @@
+"""
+Cache the admin dashboard statistics with stale-while-revalidate.
+
+A cached result is served as is while it is younger than
+`STATS_CACHE_TTL`. After that it is still served, up to
+`STATS_CACHE_STALE_TTL` more seconds, while one background thread
+recomputes it. Only a cold cache makes the request wait.
+"""
+import logging
+import threading
+from typing import Any, Callable, Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.utils import timezone
+
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for a single refresh; the lock expires after it in case the
+# refreshing thread dies.
+REFRESH_LOCK_TIMEOUT = 300
+
+
+def cache_key(func: Callable) -> str:
+    return f'stats:{func.__module__}.{func.__qualname__}'
+
+
+def store(func: Callable) -> Dict[str, Any]:
+    """
+    Compute `func` and cache its result with the current time.
+    """
+    entry = {'data': func(), 'computed_at': timezone.now()}
+    cache.set(
+        cache_key(func),
+        entry,
+        settings.STATS_CACHE_TTL + settings.STATS_CACHE_STALE_TTL
+    )
+    return entry
+
+
+def refresh(func: Callable):
+    """
+    Recompute `func` and release its refresh lock.
+    """
+    try:
+        store(func)
+    except Exception:
+        logger.exception('Failed to refresh %s', cache_key(func))
+    finally:
+        cache.delete(f'{cache_key(func)}:refreshing')
+
+
+def _refresh_in_thread(func: Callable):
+    try:
+        refresh(func)
+    finally:
+        # Close the connection this thread opened.
+        connections.close_all()
+
+
+def schedule(func: Callable):
+    """
+    Refresh `func` in a background thread.
+    """
+    threading.Thread(
+        target=_refresh_in_thread,
+        args=(func,),
+        daemon=True
+    ).start()
+
+
+def get_cached_stats(func: Callable) -> Tuple[Any, Any]:
+    """
+    Return `(data, computed_at)` for the statistics function `func`.
+    """
+    entry = cache.get(cache_key(func))
+
+    if entry is None:
+        entry = store(func)
+    else:
+        age = (timezone.now() - entry['computed_at']).total_seconds()
+        if age > settings.STATS_CACHE_TTL and cache.add(
+            f'{cache_key(func)}:refreshing',
+            True,
+            REFRESH_LOCK_TIMEOUT
+        ):
+            schedule(func)
+
+    return entry['data'], entry['computed_at']
@@ -0,0 +1,266 @@
+"""
+Test the API authentication backends.
+"""
+
+from unittest.mock import patch
+
+from django.core import signing
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from core.authentication import (
+    SignedTokenAuthentication,
+    create_access_token,
+)
+
+
+ME_URL = reverse('user:me')
+SIGNED_TOKEN_URL = reverse('user:token-signed')
+SIGNED_TOKEN_ANONYMOUS_URL = reverse('user:token-anonymous-signed')
+REFRESH_TOKEN_URL = reverse('user:token-refresh')
+
+
+def create_user(**params):
+    """
+    Helper function to create a user.
+    """
+    return get_user_model().objects.create_user(**params)
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    """
+    Test the cached token authentication backend.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass1234',
+            name='Test Name',
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_request_runs_no_queries(self):
+        """
+        Test an authenticated request costs no queries once cached.
+        """
+        self.client.get(ME_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+
+    def test_invalid_token_is_rejected(self):
+        """
+        Test an unknown token is rejected.
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deleted_token_is_rejected(self):
+        """
+        Test deleting a token invalidates its cache entry.
+        """
+        self.client.get(ME_URL)
+
+        self.token.delete()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_is_rejected(self):
+        """
+        Test deactivating a user invalidates their cached tokens.
+        """
+        self.client.get(ME_URL)
+
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_updated_user_is_refreshed(self):
+        """
+        Test updating a user invalidates their cached tokens.
+        """
+        self.client.get(ME_URL)
+
+        self.user.name = 'New Name'
+        self.user.save()
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['name'], 'New Name')
+
+
+class SignedTokenAuthenticationTests(TestCase):
+    """
+    Test the signed access token backend and its endpoints.
+    """
+
+    def setUp(self):
+        self.user = create_user(
+            email='test@example.com',
+            password='testpass1234',
+            name='Test Name',
+        )
+        self.client = APIClient()
+
+    def obtain_tokens(self):
+        res = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'testpass1234',
+        })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return res.data
+
+    def test_obtain_signed_tokens(self):
+        """
+        Test a signed token pair is issued without creating a token row.
+        """
+        tokens = self.obtain_tokens()
+
+        self.assertEqual(tokens['token_type'], 'Bearer')
+        self.assertIn('access', tokens)
+        self.assertIn('refresh', tokens)
+        self.assertFalse(Token.objects.exists())
+
+    def test_obtain_signed_tokens_bad_credentials(self):
+        """
+        Test no tokens are issued for invalid credentials.
+        """
+        res = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'wrong',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('access', res.data)
+
+    def test_authenticate_runs_no_queries(self):
+        """
+        Test verifying an access token needs no database lookup.
+        """
+        access = create_access_token(self.user)
+        request = APIRequestFactory().get(
+            '/',
+            HTTP_AUTHORIZATION=f'Bearer {access}'
+        )
+
+        with self.assertNumQueries(0):
+            user, claims = SignedTokenAuthentication().authenticate(request)
+
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertTrue(user.is_authenticated)
+        self.assertFalse(user.is_staff)
+
+    def test_me_with_signed_token(self):
+        """
+        Test the profile endpoint loads the full user for signed tokens.
+        """
+        access = self.obtain_tokens()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        res = self.client.patch(ME_URL, {'name': 'New Name'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['email'], self.user.email)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.name, 'New Name')
+
+    def test_tampered_token_is_rejected(self):
+        """
+        Test an access token with a bad signature is rejected.
+        """
+        access = self.obtain_tokens()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}x')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(SIGNED_ACCESS_TOKEN_TTL=60)
+    def test_expired_token_is_rejected(self):
+        """
+        Test an access token older than its lifetime is rejected.
+        """
+        with patch('time.time', return_value=0):
+            access = create_access_token(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(res['WWW-Authenticate'], 'Token')
+
+    def test_refresh_token(self):
+        """
+        Test a refresh token is exchanged for a new token pair.
+        """
+        refresh = self.obtain_tokens()['refresh']
+
+        res = self.client.post(REFRESH_TOKEN_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        claims = signing.loads(
+            res.data['access'],
+            salt='core.authentication.access'
+        )
+        self.assertEqual(claims['uid'], self.user.pk)
+
+    def test_refresh_token_revoked(self):
+        """
+        Test refresh tokens are revoked by deactivation and password
+        changes.
+        """
+        refresh = self.obtain_tokens()['refresh']
+
+        self.user.set_password('newpass1234')
+        self.user.save()
+        res = self.client.post(REFRESH_TOKEN_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+        refresh = self.client.post(SIGNED_TOKEN_URL, {
+            'email': 'test@example.com',
+            'password': 'newpass1234',
+        }).data['refresh']
+        self.user.is_active = False
+        self.user.save()
+        res = self.client.post(REFRESH_TOKEN_URL, {'refresh': refresh})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_anonymous_signed_token(self):
+        """
+        Test anonymous users get signed tokens carrying their flag.
+        """
+        user = create_user(is_anonymous=True)
+
+        res = self.client.post(SIGNED_TOKEN_ANONYMOUS_URL, {
+            'anonymous_id': str(user.anonymous_id),
+        })
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {res.data["access"]}'
+        )
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['anonymous_id'], str(user.anonymous_id))
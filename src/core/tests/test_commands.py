@@ -2,18 +2,30 @@
 Test custom Django management commands.
 """
 
+import csv
 import io
+import os
 import tempfile
+from datetime import timedelta
 from unittest.mock import patch
 
 from psycopg import OperationalError as PsycopgError
 
 from django.core.management import call_command, CommandError
+from django.db import connection, connections
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase, TestCase
 from django.utils import timezone
 
-from core.models import SatisfactionSurveyResponse, User
+from rest_framework.authtoken.models import Token
+
+from core.models import (
+    ChatSession,
+    Document,
+    SatisfactionSurveyResponse,
+    SavedDocument,
+    User,
+)
 
 
 @patch('core.management.commands.wait_for_db.Command.check')
@@ -285,6 +297,110 @@ class ExportFeedbackCSVTests(TestCase):
             self.assertIn('Exported 2 responses.', output)
             self.assertIn('anonymous_question', output)
 
+    def test_export_feedback_csv_header_is_key_union(self):
+        """Test the header holds every key found across the responses."""
+        SatisfactionSurveyResponse.objects.create(
+            user=self.user,
+            version='1.0',
+            survey={'question2': {'other': None}, 'question4': True}
+        )
+
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            call_command('export_feedback_csv')
+
+        rows = list(csv.reader(io.StringIO(mock_stdout.getvalue())))
+        self.assertEqual(rows[0][5:], [
+            'question1',
+            'question2.nested',
+            'question2.other',
+            'question3',
+            'question4',
+        ])
+        self.assertEqual(
+            rows[1][5:],
+            ['answer1', 'value', '', '["item1", "item2"]', '']
+        )
+        self.assertEqual(rows[2][5:], ['', '', '', '', 'True'])
+
+    def test_export_feedback_csv_summary_only(self):
+        """Test the summary counts are computed without the export."""
+        SatisfactionSurveyResponse.objects.create(
+            user=self.user,
+            version='1.0',
+            survey={'question1': 'answer1', 'question4': False}
+        )
+        SatisfactionSurveyResponse.objects.create(
+            user=self.user,
+            version='1.0',
+            survey={'question1': None, 'question4': 2.5}
+        )
+
+        with patch('sys.stdout', new_callable=io.StringIO) as mock_stdout:
+            call_command(
+                'export_feedback_csv',
+                summary_only=True,
+                limit_keys=['question1', 'question3', 'question4']
+            )
+
+        rows = list(csv.reader(io.StringIO(mock_stdout.getvalue())))
+        self.assertEqual(rows, [
+            ['question_key', 'answer_value', 'count'],
+            ['question1', 'answer1', '2'],
+            ['question1', '', '1'],
+            ['question3', '', '2'],
+            ['question3', '["item1", "item2"]', '1'],
+            ['question4', '', '1'],
+            ['question4', '2.5', '1'],
+            ['question4', 'False', '1'],
+        ])
+
+    def test_export_feedback_csv_since_last(self):
+        """Test incremental exports append only new responses."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outfile = os.path.join(temp_dir, 'feedback.csv')
+
+            def export():
+                with patch('sys.stdout', new_callable=io.StringIO) as out:
+                    call_command(
+                        'export_feedback_csv',
+                        outfile=outfile,
+                        since_last=True
+                    )
+                with open(outfile, encoding='utf-8') as f:
+                    return out.getvalue(), list(csv.reader(f))
+
+            output, rows = export()
+            self.assertIn('Exported 1 responses.', output)
+            self.assertEqual(len(rows), 2)
+
+            response = SatisfactionSurveyResponse.objects.create(
+                user=self.user,
+                version='1.0',
+                survey={'question1': 'answer2', 'question0': 'new'}
+            )
+
+            output, rows = export()
+            self.assertIn('Exported 1 responses.', output)
+            self.assertEqual(rows[0][5:], [
+                'question1',
+                'question2.nested',
+                'question3',
+                'question0',
+            ])
+            self.assertEqual(rows[1][0], str(self.survey_response.pk))
+            self.assertEqual(rows[1][-1], '')
+            self.assertEqual(rows[2][0], str(response.pk))
+            self.assertEqual(rows[2][5:], ['answer2', '', '', 'new'])
+
+            output, rows = export()
+            self.assertIn('No new survey responses', output)
+            self.assertEqual(len(rows), 3)
+
+    def test_export_feedback_csv_since_last_requires_outfile(self):
+        """Test incremental exports need a file to append to."""
+        with self.assertRaises(CommandError):
+            call_command('export_feedback_csv', since_last=True)
+
     @patch('core.management.commands.export_feedback_csv.open')
     def test_export_feedback_csv_file_write_error(self, mock_file):
         """Test handling of file write errors."""
@@ -293,3 +409,292 @@ class ExportFeedbackCSVTests(TestCase):
         with self.assertRaises(IOError):
             call_command('export_feedback_csv',
                          outfile='/invalid/path/file.csv')
+
+
+class BenchmarkCommandTests(TestCase):
+    """
+    Test the benchmark management command.
+    """
+
+    def test_serializers_benchmark(self):
+        """
+        Test the serializers benchmark reports throughput and leaves
+        no data behind.
+        """
+        out = io.StringIO()
+
+        call_command(
+            'benchmark', 'serializers', rows=5, repeat=1, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertIn('DocumentValuesSerializer + ORJSONRenderer', output)
+        self.assertIn('rows/s', output)
+        self.assertFalse(Document.objects.exists())
+
+    def test_survey_indexes_benchmark(self):
+        """
+        Test the survey index benchmark compares both states without
+        locking the real survey table or touching its indexes.
+        """
+        out = io.StringIO()
+        table = connection.ops.quote_name(
+            SatisfactionSurveyResponse._meta.db_table
+        )
+
+        # Writers of another connection keep using the table
+        other = connections.create_connection('default')
+        try:
+            with other.cursor() as cursor:
+                cursor.execute('BEGIN')
+                cursor.execute(f'LOCK TABLE {table} IN ROW EXCLUSIVE MODE')
+            with connection.cursor() as cursor:
+                cursor.execute("SET lock_timeout = '2s'")
+            call_command(
+                'benchmark', 'survey_indexes', rows=50, repeat=1, stdout=out
+            )
+        finally:
+            other.close()
+            with connection.cursor() as cursor:
+                cursor.execute('RESET lock_timeout')
+
+        output = out.getvalue()
+        self.assertIn(
+            'JSON containment: survey__contains (no indexes)', output
+        )
+        self.assertIn('export rows: version + 7 day range (indexes)', output)
+        self.assertFalse(SatisfactionSurveyResponse.objects.exists())
+        with connection.cursor() as cursor:
+            indexes = connection.introspection.get_constraints(
+                cursor, SatisfactionSurveyResponse._meta.db_table
+            )
+        self.assertIn('survey_json_path_idx', indexes)
+
+
+class ExportFeedbackParquetTests(TestCase):
+    """
+    Test the export_feedback_parquet management command.
+    """
+
+    def setUp(self):
+        user = User.objects.create_user(email='test@example.com')
+        SatisfactionSurveyResponse.objects.create(
+            user=user,
+            version='1.0',
+            survey={
+                'rating': 5,
+                'score': 4.5,
+                'recommend': True,
+                'features': ['chat', 'search'],
+                'comment': {'text': 'Great'},
+            }
+        )
+        SatisfactionSurveyResponse.objects.create(
+            user=user,
+            version='1.0',
+            survey={'rating': 3, 'score': 4, 'comment': {'text': 7}}
+        )
+
+    def test_export_feedback_parquet_types(self):
+        """Test survey keys are written as typed columns in row groups."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outfile = os.path.join(temp_dir, 'feedback.parquet')
+
+            call_command(
+                'export_feedback_parquet',
+                outfile=outfile,
+                row_group_size=1,
+                stdout=io.StringIO()
+            )
+
+            parquet = pq.ParquetFile(outfile)
+            self.assertEqual(parquet.num_row_groups, 2)
+            schema = parquet.schema_arrow
+            table = parquet.read()
+
+        self.assertEqual(schema.field('rating').type, pa.int64())
+        self.assertEqual(schema.field('score').type, pa.float64())
+        self.assertEqual(schema.field('recommend').type, pa.bool_())
+        self.assertEqual(
+            schema.field('features').type, pa.list_(pa.string())
+        )
+        self.assertEqual(schema.field('comment.text').type, pa.string())
+        self.assertEqual(table.column('rating').to_pylist(), [5, 3])
+        self.assertEqual(
+            table.column('features').to_pylist(), [['chat', 'search'], None]
+        )
+        self.assertEqual(
+            table.column('comment.text').to_pylist(), ['Great', '7']
+        )
+
+    def test_export_feedback_parquet_integral_floats(self):
+        """Test integral floats mixed with ints are kept in int columns."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        user = User.objects.get(email='test@example.com')
+        SatisfactionSurveyResponse.objects.create(
+            user=user,
+            version='1.0',
+            survey={'rating': 4.0, 'score': 2, 'counts': [1.0, 2]}
+        )
+        SatisfactionSurveyResponse.objects.create(
+            user=user,
+            version='1.0',
+            survey={'counts': [3]}
+        )
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            outfile = os.path.join(temp_dir, 'feedback.parquet')
+
+            call_command(
+                'export_feedback_parquet',
+                outfile=outfile,
+                limit_keys=['rating', 'score', 'counts'],
+                stdout=io.StringIO()
+            )
+
+            table = pq.read_table(outfile)
+
+        self.assertEqual(table.schema.field('rating').type, pa.int64())
+        self.assertEqual(
+            table.column('rating').to_pylist(), [5, 3, 4, None]
+        )
+        self.assertEqual(
+            table.column('score').to_pylist(), [4.5, 4.0, 2.0, None]
+        )
+        self.assertEqual(
+            table.schema.field('counts').type, pa.list_(pa.int64())
+        )
+        self.assertEqual(
+            table.column('counts').to_pylist(), [None, None, [1, 2], [3]]
+        )
+
+    def test_feedback_export_benchmark(self):
+        """Test the benchmark reports the size of each export."""
+        out = io.StringIO()
+
+        call_command(
+            'benchmark', 'feedback_export', rows=5, repeat=1, stdout=out
+        )
+
+        output = out.getvalue()
+        self.assertIn('parquet (zstd)', output)
+        self.assertIn('KiB', output)
+        self.assertEqual(SatisfactionSurveyResponse.objects.count(), 2)
+
+
+@patch('core.management.commands.purge_anonymous_users.time.sleep')
+@patch('core.management.commands.purge_anonymous_users.RAGFlowService')
+class PurgeAnonymousUsersTests(TestCase):
+    """
+    Test the purge_anonymous_users management command.
+    """
+
+    def create_anonymous_user(self, days_old, sessions=0):
+        """
+        Create an anonymous user with a token, a saved document and
+        `sessions` chat sessions, all `days_old` days old.
+        """
+        user = User.objects.create_user(is_anonymous=True)
+        Token.objects.create(user=user)
+        SavedDocument.objects.create(user=user, document=None)
+        for i in range(sessions):
+            ChatSession.objects.create(
+                session_id=f'{user.pk}-{i}',
+                session_name='Session',
+                user=user,
+                assistant_id=f'assistant-{i % 2}',
+            )
+
+        old = timezone.now() - timedelta(days=days_old)
+        User.objects.filter(pk=user.pk).update(created_at=old)
+        Token.objects.filter(user=user).update(created=old)
+        SavedDocument.objects.filter(user=user).update(created_at=old)
+        ChatSession.objects.filter(user=user).update(updated_at=old)
+        return user
+
+    def test_purge_stale_users(self, patched_ragflow, patched_sleep):
+        """
+        Test stale anonymous users and their data are deleted in batches
+        while recent and registered users are kept.
+        """
+        patched_ragflow.return_value.delete_session.return_value = {
+            'code': 0
+        }
+        stale = [self.create_anonymous_user(60, sessions=2)
+                 for _ in range(3)]
+        recent = self.create_anonymous_user(1, sessions=1)
+        registered = User.objects.create_user(email='user@example.com')
+        User.objects.filter(pk=registered.pk).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        out = io.StringIO()
+
+        call_command(
+            'purge_anonymous_users', days=30, batch_size=2, stdout=out
+        )
+
+        self.assertEqual(
+            set(User.objects.values_list('pk', flat=True)),
+            {recent.pk, registered.pk}
+        )
+        self.assertFalse(Token.objects.filter(user__in=stale).exists())
+        self.assertEqual(SavedDocument.objects.count(), 1)
+        self.assertEqual(ChatSession.objects.count(), 1)
+        # One call per assistant per batch.
+        delete_session = patched_ragflow.return_value.delete_session
+        self.assertEqual(delete_session.call_count, 4)
+        self.assertIn('Deleted 3 anonymous users in 2 batches', out.getvalue())
+
+    def test_dry_run(self, patched_ragflow, patched_sleep):
+        """
+        Test a dry run only reports what would be deleted.
+        """
+        self.create_anonymous_user(60, sessions=2)
+        out = io.StringIO()
+
+        call_command('purge_anonymous_users', dry_run=True, stdout=out)
+
+        self.assertIn('Would delete 1 anonymous users', out.getvalue())
+        self.assertEqual(User.objects.count(), 1)
+        patched_ragflow.return_value.delete_session.assert_not_called()
+
+    def test_ragflow_failure_skips_batch(
+        self,
+        patched_ragflow,
+        patched_sleep
+    ):
+        """
+        Test users are kept when their RAGFlow sessions cannot be deleted.
+        """
+        patched_ragflow.return_value.delete_session.return_value = {
+            'code': 102,
+            'message': 'error',
+        }
+        self.create_anonymous_user(60, sessions=1)
+        out = io.StringIO()
+
+        call_command(
+            'purge_anonymous_users', stdout=out, stderr=io.StringIO()
+        )
+
+        self.assertEqual(User.objects.count(), 1)
+        self.assertEqual(ChatSession.objects.count(), 1)
+        self.assertIn('Skipped 1 users', out.getvalue())
+
+    def test_skip_ragflow(self, patched_ragflow, patched_sleep):
+        """
+        Test --skip-ragflow deletes users without calling RAGFlow.
+        """
+        self.create_anonymous_user(60, sessions=1)
+
+        call_command(
+            'purge_anonymous_users', skip_ragflow=True, stdout=io.StringIO()
+        )
+
+        self.assertFalse(User.objects.exists())
+        patched_ragflow.assert_not_called()
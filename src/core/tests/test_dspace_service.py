@@ -0,0 +1,132 @@
+"""
+Test the DSpace service.
+"""
+
+from datetime import datetime, timezone
+from unittest.mock import Mock, patch
+
+from django.test import SimpleTestCase
+
+from core.services.dspace_service import DSpaceService
+
+
+OAI_PAGE = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <ListIdentifiers>
+    {headers}
+    <resumptionToken>{token}</resumptionToken>
+  </ListIdentifiers>
+</OAI-PMH>"""
+
+OAI_HEADER = """<header {status}>
+  <identifier>oai:ri.example.com:20.500.1/{suffix}</identifier>
+  <datestamp>2026-10-01T00:00:00Z</datestamp>
+</header>"""
+
+OAI_NO_RECORDS = """<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/">
+  <error code="noRecordsMatch">No matching records</error>
+</OAI-PMH>"""
+
+
+def oai_response(content):
+    response = Mock()
+    response.content = content.encode()
+    return response
+
+
+class DSpaceServiceTests(SimpleTestCase):
+    """
+    Test the DSpace REST and OAI-PMH client.
+    """
+
+    def setUp(self):
+        self.service = DSpaceService(
+            base_url='http://ri.example.com',
+            base_url_rest='http://ri.example.com/rest',
+            timeout=5,
+        )
+
+    def test_changed_items_follows_resumption_tokens(self):
+        """
+        Test modified and deleted items are listed across pages.
+        """
+        pages = [
+            OAI_PAGE.format(
+                headers=OAI_HEADER.format(status='', suffix=1)
+                + OAI_HEADER.format(status='status="deleted"', suffix=2),
+                token='page-2',
+            ),
+            OAI_PAGE.format(
+                headers=OAI_HEADER.format(status='', suffix=3),
+                token='',
+            ),
+        ]
+        since = datetime(2026, 10, 1, tzinfo=timezone.utc)
+
+        with patch.object(
+            self.service.session,
+            'get',
+            side_effect=[oai_response(page) for page in pages],
+        ) as mock_get:
+            items = list(self.service.changed_items(since))
+
+        self.assertEqual(items, [
+            ('20.500.1/1', False),
+            ('20.500.1/2', True),
+            ('20.500.1/3', False),
+        ])
+        first, second = mock_get.call_args_list
+        self.assertEqual(first.args[0], 'http://ri.example.com/oai/request')
+        self.assertEqual(
+            first.kwargs['params']['from'], '2026-10-01T00:00:00Z'
+        )
+        self.assertEqual(first.kwargs['timeout'], 5)
+        self.assertEqual(
+            second.kwargs['params'],
+            {'verb': 'ListIdentifiers', 'resumptionToken': 'page-2'},
+        )
+
+    def test_changed_items_without_matches(self):
+        """
+        Test an empty harvest lists no items.
+        """
+        with patch.object(
+            self.service.session,
+            'get',
+            return_value=oai_response(OAI_NO_RECORDS),
+        ):
+            items = list(self.service.changed_items(
+                datetime(2026, 10, 1, tzinfo=timezone.utc)
+            ))
+
+        self.assertEqual(items, [])
+
+    def test_item_details(self):
+        """
+        Test item details are fetched with the timeout and their metadata
+        is flattened.
+        """
+        response = Mock()
+        response.json.return_value = {
+            'uuid': 'uuid-1',
+            'metadata': [
+                {'key': 'dc.title', 'value': 'Title'},
+                {'key': 'dc.rights', 'value': 'open'},
+            ],
+            'bitstreams': [],
+        }
+
+        with patch.object(
+            self.service.session, 'get', return_value=response
+        ) as mock_get:
+            item = self.service.item_details('uuid-1')
+
+        self.assertEqual(
+            item['metadata'], {'dc.title': 'Title', 'dc.rights': 'open'}
+        )
+        mock_get.assert_called_once_with(
+            'http://ri.example.com/rest/items/uuid-1',
+            timeout=5,
+            params={'expand': 'metadata,bitstreams'},
+        )
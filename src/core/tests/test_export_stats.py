@@ -0,0 +1,132 @@
+"""
+Test the streaming statistics exports.
+"""
+
+import csv
+import gzip
+import io
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from core import models
+
+
+DOCUMENTS_EXPORT_URL = reverse('admin:most_consulted_documents_stats_export')
+SAVED_DOCUMENTS_EXPORT_URL = reverse('admin:saved_documents_export')
+CHAT_SESSIONS_EXPORT_URL = reverse('admin:chat_sessions_export')
+FIELD_OF_STUDY_EXPORT_URL = reverse('admin:user_field_of_study_stats_export')
+
+
+def create_user(**params):
+    """
+    Helper function to create a user.
+    """
+    return get_user_model().objects.create_user(**params)
+
+
+def read_csv(response, compressed=False):
+    """
+    Consume a streaming response and parse it as CSV.
+    """
+    content = b''.join(response.streaming_content)
+    if compressed:
+        content = gzip.decompress(content)
+    return list(csv.reader(io.StringIO(content.decode())))
+
+
+class ExportStatsTests(TestCase):
+    """
+    Test the admin CSV exports.
+    """
+
+    def setUp(self):
+        self.admin = get_user_model().objects.create_superuser(
+            email='admin@example.com',
+            password='testpass1234',
+        )
+        self.client.force_login(self.admin)
+
+        self.user = create_user(email='user@example.com', name='User')
+        for i in range(12):
+            document = models.Document.objects.create(
+                id=str(i),
+                title=f'Document {i}',
+                repository_uri=f'https://example.com/{i}',
+                repository_id=f'repo_{i}',
+            )
+            models.SavedDocument.objects.create(
+                user=self.user,
+                document=document
+            )
+
+    def test_export_is_streamed(self):
+        """
+        Test exports are streaming CSV attachments.
+        """
+        res = self.client.get(FIELD_OF_STUDY_EXPORT_URL)
+
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        self.assertEqual(
+            res['Content-Disposition'],
+            'attachment; filename=user_field_of_study_stats.csv'
+        )
+        self.assertEqual(read_csv(res), [
+            ['Category', 'Field', 'Count'],
+            ['user_field_of_study', 'No field', '2'],
+        ])
+
+    def test_export_top_and_full(self):
+        """
+        Test exports are capped unless the full dataset is requested.
+        """
+        capped = read_csv(self.client.get(DOCUMENTS_EXPORT_URL))
+        full = read_csv(self.client.get(DOCUMENTS_EXPORT_URL, {'full': 1}))
+
+        self.assertEqual(len(capped), 11)
+        self.assertEqual(len(full), 13)
+
+    def test_export_gzip(self):
+        """
+        Test exports can be downloaded gzipped.
+        """
+        res = self.client.get(SAVED_DOCUMENTS_EXPORT_URL, {'gzip': 1})
+
+        self.assertEqual(res['Content-Type'], 'application/gzip')
+        self.assertIn('saved_documents.csv.gz', res['Content-Disposition'])
+        rows = read_csv(res, compressed=True)
+        self.assertEqual(len(rows), 13)
+        self.assertEqual(rows[1][2], 'user@example.com')
+
+    def test_export_chat_sessions(self):
+        """
+        Test every chat session row is exported.
+        """
+        models.ChatSession.objects.create(
+            session_id='session',
+            session_name='Session',
+            user=self.user,
+            assistant_id='assistant',
+        )
+
+        rows = read_csv(self.client.get(CHAT_SESSIONS_EXPORT_URL))
+
+        self.assertEqual(rows[1][:5], [
+            'session',
+            'Session',
+            str(self.user.pk),
+            'user@example.com',
+            'assistant',
+        ])
+
+    def test_export_requires_staff(self):
+        """
+        Test exports are not available to regular users.
+        """
+        self.client.force_login(self.user)
+
+        res = self.client.get(SAVED_DOCUMENTS_EXPORT_URL)
+
+        self.assertEqual(res.status_code, 302)
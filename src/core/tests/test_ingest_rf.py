@@ -4,14 +4,22 @@ Test custom Django management commands for ingest_rf.
 
 import os
 import tempfile
-from functools import wraps
+import threading
+from datetime import timedelta
+from functools import partial, wraps
 from io import StringIO
 from unittest.mock import AsyncMock, Mock, patch
 
 from django.core.management import CommandError, call_command
+from django.db import connections
 from django.test import TestCase
+from django.utils import timezone
 
-from core.management.commands.ingest_rf import Command as IngestCommand
+from core.management.commands.ingest_rf import (
+    INGEST_LOCK_KEY,
+    Command as IngestCommand,
+)
+from core.models import Document, IngestRun, KeywordCount
 
 
 def silence_ingest_output(test_method):
@@ -72,6 +80,35 @@ class IngestRFCommandTests(TestCase):
 
         shutil.rmtree(self.test_folder, ignore_errors=True)
 
+    def mock_repository(self, mock_dspace_class, handles):
+        """
+        Make the mocked DSpace service list `handles` as changed items with
+        a PDF each, and the mocked dataset name its uploads after them.
+        """
+        dspace = mock_dspace_class.return_value
+        dspace.base_url = "http://test-ri.com"
+        dspace.changed_items.return_value = [
+            (handle, False) for handle in handles
+        ]
+        dspace.item_by_handle.side_effect = lambda handle: {
+            "uuid": "uuid-" + handle[-1]
+        }
+        dspace.item_details.side_effect = lambda uuid: {
+            "name": uuid,
+            "uuid": uuid,
+            "handle": "h/" + uuid[-1],
+            "bitstreams": [
+                {"uuid": "bitstream", "mimeType": "application/pdf"}
+            ],
+        }
+        dspace.download_bitstream.side_effect = (
+            lambda uuid, path: open(path, "wb").close()
+        )
+        self.mock_dataset.upload_documents.side_effect = lambda documents: [
+            Mock(id=documents[0]["display_name"].replace("uuid", "ragflow"))
+        ]
+        return dspace
+
     @silence_ingest_output
     def test_missing_environment_variables(self):
         """
@@ -111,11 +148,13 @@ class IngestRFCommandTests(TestCase):
     @patch("core.management.commands.ingest_rf.get_orphaned_documents")
     @patch("core.management.commands.ingest_rf.get_dataset_by_id")
     @patch.object(IngestCommand, "_get_existing_repository_uuids")
+    @patch("core.management.commands.ingest_rf.DSpaceService")
     @patch("core.management.commands.ingest_rf.RAGFlow")
     @silence_ingest_output
     def test_successful_initialization(
         self,
         mock_ragflow_class,
+        mock_dspace_class,
         mock_get_uuids,
         mock_get_dataset,
         mock_get_orphaned,
@@ -131,39 +170,35 @@ class IngestRFCommandTests(TestCase):
         mock_get_dataset.return_value = self.mock_dataset
         mock_get_orphaned.return_value = {}  # No orphaned documents
 
-        # Mock the parallel processing to return empty
-        # result (no new documents)
-        with patch(
-            "core.management.commands.ingest_rf.process_items_in_parallel"
-        ) as mock_process:
-            mock_process.return_value = {}
-
-            # Mock asyncio.run for monitoring
-            with patch("asyncio.run"):
-                try:
-                    call_command("ingest_rf", folder_path=self.test_folder)
-                    # If we get here, command executed without errors
-                    self.assertTrue(True)
-                except CommandError:
-                    self.fail("Command raised CommandError unexpectedly")
+        # No new documents in the repository
+        self.mock_repository(mock_dspace_class, [])
+
+        # Mock asyncio.run for monitoring
+        with patch("asyncio.run"):
+            try:
+                call_command("ingest_rf", folder_path=self.test_folder)
+                # If we get here, command executed without errors
+                self.assertTrue(True)
+            except CommandError:
+                self.fail("Command raised CommandError unexpectedly")
 
     @patch("core.management.commands.ingest_rf.display_final_summary")
     @patch("core.management.commands.ingest_rf.get_orphaned_documents")
     @patch("core.management.commands.ingest_rf.get_dataset_by_id")
     @patch.object(IngestCommand, "_get_existing_repository_uuids")
     @patch.object(IngestCommand, "_create_documents")
-    @patch("core.management.commands.ingest_rf.remove_temp_pdf")
     @patch(
         "core.management.commands.ingest_rf.monitor_parsing",
         new_callable=AsyncMock,
     )
+    @patch("core.management.commands.ingest_rf.DSpaceService")
     @patch("core.management.commands.ingest_rf.RAGFlow")
     @silence_ingest_output
     def test_document_processing_flow(
         self,
         mock_ragflow_class,
+        mock_dspace_class,
         mock_monitor_parsing,
-        mock_remove_pdf,
         mock_create_docs,
         mock_get_uuids,
         mock_get_dataset,
@@ -179,83 +214,50 @@ class IngestRFCommandTests(TestCase):
         mock_get_uuids.return_value = set()
         mock_get_dataset.return_value = self.mock_dataset
         mock_get_orphaned.return_value = {}  # No orphaned documents
+        self.mock_repository(mock_dspace_class, ["h/1", "h/2", "h/3"])
+
+        # Mock dataset.list_documents to return done status
+        mock_doc1 = Mock()
+        mock_doc1.id = "ragflow-1.pdf"
+        mock_doc1.run = "DONE"
+        mock_doc2 = Mock()
+        mock_doc2.id = "ragflow-2.pdf"
+        mock_doc2.run = "DONE"
+        self.mock_dataset.list_documents.return_value = [
+            mock_doc1,
+            mock_doc2,
+        ]
 
-        # Mock document data
-        test_document_ids = ["doc-1", "doc-2"]
-        test_metadata_map = {
-            "doc-1": {
-                "name": "Test Document 1",
-                "uuid": "uuid-1",
-                "handle": "12345",
-                "metadata": {"dc.rights": "open"},
-                "bitstreams": [{"name": "doc1.pdf"}],
-                "inArchive": True,
-                "discoverable": True,
-                "withdrawn": False,
-            },
-            "doc-2": {
-                "name": "Test Document 2",
-                "uuid": "uuid-2",
-                "handle": "67890",
-                "metadata": {"dc.rights": "restricted"},
-                "bitstreams": [{"name": "doc2.pdf"}],
-                "inArchive": True,
-                "discoverable": False,
-                "withdrawn": False,
-            },
-        }
+        # Call command with limit items
+        call_command("ingest_rf", li=2, folder_path=self.test_folder)
 
-        # Mock the parallel processing to return our test data
-        with patch(
-            "core.management.commands.ingest_rf.process_items_in_parallel"
-        ) as mock_process:
-            # Make process_items_in_parallel modify document_ids
-            def side_effect(**kwargs):
-                document_ids_arg = kwargs.get("document_ids", [])
-                if document_ids_arg is not None:
-                    document_ids_arg.extend(test_document_ids)
-                return test_metadata_map
-
-            mock_process.side_effect = side_effect
-
-            # Mock dataset.list_documents to return done status
-            mock_doc1 = Mock()
-            mock_doc1.id = "doc-1"
-            mock_doc1.run = "DONE"
-            mock_doc2 = Mock()
-            mock_doc2.id = "doc-2"
-            mock_doc2.run = "DONE"
-            self.mock_dataset.list_documents.return_value = [
-                mock_doc1,
-                mock_doc2,
-            ]
-
-            # Call command with limit items
-            call_command("ingest_rf", li=2, folder_path=self.test_folder)
-
-            # Verify document creation was called once
-            # (not twice due to orphaned docs)
-            self.assertTrue(mock_create_docs.called)
-
-            # Verify monitoring was called (if applicable)
-            if mock_monitor_parsing.called:
-                mock_monitor_parsing.assert_called()
-
-            # Verify PDF removal was called with correct file names
-            mock_remove_pdf.assert_called_once()
-            call_args = mock_remove_pdf.call_args[1]
-            self.assertEqual(call_args["folder_path"], self.test_folder)
-            self.assertIn("doc1.pdf", call_args["processed_file_names"])
-            self.assertIn("doc2.pdf", call_args["processed_file_names"])
+        # Verify only the limited items were uploaded and parsed
+        self.assertEqual(self.mock_dataset.upload_documents.call_count, 2)
+        self.mock_dataset.async_parse_documents.assert_called_once()
+        self.assertEqual(
+            sorted(
+                mock_monitor_parsing.call_args.kwargs["document_ids"]
+            ),
+            ["ragflow-1.pdf", "ragflow-2.pdf"],
+        )
+
+        # Verify document creation was called once
+        # (not twice due to orphaned docs)
+        self.assertTrue(mock_create_docs.called)
+
+        # Verify the uploaded PDFs were removed
+        self.assertEqual(os.listdir(self.test_folder), [])
 
     @patch("core.management.commands.ingest_rf.get_orphaned_documents")
     @patch("core.management.commands.ingest_rf.get_dataset_by_id")
     @patch.object(IngestCommand, "_get_existing_repository_uuids")
+    @patch("core.management.commands.ingest_rf.DSpaceService")
     @patch("core.management.commands.ingest_rf.RAGFlow")
     @silence_ingest_output
     def test_no_new_documents(
         self,
         mock_ragflow_class,
+        mock_dspace_class,
         mock_get_uuids,
         mock_get_dataset,
         mock_get_orphaned,
@@ -270,17 +272,21 @@ class IngestRFCommandTests(TestCase):
         mock_get_dataset.return_value = self.mock_dataset
         mock_get_orphaned.return_value = {}  # No orphaned documents
 
-        # Mock empty results from processing (all documents already exist)
-        with patch(
-            "core.management.commands.ingest_rf.process_items_in_parallel"
-        ) as mock_process:
-            mock_process.return_value = {}
+        # All documents already exist
+        Document.objects.create(
+            id="ragflow-1",
+            title="Existing",
+            repository_uri="http://test-ri.com/xmlui/handle/h/1",
+            repository_id="existing_uuids-1",
+        )
+        self.mock_repository(mock_dspace_class, ["h/1"])
 
-            with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
-                call_command("ingest_rf", folder_path=self.test_folder)
+        with patch("sys.stdout", new_callable=StringIO) as mock_stdout:
+            call_command("ingest_rf", folder_path=self.test_folder)
 
-                output = mock_stdout.getvalue()
-                self.assertIn("No new documents to ingest", output)
+            output = mock_stdout.getvalue()
+            self.assertIn("No new documents to ingest", output)
+        mock_dspace_class.return_value.item_details.assert_not_called()
 
     @silence_ingest_output
     def test_determine_document_status(self):
@@ -322,9 +328,8 @@ class IngestRFCommandTests(TestCase):
         status = command._determine_document_status(metadata_embargo)
         self.assertEqual(status, "E")
 
-    @patch("core.models.Document.objects.update_or_create")
     @silence_ingest_output
-    def test_create_documents(self, mock_update_or_create):
+    def test_create_documents(self):
         """
         Test the _create_documents method.
         """
@@ -344,17 +349,17 @@ class IngestRFCommandTests(TestCase):
             }
         }
 
-        # Mock successful document creation
-        mock_update_or_create.return_value = (
-            Mock(),
-            True,
-        )  # (instance, created)
-
         with patch("sys.stdout", new_callable=StringIO):
             command._create_documents(test_metadata_map)
 
         # Verify document was created with correct parameters
-        mock_update_or_create.assert_called_once()
+        document = Document.objects.get(repository_id="test-uuid")
+        self.assertEqual(document.id, "ragflow-1")
+        self.assertEqual(document.title, "Test Doc")
+        self.assertEqual(
+            document.repository_uri, "http://test-ri.com/xmlui/handle/12345"
+        )
+        self.assertEqual(document.status, "L")
 
     @patch("core.management.commands.ingest_rf.RAGFlow")
     @patch("core.management.commands.ingest_rf.get_dataset_by_id")
@@ -403,11 +408,17 @@ class IngestRFCommandTests(TestCase):
     @patch("core.management.commands.ingest_rf.get_orphaned_documents")
     @patch("core.management.commands.ingest_rf.get_dataset_by_id")
     @patch.object(IngestCommand, "_get_existing_repository_uuids")
+    @patch.object(IngestCommand, "_advance_items")
+    @patch.object(IngestCommand, "_ingest_changed_items")
+    @patch("core.management.commands.ingest_rf.DSpaceService")
     @patch("core.management.commands.ingest_rf.RAGFlow")
     @silence_ingest_output
     def test_command_arguments(
         self,
         mock_ragflow_class,
+        mock_dspace_class,
+        mock_ingest_changed,
+        mock_advance,
         mock_get_uuids,
         mock_get_dataset,
         mock_get_orphaned,
@@ -423,32 +434,32 @@ class IngestRFCommandTests(TestCase):
         mock_get_dataset.return_value = self.mock_dataset
         mock_get_orphaned.return_value = {}  # No orphaned documents
 
-        with patch(
-            "core.management.commands.ingest_rf.process_items_in_parallel"
-        ) as mock_process:
-            mock_process.return_value = {}
-            with patch("asyncio.run"):
-                # Test with custom arguments
-                call_command(
-                    "ingest_rf",
-                    li=5,
-                    folder_path=self.test_folder,
-                    max_tasks=10,
-                    poll_interval=1.0,
-                )
-
-                # Verify process_items_in_parallel was
-                # called with correct arguments
-                mock_process.assert_called_once()
-                call_args = mock_process.call_args[1]
-                self.assertEqual(call_args["limit_items"], 5)
-                self.assertEqual(call_args["max_concurrent_tasks"], 10)
-                self.assertEqual(call_args["folder_path"], self.test_folder)
+        with patch("asyncio.run"):
+            # Test with custom arguments
+            call_command(
+                "ingest_rf",
+                li=5,
+                folder_path=self.test_folder,
+                max_tasks=10,
+                poll_interval=1.0,
+                request_timeout=5.0,
+            )
+
+            # Verify the pipeline was called with correct arguments
+            self.assertEqual(
+                mock_dspace_class.call_args.kwargs["timeout"], 5.0
+            )
+            call_args = mock_ingest_changed.call_args.kwargs
+            self.assertEqual(call_args["limit"], 5)
+            self.assertEqual(call_args["max_workers"], 10)
+            call_args = mock_advance.call_args.kwargs
+            self.assertEqual(call_args["folder_path"], self.test_folder)
+            self.assertEqual(call_args["max_workers"], 10)
+            self.assertIsNone(call_args["streamer"])
 
-    @patch("core.models.Document.objects.update_or_create")
     @patch.dict(os.environ, {"RI_BASE_URL": "http://test-ri.com"})
     @silence_ingest_output
-    def test_create_documents_success(self, mock_update_or_create):
+    def test_create_documents_success(self):
         """
         Test _create_documents with successful document creation.
         """
@@ -456,6 +467,12 @@ class IngestRFCommandTests(TestCase):
         command.stdout = Mock()
         command.stderr = Mock()
 
+        Document.objects.create(
+            id="ragflow-old",
+            title="Old Title",
+            repository_uri="http://test-ri.com/xmlui/handle/1",
+            repository_id="uuid-2",
+        )
         metadata_map = {
             "ragflow-1": {
                 "name": "Test Document 1",
@@ -477,25 +494,633 @@ class IngestRFCommandTests(TestCase):
             },
         }
 
-        # Mock first call returns created=True, second returns created=False
-        mock_update_or_create.side_effect = [
-            (Mock(), True),  # First document created
-            (Mock(), False),  # Second document updated
+        # The first document is created, the second one updated
+        with self.assertNumQueries(6):
+            command._create_documents(metadata_map)
+
+        self.assertEqual(Document.objects.count(), 2)
+        updated = Document.objects.get(repository_id="uuid-2")
+        self.assertEqual(updated.id, "ragflow-old")
+        self.assertEqual(updated.title, "Test Document 2")
+        self.assertEqual(updated.status, "R")
+        self.assertEqual(KeywordCount.objects.get(word="old").count, 0)
+        self.assertEqual(KeywordCount.objects.get(word="document").count, 2)
+
+        # Verify stdout writes
+        writes = [c.args[0] for c in command.stdout.write.call_args_list]
+        self.assertEqual(writes[:2], [
+            "Created document: Test Document 1",
+            "Updated document: Test Document 2",
+        ])
+        self.assertIn("1 created, 1 updated,0 errors", writes[2])
+        command.stderr.write.assert_not_called()
+
+    @silence_ingest_output
+    def test_create_documents_batches(self):
+        """
+        Test _create_documents writes the documents in batches and reports
+        the documents of a failing batch one by one.
+        """
+        command = IngestCommand()
+        command.stdout = Mock()
+        command.stderr = Mock()
+
+        # Its RAGFlow ID is taken by another repository item
+        Document.objects.create(
+            id="ragflow-3",
+            title="Other",
+            repository_uri="http://test-ri.com/xmlui/handle/1",
+            repository_id="uuid-other",
+        )
+        metadata_map = {
+            f"ragflow-{i}": {"name": f"Document {i}", "uuid": f"uuid-{i}"}
+            for i in range(5)
+        }
+
+        with patch.object(
+            IngestCommand,
+            "_upsert_documents",
+            autospec=True,
+            side_effect=IngestCommand._upsert_documents,
+        ) as mock_upsert:
+            command._create_documents(metadata_map, batch_size=2)
+
+        # The failing second batch is retried one document at a time
+        self.assertEqual(
+            [len(c.args[1]) for c in mock_upsert.call_args_list],
+            [2, 2, 1, 1, 1],
+        )
+        self.assertEqual(
+            Document.objects.filter(repository_id__startswith="uuid-").count(),
+            5,
+        )
+        self.assertFalse(
+            Document.objects.filter(repository_id="uuid-3").exists()
+        )
+        command.stderr.write.assert_called_once()
+        self.assertIn("ragflow-3", command.stderr.write.call_args.args[0])
+        self.assertIn(
+            "4 created, 0 updated,1 errors",
+            command.stdout.write.call_args.args[0],
+        )
+
+    @silence_ingest_output
+    def test_create_documents_without_uuid(self):
+        """
+        Test _create_documents reports items without a repository UUID
+        instead of registering them.
+        """
+        command = IngestCommand()
+        command.stdout = Mock()
+        command.stderr = Mock()
+
+        command._create_documents({
+            "ragflow-1": {"name": "Document 1", "uuid": "uuid-1"},
+            "ragflow-2": {"name": "Document 2"},
+        })
+
+        self.assertEqual(
+            list(Document.objects.values_list("id", flat=True)),
+            ["ragflow-1"],
+        )
+        self.assertIn("ragflow-2", command.stderr.write.call_args.args[0])
+        self.assertEqual(command.counts["errors"], 1)
+
+    @patch("core.management.commands.ingest_rf.RETRY_BACKOFF", 0)
+    @patch.object(IngestCommand, "_create_documents")
+    def test_register_orphaned_documents(self, mock_create_docs):
+        """
+        Test orphaned metadata is fetched with retries and registered in
+        batches as it arrives.
+        """
+        command = IngestCommand()
+        command.stderr = Mock()
+
+        attempts = {}
+
+        def item_details(uuid):
+            attempts[uuid] = attempts.get(uuid, 0) + 1
+            if uuid == "uuid-broken":
+                raise ConnectionError("timed out")
+            if uuid == "uuid-1" and attempts[uuid] == 1:
+                raise ConnectionError("timed out")
+            return {"name": uuid, "uuid": uuid}
+
+        dspace = Mock()
+        dspace.item_details.side_effect = item_details
+        orphaned_documents = {
+            "ragflow-0": "uuid-0",
+            "ragflow-1": "uuid-1",
+            "ragflow-2": "uuid-2",
+            "ragflow-broken": "uuid-broken",
+        }
+
+        with patch("sys.stderr", new_callable=StringIO):
+            metadata_map = command._register_orphaned_documents(
+                orphaned_documents,
+                dspace,
+                max_workers=2,
+                retries=2,
+                batch_size=2,
+            )
+
+        self.assertEqual(
+            sorted(metadata_map), ["ragflow-0", "ragflow-1", "ragflow-2"]
+        )
+        self.assertEqual(attempts["uuid-1"], 2)
+        self.assertEqual(attempts["uuid-broken"], 3)
+        self.assertEqual(
+            [len(c.args[0]) for c in mock_create_docs.call_args_list],
+            [2, 1],
+        )
+        command.stderr.write.assert_called_once()
+        self.assertIn("uuid-broken", command.stderr.write.call_args.args[0])
+
+    @silence_ingest_output
+    def test_ingest_changed_items(self):
+        """
+        Test incremental ingest refreshes known items, checkpoints new ones
+        and restricts withdrawn ones.
+        """
+        command = IngestCommand()
+        command.stderr = Mock()
+        run = IngestRun.objects.create(mode="I", since=timezone.now())
+
+        Document.objects.create(
+            id="ragflow-1",
+            title="Old Title",
+            repository_uri="http://test-ri.com/xmlui/handle/h/1",
+            repository_id="uuid-1",
+        )
+        Document.objects.create(
+            id="ragflow-3",
+            title="Withdrawn",
+            repository_uri="http://test-ri.com/xmlui/handle/h/3",
+            repository_id="uuid-3",
+        )
+
+        dspace = Mock()
+        dspace.base_url = "http://test-ri.com"
+        dspace.base_url_rest = "http://test-ri-rest.com"
+        dspace.changed_items.return_value = [
+            ("h/1", False),
+            ("h/2", False),
+            ("h/3", True),
         ]
+        dspace.item_by_handle.side_effect = lambda handle: {
+            "uuid": "uuid-" + handle[-1]
+        }
+        dspace.item_details.side_effect = lambda uuid: {
+            "name": f"New {uuid}",
+            "uuid": uuid,
+            "handle": "h/" + uuid[-1],
+            "metadata": {"dc.rights": "open"},
+        }
 
-        command._create_documents(metadata_map)
+        with patch("sys.stderr", new_callable=StringIO):
+            command._ingest_changed_items(
+                run, dspace, max_workers=2, retries=0
+            )
 
-        # Verify update_or_create was called twice
-        self.assertEqual(mock_update_or_create.call_count, 2)
+        dspace.changed_items.assert_called_once_with(run.since)
+        self.assertEqual(
+            dict(run.items.values_list("repository_id", "state")),
+            {"uuid-1": "done", "uuid-2": "discovered"},
+        )
+        self.assertEqual(
+            Document.objects.get(repository_id="uuid-1").title, "New uuid-1"
+        )
+        self.assertEqual(Document.objects.get(id="ragflow-3").status, "R")
+        self.assertEqual(command.counts["seen"], 3)
+        self.assertEqual(command.counts["updated"], 1)
+
+        # Checkpointed items are not fetched again
+        dspace.item_details.reset_mock()
+        command._ingest_changed_items(
+            run, dspace, max_workers=2, retries=0
+        )
+        dspace.item_details.assert_not_called()
+
+    @silence_ingest_output
+    def test_failed_items_do_not_hold_watermark(self):
+        """
+        Test failing items are checkpointed as failed, let the watermark
+        move forward and are retried by the next incremental run.
+        """
+        command = IngestCommand()
+        command.stderr = Mock()
+        watermark = timezone.now() - timedelta(days=1)
+        previous = IngestRun.objects.create(status="S", watermark=watermark)
+        previous.items.create(
+            repository_id="uuid-4", handle="h/4", state="failed"
+        )
+        run = IngestRun.objects.create(mode="I", since=watermark)
+
+        dspace = Mock()
+        dspace.base_url = "http://test-ri.com"
+        dspace.base_url_rest = "http://test-ri-rest.com"
+        dspace.changed_items.return_value = [("h/5", False)]
+        broken = {"h/5"}
+
+        def item_by_handle(handle):
+            if handle in broken:
+                raise ValueError("not found")
+            return {"uuid": "uuid-" + handle[-1]}
+
+        dspace.item_by_handle.side_effect = item_by_handle
+        dspace.item_details.side_effect = lambda uuid: {
+            "uuid": uuid, "handle": "h/" + uuid[-1]
+        }
+
+        with patch("sys.stderr", new_callable=StringIO):
+            command._ingest_changed_items(
+                run, dspace, max_workers=1, retries=0
+            )
 
-        # Verify stdout writes
         self.assertEqual(
-            command.stdout.write.call_count, 3
-        )  # 2 documents + summary
+            sorted(run.items.values_list("handle", "repository_id", "state")),
+            [("h/4", "uuid-4", "discovered"), ("h/5", "", "failed")],
+        )
+        command._finish_run(run, "S", complete=True)
+        self.assertEqual(run.errors, 1)
+        self.assertEqual(run.watermark, run.started_at)
+
+        # Resuming fetches the failed item again
+        broken.clear()
+        with patch("sys.stderr", new_callable=StringIO):
+            command._ingest_changed_items(
+                run, dspace, max_workers=1, retries=0
+            )
+        self.assertEqual(
+            sorted(run.items.values_list("handle", "repository_id", "state")),
+            [("h/4", "uuid-4", "discovered"), ("h/5", "uuid-5", "discovered")],
+        )
+
+    def test_advance_items_from_checkpoints(self):
+        """
+        Test items continue from their checkpoint without downloading or
+        uploading anything twice.
+        """
+        command = IngestCommand()
+        command.stderr = Mock()
+        run = IngestRun.objects.create(mode="I", since=timezone.now())
+        bitstreams = [{"uuid": "bitstream", "mimeType": "application/pdf"}]
+        for uuid, state, ragflow_id in [
+            ("uuid-1", "discovered", ""),
+            ("uuid-2", "downloaded", ""),
+            ("uuid-3", "uploaded", "ragflow-3"),
+            ("uuid-4", "done", "ragflow-4"),
+            ("uuid-5", "discovered", ""),
+        ]:
+            run.items.create(
+                repository_id=uuid,
+                state=state,
+                ragflow_id=ragflow_id,
+                metadata={"uuid": uuid, "bitstreams": bitstreams},
+            )
+        run.items.filter(repository_id="uuid-5").update(metadata={})
+        with open(os.path.join(self.test_folder, "uuid-2.pdf"), "wb") as f:
+            f.write(b"%PDF-2")
+
+        def download_bitstream(uuid, path):
+            with open(path, "wb") as f:
+                f.write(b"%PDF-1")
+
+        dspace = Mock()
+        dspace.download_bitstream.side_effect = download_bitstream
+        dataset = Mock()
+        dataset.upload_documents.side_effect = lambda documents: [
+            Mock(id="ragflow-" + documents[0]["display_name"][5])
+        ]
+
+        with patch("sys.stderr", new_callable=StringIO):
+            command._advance_items(
+                run,
+                dspace,
+                dataset=dataset,
+                folder_path=self.test_folder,
+                max_workers=2,
+            )
+
+        dspace.download_bitstream.assert_called_once()
+        self.assertEqual(
+            sorted(
+                c.args[0][0]["blob"]
+                for c in dataset.upload_documents.call_args_list
+            ),
+            [b"%PDF-1", b"%PDF-2"],
+        )
+        self.assertEqual(
+            sorted(dataset.async_parse_documents.call_args.args[0]),
+            ["ragflow-1", "ragflow-2", "ragflow-3"],
+        )
+        self.assertEqual(
+            dict(run.items.values_list("repository_id", "state")),
+            {
+                "uuid-1": "parsing",
+                "uuid-2": "parsing",
+                "uuid-3": "parsing",
+                "uuid-4": "done",
+                "uuid-5": "failed",
+            },
+        )
+        self.assertEqual(os.listdir(self.test_folder), [])
+
+    def test_advance_items_streaming(self):
+        """
+        Test streamed items go straight to RAGFlow through a bounded
+        buffer, without files in the folder path.
+        """
+        command = IngestCommand()
+        command.stderr = Mock()
+        run = IngestRun.objects.create(mode="F")
+        run.items.create(
+            repository_id="uuid-1",
+            metadata={
+                "uuid": "uuid-1",
+                "bitstreams": [
+                    {"uuid": "bitstream", "mimeType": "application/pdf"}
+                ],
+            },
+        )
+
+        buffers = []
+
+        def copy_bitstream(uuid, file):
+            file.write(b"%PDF" * 100)
+            buffers.append(file)
+
+        def upload_document(dataset_id, file_name, file):
+            file.seek(0)
+            self.assertEqual(file.read(), b"%PDF" * 100)
+            return {"code": 0, "data": [{"id": "ragflow-1"}]}
+
+        dspace = Mock()
+        dspace.copy_bitstream.side_effect = copy_bitstream
+        ragflow = Mock()
+        ragflow.upload_document.side_effect = upload_document
+        dataset = Mock()
+
+        with patch("sys.stderr", new_callable=StringIO):
+            command._advance_items(
+                run,
+                dspace,
+                dataset=dataset,
+                folder_path=self.test_folder,
+                max_workers=1,
+                streamer=partial(
+                    command._stream_item,
+                    dspace,
+                    ragflow,
+                    "test-dataset-id",
+                    spool_size=1024,
+                ),
+            )
+
+        ragflow.upload_document.assert_called_once()
+        self.assertEqual(
+            ragflow.upload_document.call_args.args[:2],
+            ("test-dataset-id", "uuid-1.pdf"),
+        )
+        self.assertFalse(buffers[0]._rolled)
+        dataset.upload_documents.assert_not_called()
+        dspace.download_bitstream.assert_not_called()
+        dataset.async_parse_documents.assert_called_once_with(["ragflow-1"])
+        item = run.items.get()
+        self.assertEqual(item.state, "parsing")
+        self.assertEqual(item.ragflow_id, "ragflow-1")
+        self.assertEqual(os.listdir(self.test_folder), [])
+
+    @patch("core.management.commands.ingest_rf.display_final_summary")
+    @patch("core.management.commands.ingest_rf.filter_done_documents")
+    @patch(
+        "core.management.commands.ingest_rf.monitor_parsing",
+        new_callable=AsyncMock,
+    )
+    @patch("core.management.commands.ingest_rf.get_dataset_by_id")
+    @patch("core.management.commands.ingest_rf.DSpaceService")
+    @patch("core.management.commands.ingest_rf.RAGFlow")
+    @silence_ingest_output
+    def test_failed_documents_of_run_are_removed(
+        self,
+        mock_ragflow_class,
+        mock_dspace_class,
+        mock_get_dataset,
+        mock_monitor_parsing,
+        mock_filter_done,
+        mock_display_summary,
+    ):
+        """
+        Test only the documents of the run that did not finish parsing are
+        removed from RAGFlow, and their items are left to upload again.
+        """
+        IngestRun.objects.create(
+            status="S", watermark=timezone.now() - timedelta(days=1)
+        )
+        self.mock_repository(mock_dspace_class, ["h/1", "h/2"])
+        mock_get_dataset.return_value = self.mock_dataset
+        mock_filter_done.side_effect = lambda dataset, metadata_map: {
+            "ragflow-1.pdf": metadata_map["ragflow-1.pdf"]
+        }
+
+        call_command(
+            "ingest_rf", incremental=True, folder_path=self.test_folder
+        )
+
+        self.mock_dataset.delete_documents.assert_called_once_with(
+            ids=["ragflow-2.pdf"]
+        )
+        run = IngestRun.objects.latest("started_at")
+        self.assertEqual(
+            sorted(run.items.values_list("repository_id", "ragflow_id")),
+            [("uuid-1", "ragflow-1.pdf"), ("uuid-2", "")],
+        )
+        self.assertEqual(run.items.get(repository_id="uuid-2").state, "failed")
+        self.assertEqual(
+            list(Document.objects.values_list("id", flat=True)),
+            ["ragflow-1.pdf"],
+        )
+
+    @patch.object(IngestCommand, "_ingest")
+    @silence_ingest_output
+    def test_incremental_run_watermark(self, mock_ingest):
+        """
+        Test incremental runs start from the last successful watermark
+        and move it forward.
+        """
+        watermark = timezone.now() - timedelta(days=1)
+        IngestRun.objects.create(status="S", watermark=watermark)
+
+        call_command("ingest_rf", incremental=True)
+
+        run = IngestRun.objects.latest("started_at")
+        self.assertEqual(mock_ingest.call_args.args[0], run)
+        self.assertEqual(run.since, watermark)
+        self.assertEqual(run.mode, "I")
+        self.assertEqual(run.status, "S")
+        self.assertEqual(run.watermark, run.started_at)
+
+    @patch.object(IngestCommand, "_ingest")
+    @silence_ingest_output
+    def test_run_without_watermark(self, mock_ingest):
+        """
+        Test failed and limited runs leave the watermark alone.
+        """
+        call_command("ingest_rf", incremental=True, li=5)
+
+        self.assertEqual(IngestRun.objects.get().mode, "F")
+        self.assertIsNone(IngestRun.objects.get().watermark)
+
+        mock_ingest.side_effect = CommandError("RAGFlow is down")
+        with self.assertRaises(CommandError):
+            call_command("ingest_rf")
+
+        run = IngestRun.objects.latest("started_at")
+        self.assertEqual(run.status, "F")
+        self.assertEqual(run.message, "RAGFlow is down")
+        self.assertIsNone(run.watermark)
+
+    @patch.object(IngestCommand, "_ingest")
+    @silence_ingest_output
+    def test_resume_unfinished_run(self, mock_ingest):
+        """
+        Test --resume continues the last unfinished run.
+        """
+        since = timezone.now() - timedelta(days=1)
+        run = IngestRun.objects.create(
+            mode="I", status="F", since=since, items_seen=7
+        )
+
+        call_command("ingest_rf", resume=True)
+
+        self.assertEqual(mock_ingest.call_args.args[0], run)
+        run.refresh_from_db()
+        self.assertEqual(run.status, "S")
+        self.assertEqual(run.items_seen, 7)
+        self.assertEqual(run.watermark, run.started_at)
+        self.assertEqual(IngestRun.objects.count(), 1)
+
+    @patch("core.management.commands.ingest_rf.display_final_summary")
+    @patch("core.management.commands.ingest_rf.filter_done_documents")
+    @patch(
+        "core.management.commands.ingest_rf.monitor_parsing",
+        new_callable=AsyncMock,
+    )
+    @patch("core.management.commands.ingest_rf.get_orphaned_documents")
+    @patch("core.management.commands.ingest_rf.get_dataset_by_id")
+    @patch("core.management.commands.ingest_rf.DSpaceService")
+    @patch("core.management.commands.ingest_rf.RAGFlow")
+    @silence_ingest_output
+    def test_resume_interrupted_full_run(
+        self,
+        mock_ragflow_class,
+        mock_dspace_class,
+        mock_get_dataset,
+        mock_get_orphaned,
+        mock_monitor_parsing,
+        mock_filter_done,
+        mock_display_summary,
+    ):
+        """
+        Test resuming a full run interrupted partway through its uploads
+        does not download or upload the checkpointed items again.
+        """
+        dspace = self.mock_repository(mock_dspace_class, ["h/1", "h/2"])
+        mock_get_dataset.return_value = self.mock_dataset
+        mock_get_orphaned.return_value = {}
+        mock_filter_done.side_effect = (
+            lambda dataset, metadata_map: metadata_map
+        )
+
+        uploads = []
+        upload = self.mock_dataset.upload_documents.side_effect
+        checkpoint = IngestCommand._checkpoint
+        uploaded = threading.Event()
+
+        def checkpoint_item(command, item, state, **kwargs):
+            checkpoint(command, item, state, **kwargs)
+            if state == "uploaded":
+                uploaded.set()
+
+        def upload_documents(documents):
+            uploads.append(documents[0]["display_name"])
+            if len(uploads) == 2:
+                # The process is killed once the first upload is
+                # checkpointed
+                uploaded.wait(5)
+                raise KeyboardInterrupt
+            return upload(documents)
+
+        self.mock_dataset.upload_documents.side_effect = upload_documents
+        with patch.object(
+            IngestCommand, "_checkpoint", autospec=True,
+            side_effect=checkpoint_item,
+        ):
+            with self.assertRaises(KeyboardInterrupt):
+                call_command(
+                    "ingest_rf", folder_path=self.test_folder, max_tasks=1
+                )
+
+        run = IngestRun.objects.get()
+        self.assertEqual(run.status, "R")
+        self.assertEqual(
+            sorted(run.items.values_list("state", flat=True)),
+            ["downloaded", "uploaded"],
+        )
+
+        call_command(
+            "ingest_rf", folder_path=self.test_folder, resume=True
+        )
+
+        first, second = uploads[:2]
+        self.assertEqual(uploads, [first, second, second])
+        self.assertEqual(dspace.download_bitstream.call_count, 2)
+        run.refresh_from_db()
+        self.assertEqual(run.status, "S")
+        self.assertEqual(
+            list(run.items.values_list("state", flat=True)), ["done"] * 2
+        )
+        self.assertEqual(Document.objects.count(), 2)
+
+    @patch.object(IngestCommand, "_ingest")
+    @silence_ingest_output
+    def test_resume_superseded_run(self, mock_ingest):
+        """
+        Test --resume ignores a failed run followed by a successful one.
+        """
+        failed = IngestRun.objects.create(status="F")
+        IngestRun.objects.create(status="S")
+
+        call_command("ingest_rf", resume=True)
+
+        mock_ingest.assert_not_called()
+        failed.refresh_from_db()
+        self.assertEqual(failed.status, "F")
+
+    @patch.object(IngestCommand, "_ingest")
+    def test_run_in_progress(self, mock_ingest):
+        """
+        Test the command refuses to run while another process holds the
+        ingest lock.
+        """
+        other = connections.create_connection("default")
+        try:
+            with other.cursor() as cursor:
+                cursor.execute(
+                    "SELECT pg_advisory_lock(%s)", [INGEST_LOCK_KEY]
+                )
+            with self.assertRaisesMessage(
+                CommandError, "Another ingest run is in progress"
+            ):
+                call_command("ingest_rf", resume=True)
+        finally:
+            other.close()
+
+        mock_ingest.assert_not_called()
 
-    @patch("core.models.Document.objects.update_or_create")
+    @patch.object(IngestCommand, "_upsert_documents")
     @silence_ingest_output
-    def test_create_documents_with_exception(self, mock_update_or_create):
+    def test_create_documents_with_exception(self, mock_upsert):
         """
         Test _create_documents when document creation fails.
         """
@@ -515,7 +1140,7 @@ class IngestRFCommandTests(TestCase):
             }
         }
 
-        mock_update_or_create.side_effect = Exception("Database error")
+        mock_upsert.side_effect = Exception("Database error")
 
         command._create_documents(metadata_map)
 
@@ -0,0 +1,195 @@
+"""
+Tests for data migrations.
+"""
+
+import uuid
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+from django.utils import timezone
+
+
+class MigrationTestCase(TransactionTestCase):
+    """
+    Migrate back to the `migrate_from` targets, let `set_up_data` create
+    rows with the historical models and migrate forward to `migrate_to`.
+    """
+    migrate_from = None
+    migrate_to = None
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes()
+        executor.migrate(self.migrate_from)
+        self.set_up_data(executor.loader.project_state(
+            self.migrate_from
+        ).apps)
+
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate([self.migrate_to])
+        self.apps = executor.loader.project_state([self.migrate_to]).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(self.latest)
+
+    def set_up_data(self, apps):
+        pass
+
+
+class DocumentRepositoryIdUniqueMigrationTests(MigrationTestCase):
+    """
+    Test merging the documents of a repository item before making its
+    ID unique.
+    """
+    migrate_from = [('core', '0030_survey_response_indexes')]
+    migrate_to = ('core', '0031_document_repository_id_unique')
+
+    def set_up_data(self, apps):
+        Document = apps.get_model('core', 'Document')
+        SavedDocument = apps.get_model('core', 'SavedDocument')
+        AuthoredDocument = apps.get_model('core', 'AuthoredDocument')
+        User = apps.get_model('core', 'User')
+
+        for id, repository_id in [
+            ('legacy-1', 'test'),
+            ('legacy-2', 'test'),
+            ('no-uuid', ''),
+            ('old', 'uuid-1'),
+            ('new', 'uuid-1'),
+        ]:
+            Document.objects.create(
+                id=id,
+                title=id,
+                repository_uri=f'http://ri.example.com/{id}',
+                repository_id=repository_id,
+            )
+        # The most recently updated document is kept
+        Document.objects.filter(id='new').update(
+            updated_at=Document.objects.get(id='old').updated_at
+            + timedelta(days=1)
+        )
+
+        both = User.objects.create(email='both@example.com')
+        old_only = User.objects.create(email='old@example.com')
+        SavedDocument.objects.create(user=both, document_id='old')
+        SavedDocument.objects.create(user=both, document_id='new')
+        SavedDocument.objects.create(user=old_only, document_id='old')
+        SavedDocument.objects.create(user=both, document_id='legacy-2')
+        AuthoredDocument.objects.create(author=both, document_id='old')
+        AuthoredDocument.objects.create(author=both, document_id='new')
+        AuthoredDocument.objects.create(author=old_only, document_id='old')
+
+    def test_placeholder_ids_are_not_merged(self):
+        """
+        Test documents with a placeholder or empty repository ID are kept
+        with no repository ID.
+        """
+        Document = self.apps.get_model('core', 'Document')
+        SavedDocument = self.apps.get_model('core', 'SavedDocument')
+
+        self.assertEqual(
+            set(
+                Document.objects.filter(repository_id__isnull=True)
+                .values_list('id', flat=True)
+            ),
+            {'legacy-1', 'legacy-2', 'no-uuid'},
+        )
+        self.assertTrue(
+            SavedDocument.objects.filter(document_id='legacy-2').exists()
+        )
+
+    def test_duplicates_are_merged(self):
+        """
+        Test the saves and authorships of a duplicate move to the kept
+        document, dropping those its users already have.
+        """
+        Document = self.apps.get_model('core', 'Document')
+        SavedDocument = self.apps.get_model('core', 'SavedDocument')
+        AuthoredDocument = self.apps.get_model('core', 'AuthoredDocument')
+
+        self.assertEqual(
+            list(
+                Document.objects.filter(repository_id='uuid-1')
+                .values_list('id', flat=True)
+            ),
+            ['new'],
+        )
+        self.assertEqual(
+            sorted(
+                SavedDocument.objects.filter(document_id='new')
+                .values_list('user__email', flat=True)
+            ),
+            ['both@example.com', 'old@example.com'],
+        )
+        self.assertEqual(
+            sorted(
+                AuthoredDocument.objects.filter(document_id='new')
+                .values_list('author__email', flat=True)
+            ),
+            ['both@example.com', 'old@example.com'],
+        )
+
+
+class BackfillUserCreatedAtMigrationTests(MigrationTestCase):
+    """
+    Test backfilling the creation time of existing users.
+    """
+    migrate_from = [
+        ('core', '0034_ingestitem_unknown_repository_id'),
+        ('authtoken', '0002_auto_20160226_1747'),
+    ]
+    migrate_to = ('core', '0035_backfill_user_created_at')
+
+    def set_up_data(self, apps):
+        User = apps.get_model('core', 'User')
+        Token = apps.get_model('authtoken', 'Token')
+        ChatSession = apps.get_model('core', 'ChatSession')
+
+        self.migrated_at = timezone.now()
+        self.logged_in_at = self.migrated_at - timedelta(days=90)
+        self.token_at = self.migrated_at - timedelta(days=60)
+        self.chat_at = self.migrated_at - timedelta(days=70)
+
+        logged_in = User.objects.create(email='user@example.com')
+        anonymous = User.objects.create(
+            is_anonymous=True, anonymous_id=uuid.uuid4()
+        )
+        User.objects.create(email='inactive@example.com')
+        User.objects.update(created_at=self.migrated_at)
+        User.objects.filter(pk=logged_in.pk).update(
+            last_login=self.logged_in_at
+        )
+
+        Token.objects.create(key='a' * 40, user=anonymous)
+        Token.objects.update(created=self.token_at)
+        ChatSession.objects.create(
+            session_id='session',
+            session_name='Session',
+            user=anonymous,
+            assistant_id='assistant',
+        )
+        ChatSession.objects.update(created_at=self.chat_at)
+
+    def test_created_at_backfilled(self):
+        """
+        Test users get the time of their first login or activity, and
+        users without any keep theirs.
+        """
+        User = self.apps.get_model('core', 'User')
+
+        self.assertEqual(
+            User.objects.get(email='user@example.com').created_at,
+            self.logged_in_at
+        )
+        self.assertEqual(
+            User.objects.get(is_anonymous=True).created_at, self.chat_at
+        )
+        self.assertEqual(
+            User.objects.get(email='inactive@example.com').created_at,
+            self.migrated_at
+        )
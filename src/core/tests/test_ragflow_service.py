@@ -2,7 +2,9 @@
 Test the RAGFlowService class
 """
 
+import io
 import os
+from email.parser import BytesParser
 from unittest import TestCase
 from unittest.mock import patch, Mock
 import requests
@@ -436,3 +438,68 @@ class TestRAGFlowService(TestCase):
 
         with self.assertRaises(requests.HTTPError):
             self.service.get_chunks(query='test')
+
+    @patch('requests.post')
+    def test_upload_document_streams_file(self, mock_post):
+        """
+        Test uploading a document sends a multipart body read from the
+        file in chunks, with a known length
+        """
+        mock_response = Mock()
+        mock_response.json.return_value = {
+            'code': 0,
+            'data': [{'id': 'document-1'}]
+        }
+        mock_response.raise_for_status = Mock()
+        mock_post.return_value = mock_response
+        content = bytes(range(256)) * 1000
+
+        result = self.service.upload_document(
+            dataset_id='dataset-1',
+            file_name='doc.pdf',
+            file=io.BytesIO(content)
+        )
+
+        self.assertEqual(
+            mock_post.call_args.args[0],
+            'http://test-ragflow.com/api/datasets/dataset-1/documents'
+        )
+        headers = mock_post.call_args.kwargs['headers']
+        body = mock_post.call_args.kwargs['data']
+        self.assertEqual(headers['Authorization'], 'Bearer test-api-key')
+
+        data = b''.join(iter(lambda: body.read(16 * 1024), b''))
+        self.assertEqual(len(data), len(body))
+        message = BytesParser().parsebytes(
+            f'Content-Type: {headers["Content-Type"]}\r\n\r\n'.encode() + data
+        )
+        part, = message.get_payload()
+        self.assertEqual(part.get_filename(), 'doc.pdf')
+        self.assertEqual(part.get_payload(decode=True), content)
+        self.assertEqual(result['data'][0]['id'], 'document-1')
+
+    @patch('requests.post')
+    def test_upload_document_escapes_file_name(self, mock_post):
+        """
+        Test quotes and line breaks in the file name cannot break the
+        multipart body
+        """
+        mock_post.return_value = Mock(json=Mock(return_value={'code': 0}))
+
+        self.service.upload_document(
+            dataset_id='dataset-1',
+            file_name='a"b\r\nContent-Type: text/html.pdf',
+            file=io.BytesIO(b'%PDF')
+        )
+
+        headers = mock_post.call_args.kwargs['headers']
+        data = mock_post.call_args.kwargs['data'].read()
+        message = BytesParser().parsebytes(
+            f'Content-Type: {headers["Content-Type"]}\r\n\r\n'.encode() + data
+        )
+        part, = message.get_payload()
+        self.assertEqual(
+            part.get_filename(), 'a%22b%0D%0AContent-Type: text/html.pdf'
+        )
+        self.assertEqual(part.get_content_type(), 'application/pdf')
+        self.assertEqual(part.get_payload(decode=True), b'%PDF')
@@ -0,0 +1,387 @@
+"""
+Test the statistics rollups.
+"""
+
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from core import models, rollups, statistics, stats_cache
+
+
+BULK_ADD_SAVED_DOCUMENTS_URL = reverse(
+    'documents:saved-document-bulk-add-documents'
+)
+BULK_DELETE_SAVED_DOCUMENTS_URL = reverse(
+    'documents:saved-document-bulk-delete-documents'
+)
+
+
+def create_user(**params):
+    """
+    Helper function to create a user.
+    """
+    return get_user_model().objects.create_user(**params)
+
+
+def create_document(index):
+    """
+    Helper function to create a document.
+    """
+    return models.Document.objects.create(
+        id=str(index),
+        title=f'Document {index}',
+        repository_uri=f'https://example.com/{index}',
+        repository_id=f'repo_{index}',
+    )
+
+
+def rollup_rows():
+    """
+    Return the non-empty rows of every rollup table.
+    """
+    rows = {}
+    for model, keys in (
+        (models.DailyChatCount, ('day',)),
+        (models.DailyDocumentSaveCount, ('day', 'document_id')),
+        (models.DailyAuthorSaveCount, ('day', 'author_id')),
+        (
+            models.UserSegmentCount,
+            ('field_of_study_id', 'education_level', 'is_active')
+        ),
+        (models.KeywordCount, ('word',)),
+    ):
+        rows[model.__name__] = set(
+            model.objects.filter(count__gt=0).values_list(*keys, 'count')
+        )
+    return rows
+
+
+class RollupTests(TestCase):
+    """
+    Test the rollups stay equal to a full rebuild.
+    """
+
+    def setUp(self):
+        self.field = models.FieldOfStudy.objects.create(
+            name='Computer Science',
+            description='CS',
+        )
+        self.author = create_user(
+            email='author@example.com',
+            name='Author',
+            is_author=True,
+        )
+        self.reader = create_user(
+            email='reader@example.com',
+            name='Reader',
+            field_of_study=self.field,
+            education_level='L',
+        )
+        self.documents = [create_document(i) for i in range(3)]
+
+    def assertRollupsMatchRebuild(self):
+        incremental = rollup_rows()
+        rollups.rebuild()
+        self.assertEqual(incremental, rollup_rows())
+
+    def test_model_writes(self):
+        """
+        Test creates, updates and deletes keep the rollups current.
+        """
+        authored = models.AuthoredDocument.objects.create(
+            author=self.author,
+            document=self.documents[0],
+        )
+        saved = [
+            models.SavedDocument.objects.create(
+                user=self.reader,
+                document=document,
+            )
+            for document in self.documents
+        ]
+        models.SavedDocument.objects.create(
+            user=self.author,
+            document=self.documents[0],
+        )
+        models.ChatSession.objects.create(
+            session_id='session',
+            session_name='Session',
+            user=self.reader,
+            assistant_id='assistant',
+        )
+        saved[1].delete()
+        self.reader.education_level = 'P'
+        self.reader.save()
+        self.assertRollupsMatchRebuild()
+
+        authored.delete()
+        self.documents[2].delete()
+        self.assertRollupsMatchRebuild()
+
+    def test_deferred_user_update(self):
+        """
+        Test updating a user loaded with deferred fields moves its segment.
+        """
+        user = get_user_model().objects.only('id').get(pk=self.reader.pk)
+        user.is_active = False
+        user.save()
+
+        self.assertRollupsMatchRebuild()
+        stats = statistics.get_user_activity_status_stats()
+        self.assertEqual(
+            dict(zip(stats['labels'], stats['values'])),
+            {'Active': 1, 'Inactive': 1}
+        )
+
+    def test_user_cascade_delete(self):
+        """
+        Test deleting a user removes the counts of their related rows.
+        """
+        models.AuthoredDocument.objects.create(
+            author=self.author,
+            document=self.documents[0],
+        )
+        models.SavedDocument.objects.create(
+            user=self.reader,
+            document=self.documents[0],
+        )
+
+        self.author.delete()
+
+        self.assertRollupsMatchRebuild()
+        self.assertEqual(models.DailyAuthorSaveCount.objects.filter(
+            count__gt=0
+        ).count(), 0)
+
+    def test_bulk_endpoints(self):
+        """
+        Test the bulk save endpoints update the rollups.
+        """
+        models.AuthoredDocument.objects.create(
+            author=self.author,
+            document=self.documents[1],
+        )
+        client = APIClient()
+        client.force_authenticate(user=self.reader)
+        ids = [document.id for document in self.documents]
+
+        client.post(
+            BULK_ADD_SAVED_DOCUMENTS_URL,
+            {'document_ids': ids},
+            format='json'
+        )
+        self.assertRollupsMatchRebuild()
+
+        client.post(
+            BULK_DELETE_SAVED_DOCUMENTS_URL,
+            {'document_ids': ids[:2]},
+            format='json'
+        )
+        self.assertRollupsMatchRebuild()
+
+    def test_purge_anonymous_users(self):
+        """
+        Test the purge command keeps the rollups current.
+        """
+        user = create_user(is_anonymous=True)
+        models.SavedDocument.objects.create(
+            user=user,
+            document=self.documents[0],
+        )
+        models.User.objects.filter(pk=user.pk).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        models.SavedDocument.objects.filter(user=user).update(
+            created_at=timezone.now() - timedelta(days=60)
+        )
+        rollups.rebuild()
+
+        call_command(
+            'purge_anonymous_users',
+            skip_ragflow=True,
+            sleep=0,
+            stdout=io.StringIO(),
+        )
+
+        self.assertFalse(models.User.objects.filter(pk=user.pk).exists())
+        self.assertRollupsMatchRebuild()
+
+
+class StatisticsTests(TestCase):
+    """
+    Test the statistics read from the rollups.
+    """
+
+    def test_statistics(self):
+        """
+        Test the statistics functions report the rollup counts.
+        """
+        field = models.FieldOfStudy.objects.create(
+            name='Computer Science',
+            description='CS',
+        )
+        author = create_user(email='author@example.com', name='Author')
+        readers = [
+            create_user(
+                email=f'reader{i}@example.com',
+                field_of_study=field,
+            )
+            for i in range(2)
+        ]
+        popular, other = create_document(1), create_document(2)
+        models.AuthoredDocument.objects.create(author=author, document=popular)
+        for reader in readers:
+            models.SavedDocument.objects.create(user=reader, document=popular)
+        models.SavedDocument.objects.create(user=readers[0], document=other)
+        models.ChatSession.objects.create(
+            session_id='session',
+            session_name='Session',
+            user=readers[0],
+            assistant_id='assistant',
+        )
+
+        self.assertEqual(
+            statistics.get_user_field_of_study_stats(),
+            {'labels': ['Computer Science', 'No field'], 'values': [2, 1]}
+        )
+        self.assertEqual(
+            statistics.get_most_consulted_documents_stats(),
+            {'labels': ['Document 1', 'Document 2'], 'values': [2, 1]}
+        )
+        self.assertEqual(
+            statistics.get_most_consulted_authors_stats(),
+            {'labels': ['Author'], 'values': [2]}
+        )
+        self.assertEqual(
+            statistics.get_user_education_level_stats(),
+            {'labels': ['Sin estudios'], 'values': [3]}
+        )
+        self.assertEqual(
+            statistics.get_chats_over_time_stats(),
+            {
+                'labels': [timezone.localdate().strftime('%Y-%m-%d')],
+                'values': [1],
+            }
+        )
+
+    def test_document_keywords(self):
+        """
+        Test keyword counts follow document creates, renames and deletes.
+        """
+        create_document(1)
+        document = models.Document.objects.create(
+            id='keywords',
+            title='Machine learning for the learning of machines',
+            repository_uri='https://example.com/keywords',
+            repository_id='repo_keywords',
+        )
+
+        self.assertEqual(
+            statistics.get_document_keywords_stats(limit=2),
+            {'labels': ['learning', 'document'], 'values': [2, 1]}
+        )
+
+        document.title = 'Deep learning'
+        document.save()
+        document = models.Document.objects.only('id').get(pk='keywords')
+        document.delete()
+
+        self.assertEqual(
+            statistics.get_document_keywords_stats(),
+            {'labels': ['document'], 'values': [1]}
+        )
+        self.assertEqual(
+            statistics.count_document_keywords(),
+            {'document': 1}
+        )
+
+    def test_rebuild_command(self):
+        """
+        Test the rebuild command restores drifted rollups.
+        """
+        create_user(email='user@example.com')
+        models.UserSegmentCount.objects.update(count=10)
+
+        call_command('rebuild_rollups', stdout=io.StringIO())
+
+        self.assertEqual(
+            statistics.get_user_activity_status_stats(),
+            {'labels': ['Active'], 'values': [1]}
+        )
+
+
+@override_settings(STATS_CACHE_TTL=60, STATS_CACHE_STALE_TTL=600)
+@patch('core.stats_cache.schedule', side_effect=stats_cache.refresh)
+class StatsCacheTests(TestCase):
+    """
+    Test the stale-while-revalidate statistics cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def stats(self):
+        self.calls += 1
+        return {'labels': [], 'values': [self.calls]}
+
+    def test_cold_cache_computes(self, patched_schedule):
+        """
+        Test the first call computes synchronously.
+        """
+        data, computed_at = stats_cache.get_cached_stats(self.stats)
+
+        self.assertEqual(data['values'], [1])
+        self.assertIsNotNone(computed_at)
+        patched_schedule.assert_not_called()
+
+    def test_fresh_result_is_reused(self, patched_schedule):
+        """
+        Test a fresh result is served without recomputing.
+        """
+        stats_cache.get_cached_stats(self.stats)
+
+        data, _ = stats_cache.get_cached_stats(self.stats)
+
+        self.assertEqual(data['values'], [1])
+        patched_schedule.assert_not_called()
+
+    def test_stale_result_is_served_and_refreshed(self, patched_schedule):
+        """
+        Test a stale result is served once while it refreshes.
+        """
+        stats_cache.get_cached_stats(self.stats)
+        later = timezone.now() + timedelta(seconds=120)
+
+        with patch('django.utils.timezone.now', return_value=later):
+            stale, _ = stats_cache.get_cached_stats(self.stats)
+            fresh, computed_at = stats_cache.get_cached_stats(self.stats)
+
+        self.assertEqual(stale['values'], [1])
+        self.assertEqual(fresh['values'], [2])
+        self.assertEqual(computed_at, later)
+        patched_schedule.assert_called_once()
+
+    def test_admin_shows_computed_at(self, patched_schedule):
+        """
+        Test the changelist renders when the statistics were computed.
+        """
+        admin = create_user(email='admin@example.com', password='pass1234')
+        admin.is_staff = admin.is_superuser = True
+        admin.save()
+        self.client.force_login(admin)
+
+        res = self.client.get(reverse('admin:core_chatsession_changelist'))
+
+        self.assertContains(res, 'Computed ')
+        self.assertIn('sessions_by_day_computed_at', res.context)
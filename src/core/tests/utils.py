@@ -0,0 +1,52 @@
+"""
+Shared helpers for tests.
+"""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin asserting that list endpoints run a constant number of
+    queries no matter how many rows they return.
+    """
+
+    def assertConstantQueries(
+            self,
+            create_row,
+            request,
+            sizes=(1, 5),
+            budget=None
+    ):
+        """
+        Grow the data set to each of `sizes` rows with `create_row(index)`,
+        call `request()` at every size and assert the query count never
+        changes. With `budget`, also assert it stays within that many
+        queries.
+        """
+        counts = []
+        created = 0
+
+        for size in sizes:
+            while created < size:
+                create_row(created)
+                created += 1
+
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+
+            self.assertEqual(response.status_code, 200)
+            counts.append(len(context))
+
+        self.assertEqual(
+            len(set(counts)),
+            1,
+            f'Query count grows with rows: {dict(zip(sizes, counts))}'
+        )
+        if budget is not None:
+            self.assertLessEqual(
+                counts[0],
+                budget,
+                f'{counts[0]} queries exceed the budget of {budget}'
+            )
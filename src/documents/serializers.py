@@ -4,6 +4,7 @@ Serializers for the documents API view.
 
 from rest_framework import serializers
 
+from core.fastpath import ValuesSerializer, format_datetime
 from core.models import (
     Document,
     AuthoredDocument,
@@ -58,6 +59,62 @@ class SavedDocumentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'created_at')
 
 
+class BulkDocumentIdsSerializer(serializers.Serializer):
+    """
+    Serializer for bulk document actions.
+    """
+    document_ids = serializers.ListField(
+        child=serializers.CharField(max_length=255),
+        allow_empty=False,
+        max_length=1000,
+    )
+
+
+class DocumentValuesSerializer(ValuesSerializer):
+    """
+    Read-only fast path equivalent of `DocumentSerializer`.
+    """
+    lookups = tuple(DocumentSerializer.Meta.fields)
+
+    def to_representation(self, row):
+        return dict(zip(self.lookups, row))
+
+
+class NestedDocumentValuesSerializer(ValuesSerializer):
+    """
+    Read-only fast path for objects with a nested `DocumentSerializer`.
+    """
+    document_fields = tuple(DocumentSerializer.Meta.fields)
+    lookups = (
+        'id',
+        *(f'document__{field}' for field in document_fields),
+        'created_at',
+    )
+
+    def to_representation(self, row):
+        document = None
+        if row[1] is not None:
+            document = dict(zip(self.document_fields, row[1:-1]))
+
+        return {
+            'id': row[0],
+            'document': document,
+            'created_at': format_datetime(row[-1]),
+        }
+
+
+class AuthoredDocumentValuesSerializer(NestedDocumentValuesSerializer):
+    """
+    Read-only fast path equivalent of `AuthoredDocumentSerializer`.
+    """
+
+
+class SavedDocumentValuesSerializer(NestedDocumentValuesSerializer):
+    """
+    Read-only fast path equivalent of `SavedDocumentSerializer`.
+    """
+
+
 class RepositoryDocumentSerializer(serializers.Serializer):
     """
     Serializer for repository document objects.
@@ -9,10 +9,17 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Document
+from core.models import Document, AuthoredDocument
+from core.tests.utils import QueryBudgetMixin
 
 
 AUTHORED_DOCUMENTS_URL = reverse('documents:authored-document-list-documents')
+BULK_ADD_AUTHORED_DOCUMENTS_URL = reverse(
+    'documents:authored-document-bulk-add-documents'
+)
+BULK_DELETE_AUTHORED_DOCUMENTS_URL = reverse(
+    'documents:authored-document-bulk-delete-documents'
+)
 
 
 def add_authored_document_url(document_id):
@@ -103,8 +110,20 @@ class NonAuthorDocumentApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
 
+    def test_bulk_add_authored_documents_fails(self):
+        """
+        Test bulk claiming documents fails for non-authors.
+        """
+        res = self.client.post(
+            BULK_ADD_AUTHORED_DOCUMENTS_URL,
+            {'document_ids': [self.document.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
 
-class AuthorDocumentApiTests(TestCase):
+class AuthorDocumentApiTests(QueryBudgetMixin, TestCase):
     """
     Test the save document API (Authenticated as author).
     """
@@ -183,6 +202,24 @@ class AuthorDocumentApiTests(TestCase):
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[0]['document']['id'], self.document.id)
 
+    def test_list_authored_documents_query_count(self):
+        """
+        Test listing authored documents runs one query regardless of
+        row count.
+        """
+        def author_document(i):
+            document = create_document(id=f'doc-{i}', repository_id=str(i))
+            AuthoredDocument.objects.create(
+                author=self.author,
+                document=document
+            )
+
+        self.assertConstantQueries(
+            author_document,
+            lambda: self.client.get(AUTHORED_DOCUMENTS_URL),
+            budget=1,
+        )
+
     def test_unauthor_document(self):
         """
         Test removing a document from the authored documents list.
@@ -200,3 +237,43 @@ class AuthorDocumentApiTests(TestCase):
 
         list_res = self.client.get(AUTHORED_DOCUMENTS_URL)
         self.assertEqual(len(list_res.data), 0)
+
+    def test_bulk_author_documents(self):
+        """
+        Test claiming several documents reports an outcome per id.
+        """
+        other = create_document(id='2', repository_id='repo_2')
+
+        res = self.client.post(
+            BULK_ADD_AUTHORED_DOCUMENTS_URL,
+            {'document_ids': [self.document.id, other.id, self.document.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'document_id': self.document.id, 'status': 'added'},
+            {'document_id': other.id, 'status': 'added'},
+        ])
+        self.assertEqual(
+            AuthoredDocument.objects.filter(author=self.author).count(),
+            2
+        )
+
+    def test_bulk_unauthor_documents(self):
+        """
+        Test removing several authored documents at once.
+        """
+        self.client.post(add_authored_document_url(self.document.id))
+
+        res = self.client.post(
+            BULK_DELETE_AUTHORED_DOCUMENTS_URL,
+            {'document_ids': [self.document.id]},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'document_id': self.document.id, 'status': 'removed'},
+        ])
+        self.assertFalse(AuthoredDocument.objects.exists())
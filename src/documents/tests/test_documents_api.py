@@ -11,6 +11,7 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import Document
+from core.tests.utils import QueryBudgetMixin
 
 from documents.serializers import (
     DocumentSerializer,
@@ -36,15 +37,15 @@ def create_document(**params):
         'id': '1',
         'title': 'Test document',
         'repository_uri': 'https://example.com',
-        'repository_id': 'repo_1',
         'status': 'L',
     }
     defaults.update(params)
+    defaults.setdefault('repository_id', f"repo_{defaults['id']}")
     document = Document.objects.create(**defaults)
     return document
 
 
-class PublicDocumentsApiTests(TestCase):
+class PublicDocumentsApiTests(QueryBudgetMixin, TestCase):
     """
     Test the public documents API (Unauthenticated).
     """
@@ -71,6 +72,16 @@ class PublicDocumentsApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_get_documents_query_count(self):
+        """
+        Test listing documents runs one query regardless of row count.
+        """
+        self.assertConstantQueries(
+            lambda i: create_document(id=str(i), repository_id=f'repo_{i}'),
+            lambda: self.client.get(DOCUMENTS_URL),
+            budget=1,
+        )
+
     def test_get_documents_ordered_by_created_at(self):
         """
         Test that documents are ordered by created_at (newest first).
@@ -0,0 +1,251 @@
+"""
+Test the read-only fast path for document lists.
+"""
+
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import (
+    APIClient,
+    APIRequestFactory,
+    force_authenticate,
+)
+
+from core.models import Document, SavedDocument, AuthoredDocument
+from core.renderers import ORJSONRenderer
+from core.tests.utils import QueryBudgetMixin
+
+from documents import serializers
+from documents.views import (
+    DocumentViewSet,
+    SavedDocumentViewSet,
+    AuthoredDocumentViewSet,
+)
+
+
+DOCUMENTS_URL = reverse('documents:document-list')
+SAVED_DOCUMENTS_URL = reverse('documents:saved-document-list-documents')
+AUTHORED_DOCUMENTS_URL = reverse(
+    'documents:authored-document-list-documents'
+)
+
+
+def create_user(**params):
+    """
+    Helper function to create a user.
+    """
+    return get_user_model().objects.create_user(**params)
+
+
+def create_documents(count):
+    """
+    Helper function to create `count` sample documents.
+    """
+    return [
+        Document.objects.create(
+            id=str(i),
+            title=f'Document {i}',
+            repository_uri=f'https://example.com/{i}',
+            repository_id=f'repo_{i}',
+            status='L' if i % 2 else 'R',
+        )
+        for i in range(count)
+    ]
+
+
+class ValuesSerializerTests(TestCase):
+    """
+    Test that the values serializers match the model serializers.
+    """
+
+    def setUp(self):
+        self.user = create_user(
+            email='author@example.com',
+            password='testpass1234',
+            is_author=True,
+        )
+        for document in create_documents(3):
+            SavedDocument.objects.create(user=self.user, document=document)
+            AuthoredDocument.objects.create(
+                author=self.user,
+                document=document
+            )
+
+    def test_document_values_serializer(self):
+        """
+        Test the document fast path matches DocumentSerializer.
+        """
+        queryset = Document.objects.order_by('id')
+
+        fast = serializers.DocumentValuesSerializer(queryset).data
+        slow = serializers.DocumentSerializer(queryset, many=True).data
+
+        self.assertEqual(fast, slow)
+
+    def test_saved_document_values_serializer(self):
+        """
+        Test the saved document fast path matches SavedDocumentSerializer.
+        """
+        queryset = SavedDocument.objects.order_by('id')
+
+        fast = serializers.SavedDocumentValuesSerializer(queryset).data
+        slow = serializers.SavedDocumentSerializer(queryset, many=True).data
+
+        self.assertEqual(fast, slow)
+
+    def test_authored_document_values_serializer(self):
+        """
+        Test the authored document fast path matches
+        AuthoredDocumentSerializer.
+        """
+        queryset = AuthoredDocument.objects.order_by('id')
+
+        fast = serializers.AuthoredDocumentValuesSerializer(queryset).data
+        slow = serializers.AuthoredDocumentSerializer(
+            queryset,
+            many=True
+        ).data
+
+        self.assertEqual(fast, slow)
+
+    def test_values_serializer_without_document(self):
+        """
+        Test rows whose document is null serialize it as None.
+        """
+        SavedDocument.objects.create(user=self.user, document=None)
+        queryset = SavedDocument.objects.filter(document__isnull=True)
+
+        fast = serializers.SavedDocumentValuesSerializer(queryset).data
+        slow = serializers.SavedDocumentSerializer(queryset, many=True).data
+
+        self.assertEqual(fast, slow)
+        self.assertIsNone(fast[0]['document'])
+
+
+class ORJSONRendererTests(TestCase):
+    """
+    Test the orjson renderer.
+    """
+
+    def test_render_matches_json_renderer(self):
+        """
+        Test rendered JSON decodes to the same data as DRF's renderer.
+        """
+        create_documents(2)
+        data = serializers.DocumentSerializer(
+            Document.objects.all(),
+            many=True
+        ).data
+
+        fast = json.loads(ORJSONRenderer().render(data))
+        slow = json.loads(JSONRenderer().render(data))
+
+        self.assertEqual(fast, slow)
+
+    def test_render_none(self):
+        """
+        Test rendering None returns an empty body.
+        """
+        self.assertEqual(ORJSONRenderer().render(None), b'')
+
+
+class FastPathApiTests(QueryBudgetMixin, TestCase):
+    """
+    Test the list endpoints served through the fast path.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(
+            email='author@example.com',
+            password='testpass1234',
+            is_author=True,
+        )
+        self.client.force_authenticate(user=self.user)
+
+    def test_documents_list_uses_orjson(self):
+        """
+        Test the documents list is rendered by the orjson renderer.
+        """
+        create_documents(2)
+
+        res = self.client.get(DOCUMENTS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIsInstance(res.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(len(res.json()), 2)
+
+    def test_saved_and_authored_lists(self):
+        """
+        Test the saved and authored lists return nested documents.
+        """
+        document = create_documents(1)[0]
+        SavedDocument.objects.create(user=self.user, document=document)
+        AuthoredDocument.objects.create(author=self.user, document=document)
+
+        for url in (SAVED_DOCUMENTS_URL, AUTHORED_DOCUMENTS_URL):
+            res = self.client.get(url)
+
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            self.assertEqual(res.json()[0]['document']['id'], document.id)
+
+    def test_fast_path_can_be_disabled(self):
+        """
+        Test views fall back to the model serializer when the fast path
+        is disabled.
+        """
+        create_documents(2)
+        view = DocumentViewSet.as_view(
+            {'get': 'list'},
+            fast_serializer_class=None
+        )
+
+        res = view(APIRequestFactory().get(DOCUMENTS_URL))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIsInstance(res.accepted_renderer, ORJSONRenderer)
+        self.assertEqual(len(res.data), 2)
+
+    def test_serializer_path_query_count(self):
+        """
+        Test the nested serializer path does not query once per row.
+        """
+        cases = [
+            (SavedDocumentViewSet, SAVED_DOCUMENTS_URL, SavedDocument, 'user'),
+            (
+                AuthoredDocumentViewSet,
+                AUTHORED_DOCUMENTS_URL,
+                AuthoredDocument,
+                'author'
+            ),
+        ]
+
+        for viewset, url, model, owner_field in cases:
+            view = viewset.as_view(
+                {'get': 'list_documents'},
+                fast_serializer_class=None
+            )
+
+            def create_row(i):
+                document = Document.objects.create(
+                    id=f'{owner_field}-{i}',
+                    title=f'Document {i}',
+                    repository_uri='https://example.com',
+                    repository_id=f'{owner_field}-repo-{i}',
+                )
+                model.objects.create(
+                    **{owner_field: self.user},
+                    document=document
+                )
+
+            def request():
+                request = APIRequestFactory().get(url)
+                force_authenticate(request, user=self.user)
+                return view(request)
+
+            self.assertConstantQueries(create_row, request, budget=1)
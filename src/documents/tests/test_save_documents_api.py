@@ -2,6 +2,8 @@
 Test the save documents API.
 """
 
+from unittest.mock import patch
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -9,10 +11,18 @@ from django.contrib.auth import get_user_model
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Document
+from core.models import DailyDocumentSaveCount, Document, SavedDocument
+from core.tests.utils import QueryBudgetMixin
+from documents.views import SavedDocumentViewSet
 
 
 SAVED_DOCUMENTS_URL = reverse('documents:saved-document-list-documents')
+BULK_ADD_SAVED_DOCUMENTS_URL = reverse(
+    'documents:saved-document-bulk-add-documents'
+)
+BULK_DELETE_SAVED_DOCUMENTS_URL = reverse(
+    'documents:saved-document-bulk-delete-documents'
+)
 
 
 def add_saved_document_url(document_id):
@@ -58,7 +68,7 @@ def create_document(**params):
     return document
 
 
-class SaveDocumentApiTests(TestCase):
+class SaveDocumentApiTests(QueryBudgetMixin, TestCase):
     """
     Test the save document API (Authenticated).
     """
@@ -137,6 +147,24 @@ class SaveDocumentApiTests(TestCase):
         self.assertEqual(len(res.data), 1)
         self.assertEqual(res.data[0]['document']['id'], self.document.id)
 
+    def test_list_saved_documents_query_count(self):
+        """
+        Test listing saved documents runs one query regardless of
+        row count.
+        """
+        def save_document(i):
+            document = create_document(id=f'doc-{i}', repository_id=str(i))
+            SavedDocument.objects.create(
+                user=self.normal_user,
+                document=document
+            )
+
+        self.assertConstantQueries(
+            save_document,
+            lambda: self.client.get(SAVED_DOCUMENTS_URL),
+            budget=1,
+        )
+
     def test_unsave_document(self):
         """
         Test unsaving a document.
@@ -154,3 +182,110 @@ class SaveDocumentApiTests(TestCase):
 
         list_res = self.client.get(SAVED_DOCUMENTS_URL)
         self.assertEqual(len(list_res.data), 0)
+
+    def test_bulk_save_documents(self):
+        """
+        Test saving several documents reports an outcome per id.
+        """
+        other = create_document(id='2', repository_id='repo_2')
+        self.client.post(add_saved_document_url(self.document.id))
+
+        payload = {'document_ids': [self.document.id, other.id, 'missing']}
+        res = self.client.post(
+            BULK_ADD_SAVED_DOCUMENTS_URL,
+            payload,
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'document_id': self.document.id, 'status': 'already_added'},
+            {'document_id': other.id, 'status': 'added'},
+            {'document_id': 'missing', 'status': 'not_found'},
+        ])
+        self.assertEqual(
+            SavedDocument.objects.filter(user=self.normal_user).count(),
+            2
+        )
+
+    def test_bulk_save_documents_query_count(self):
+        """
+        Test bulk saving runs a fixed number of queries.
+        """
+        ids = [
+            create_document(id=str(i), repository_id=f'repo_{i}').id
+            for i in range(2, 12)
+        ]
+
+        # The lookup, the insert, the statistics rollup upsert and its
+        # author lookup, plus the savepoint pair around the writes.
+        with self.assertNumQueries(6):
+            res = self.client.post(
+                BULK_ADD_SAVED_DOCUMENTS_URL,
+                {'document_ids': ids},
+                format='json'
+            )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_bulk_save_documents_concurrently_saved(self):
+        """
+        Test a document saved by a concurrent request is reported as
+        already added and counted once in the statistics.
+        """
+        insert_relations = SavedDocumentViewSet.insert_relations
+
+        def concurrent_save(view, model, user, document_ids):
+            SavedDocument.objects.create(user=user, document=self.document)
+            return insert_relations(view, model, user, document_ids)
+
+        with patch.object(
+            SavedDocumentViewSet,
+            'insert_relations',
+            autospec=True,
+            side_effect=concurrent_save,
+        ):
+            res = self.client.post(
+                BULK_ADD_SAVED_DOCUMENTS_URL,
+                {'document_ids': [self.document.id]},
+                format='json'
+            )
+
+        self.assertEqual(res.data['results'], [
+            {'document_id': self.document.id, 'status': 'already_added'},
+        ])
+        self.assertEqual(
+            DailyDocumentSaveCount.objects.get(document=self.document).count,
+            1
+        )
+
+    def test_bulk_save_documents_requires_ids(self):
+        """
+        Test bulk saving rejects an empty list.
+        """
+        res = self.client.post(
+            BULK_ADD_SAVED_DOCUMENTS_URL,
+            {'document_ids': []},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_bulk_unsave_documents(self):
+        """
+        Test unsaving several documents reports an outcome per id.
+        """
+        self.client.post(add_saved_document_url(self.document.id))
+
+        res = self.client.post(
+            BULK_DELETE_SAVED_DOCUMENTS_URL,
+            {'document_ids': [self.document.id, 'missing']},
+            format='json'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['results'], [
+            {'document_id': self.document.id, 'status': 'removed'},
+            {'document_id': 'missing', 'status': 'not_found'},
+        ])
+        self.assertFalse(SavedDocument.objects.exists())
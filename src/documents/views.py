@@ -4,13 +4,22 @@ Views for the documents API
 
 import requests
 
+from django.db import connection, transaction
+from django.utils import timezone
+
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.filters import OrderingFilter
 from rest_framework.decorators import action
-from rest_framework import authentication, permissions
+from rest_framework import permissions
 
+from core import rollups
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
+from core.fastpath import FastPathListMixin
 from core.models import (
     Document,
     AuthoredDocument,
@@ -22,11 +31,12 @@ from core.permissions import IsAuthor
 from documents import serializers
 
 
-class DocumentViewSet(viewsets.ReadOnlyModelViewSet):
+class DocumentViewSet(FastPathListMixin, viewsets.ReadOnlyModelViewSet):
     """
     Manage documents in the database
     """
     serializer_class = serializers.DocumentSerializer
+    fast_serializer_class = serializers.DocumentValuesSerializer
     queryset = Document.objects.all()
     filter_backends = [OrderingFilter]
     ordering_fields = ['created_at', 'updated_at']
@@ -58,14 +68,135 @@ class DocumentViewSet(viewsets.ReadOnlyModelViewSet):
 
         return self.serializer_class
 
+    def list(self, request, *args, **kwargs):
+        """
+        List documents.
+        """
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.list_response(queryset)
+
+
+class BulkDocumentActionsMixin:
+    """
+    Bulk add and remove actions for the current user's document relations.
+
+    Views set `owner_field` to the field pointing at the user.
+    """
+    owner_field = None
+
+    def get_bulk_document_ids(self, request):
+        """
+        Validate the request body and return unique document ids in order.
+        """
+        serializer = serializers.BulkDocumentIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return list(dict.fromkeys(serializer.validated_data['document_ids']))
+
+    def insert_relations(self, model, user, document_ids):
+        """
+        Insert a `model` row relating `user` to each of `document_ids` and
+        return the rows actually inserted. Rows the user already has,
+        including those inserted by a concurrent request, are skipped.
+        """
+        if not document_ids:
+            return []
+
+        quote = connection.ops.quote_name
+        owner = model._meta.get_field(self.owner_field)
+        sql = (
+            f'INSERT INTO {quote(model._meta.db_table)} '
+            f'({quote(owner.column)}, "document_id", "created_at") '
+            'SELECT %s, document_id, %s '
+            'FROM unnest(%s::text[]) AS document_id '
+            'ON CONFLICT DO NOTHING '
+            'RETURNING "id", "document_id", "created_at"'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [user.pk, timezone.now(), document_ids])
+            return [
+                model(
+                    id=pk,
+                    document_id=document_id,
+                    created_at=created_at,
+                    **{owner.attname: user.pk}
+                )
+                for pk, document_id, created_at in cursor.fetchall()
+            ]
+
+    @action(detail=False, methods=['post'], url_path='bulk-add')
+    def bulk_add_documents(self, request):
+        """
+        Add several documents for the authenticated user.
+        """
+        document_ids = self.get_bulk_document_ids(request)
+
+        found = set(
+            Document.objects.filter(id__in=document_ids)
+            .values_list('id', flat=True)
+        )
+
+        model = self.get_queryset().model
+        with transaction.atomic():
+            created = self.insert_relations(
+                model,
+                request.user,
+                [doc_id for doc_id in document_ids if doc_id in found]
+            )
+            rollups.instances_changed(model, created, 1)
+        added = {relation.document_id for relation in created}
+
+        results = []
+        for document_id in document_ids:
+            if document_id not in found:
+                outcome = 'not_found'
+            elif document_id in added:
+                outcome = 'added'
+            else:
+                outcome = 'already_added'
+            results.append({'document_id': document_id, 'status': outcome})
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete_documents(self, request):
+        """
+        Remove several documents for the authenticated user.
+        """
+        document_ids = self.get_bulk_document_ids(request)
+
+        queryset = self.get_queryset().filter(document_id__in=document_ids)
+        removed = set(queryset.values_list('document_id', flat=True))
+        with transaction.atomic(), rollups.paused():
+            rollups.queryset_changed(queryset, -1)
+            queryset.delete()
+
+        results = [
+            {
+                'document_id': document_id,
+                'status': 'removed' if document_id in removed else 'not_found'
+            }
+            for document_id in document_ids
+        ]
+
+        return Response({'results': results}, status=status.HTTP_200_OK)
+
 
-class SavedDocumentViewSet(viewsets.GenericViewSet):
+class SavedDocumentViewSet(
+    BulkDocumentActionsMixin,
+    FastPathListMixin,
+    viewsets.GenericViewSet
+):
     """
     Manage the current user's saved documents in the database
     """
     serializer_class = serializers.SavedDocumentSerializer
+    fast_serializer_class = serializers.SavedDocumentValuesSerializer
+    owner_field = 'user'
     queryset = SavedDocument.objects.all()
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
@@ -73,7 +204,9 @@ class SavedDocumentViewSet(viewsets.GenericViewSet):
         Return saved documents for the authenticated user.
         """
         user_queryset = self.queryset.filter(user=self.request.user)
-        return user_queryset.order_by('-created_at')
+        return user_queryset.select_related('document').order_by(
+            '-created_at'
+        )
 
     def get_serializer_class(self):
         return self.serializer_class
@@ -84,8 +217,7 @@ class SavedDocumentViewSet(viewsets.GenericViewSet):
         List all saved documents for the authenticated user.
         """
         saved_documents = self.get_queryset()
-        serializer = self.get_serializer(saved_documents, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(saved_documents)
 
     @action(
             detail=False,
@@ -152,13 +284,22 @@ class SavedDocumentViewSet(viewsets.GenericViewSet):
             )
 
 
-class AuthoredDocumentViewSet(viewsets.GenericViewSet):
+class AuthoredDocumentViewSet(
+    BulkDocumentActionsMixin,
+    FastPathListMixin,
+    viewsets.GenericViewSet
+):
     """
     Manage the current user's authored documents in the database
     """
     serializer_class = serializers.AuthoredDocumentSerializer
+    fast_serializer_class = serializers.AuthoredDocumentValuesSerializer
+    owner_field = 'author'
     queryset = AuthoredDocument.objects.all()
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated, IsAuthor]
 
     def get_queryset(self):
@@ -166,7 +307,9 @@ class AuthoredDocumentViewSet(viewsets.GenericViewSet):
         Return authored documents for the authenticated user.
         """
         user_queryset = self.queryset.filter(author=self.request.user)
-        return user_queryset.order_by('-created_at')
+        return user_queryset.select_related('document').order_by(
+            '-created_at'
+        )
 
     def get_serializer_class(self):
         return self.serializer_class
@@ -177,8 +320,7 @@ class AuthoredDocumentViewSet(viewsets.GenericViewSet):
         List all of the user's authored documents.
         """
         authored_documents = self.get_queryset()
-        serializer = self.get_serializer(authored_documents, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        return self.list_response(authored_documents)
 
     @action(
             detail=False,
@@ -250,7 +392,10 @@ class RepositoryDocumentViewSet(viewsets.GenericViewSet):
     Fetch document metadata from external repository
     """
     serializer_class = serializers.RepositoryDocumentSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     REPO_BASE = 'https://repositorioinstitucional.uaslp.mx/rest/items'
@@ -0,0 +1,16 @@
+"""
+Pagination classes for the feedback API.
+"""
+
+from rest_framework.pagination import CursorPagination
+
+
+class SurveyResponseCursorPagination(CursorPagination):
+    """
+    Cursor pagination over (completed_at, id), stable while new responses
+    are being submitted.
+    """
+    ordering = ('completed_at', 'id')
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
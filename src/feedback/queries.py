@@ -0,0 +1,103 @@
+"""
+Aggregate queries over the satisfaction survey responses.
+"""
+from typing import Any, Dict, List, Tuple
+
+from django.db import connection
+from django.db.models import QuerySet
+
+from core.models import NUMERIC_RE, RATING_ITEMS_KEY, SurveyRating
+
+
+def _extracted_ratings_sql(queryset: QuerySet) -> Tuple[str, tuple]:
+    """
+    Return SQL selecting `(question, x)` from the extracted ratings of the
+    responses in `queryset`.
+    """
+    inner_sql, params = queryset.values('pk').query.sql_with_params()
+    table = connection.ops.quote_name(SurveyRating._meta.db_table)
+    sql = f"""
+        SELECT rating.question, rating.value AS x
+        FROM {table} AS rating
+        WHERE rating.response_id IN ({inner_sql})
+    """
+    return sql, params
+
+
+def _json_ratings_sql(
+        queryset: QuerySet,
+        path: List[str]) -> Tuple[str, tuple]:
+    """
+    Return SQL selecting `(question, x)` from the numeric values of the
+    object at `path` of the surveys in `queryset`.
+    """
+    inner_sql, params = queryset.values('survey').query.sql_with_params()
+    sql = f"""
+        SELECT rating.key AS question, value.x::float AS x
+        FROM ({inner_sql}) AS filtered,
+             jsonb_each(
+                 CASE WHEN jsonb_typeof(filtered.survey #> %s) = 'object'
+                      THEN filtered.survey #> %s END
+             ) AS rating,
+             LATERAL (
+                 SELECT CASE
+                     WHEN jsonb_typeof(rating.value) = 'number'
+                         THEN rating.value::numeric
+                     WHEN jsonb_typeof(rating.value) = 'string'
+                          AND rating.value #>> '{{}}' ~ %s
+                         THEN (rating.value #>> '{{}}')::numeric
+                 END AS x
+             ) AS value
+        WHERE value.x IS NOT NULL
+    """
+    return sql, (*params, path, path, NUMERIC_RE.pattern)
+
+
+def get_rating_stats(
+        queryset: QuerySet,
+        path: List[str],
+        percentiles: List[float]) -> Dict[str, Dict[str, Any]]:
+    """
+    Return count, mean, min, max, standard deviation and `percentiles`
+    (0-100) of every numeric rating in the object at `path` of the surveys
+    in `queryset`, keyed by question.
+
+    Ratings under `rating_items` are read from the extracted SurveyRating
+    table; any other path is read from the survey JSON.
+    """
+    if path == [RATING_ITEMS_KEY]:
+        source_sql, source_params = _extracted_ratings_sql(queryset)
+    else:
+        source_sql, source_params = _json_ratings_sql(queryset, path)
+
+    sql = f"""
+        SELECT ratings.question,
+               count(*),
+               avg(ratings.x),
+               min(ratings.x),
+               max(ratings.x),
+               stddev_samp(ratings.x),
+               percentile_cont(%s::float[])
+                   WITHIN GROUP (ORDER BY ratings.x)
+        FROM ({source_sql}) AS ratings
+        GROUP BY ratings.question
+        ORDER BY length(ratings.question), ratings.question
+    """
+    params = ([p / 100 for p in percentiles], *source_params)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return {
+        key: {
+            'count': count,
+            'mean': mean,
+            'min': minimum,
+            'max': maximum,
+            'stddev': stddev,
+            'percentiles': {
+                f'p{p:g}': value for p, value in zip(percentiles, values)
+            },
+        }
+        for key, count, mean, minimum, maximum, stddev, values in rows
+    }
@@ -0,0 +1,93 @@
+"""
+JSON schemas of the satisfaction survey, keyed by survey version.
+
+Each schema is compiled into a validator once per process, on import.
+Versions without a registered schema are stored without validation.
+"""
+from typing import List, Optional
+
+from jsonschema import Draft202012Validator
+from jsonschema.protocols import Validator
+
+from core.models import RATING_ITEMS_KEY
+
+
+RATING = {'type': 'integer', 'minimum': 1, 'maximum': 5}
+
+# Questions of the System Usability Scale (SUS) questionnaire
+SUS_QUESTIONS = [f'q{i}' for i in range(1, 11)]
+
+SURVEY_SCHEMAS = {
+    '1.0': {
+        '$schema': 'https://json-schema.org/draft/2020-12/schema',
+        'type': 'object',
+        'properties': {
+            RATING_ITEMS_KEY: {
+                'type': 'object',
+                'additionalProperties': RATING,
+            },
+            'comments': {'type': 'string'},
+        },
+    },
+    'sus-1.0': {
+        '$schema': 'https://json-schema.org/draft/2020-12/schema',
+        'type': 'object',
+        'required': [RATING_ITEMS_KEY],
+        'properties': {
+            RATING_ITEMS_KEY: {
+                'type': 'object',
+                'properties': {
+                    question: RATING for question in SUS_QUESTIONS
+                },
+                'required': SUS_QUESTIONS,
+                'additionalProperties': False,
+            },
+            'meta': {
+                'type': 'object',
+                'properties': {
+                    'feature': {'type': 'string'},
+                    'locale': {'type': 'string'},
+                    'session_id': {'type': ['string', 'null']},
+                    'user_type': {'type': 'string'},
+                },
+            },
+            'comments': {'type': ['string', 'null']},
+        },
+    },
+}
+
+
+def _compile(schema: dict) -> Validator:
+    Draft202012Validator.check_schema(schema)
+    return Draft202012Validator(schema)
+
+
+# Built when the module is imported, so an invalid schema fails at startup
+# and requests only look their validator up
+VALIDATORS = {
+    version: _compile(schema) for version, schema in SURVEY_SCHEMAS.items()
+}
+
+
+def get_validator(version: str) -> Optional[Validator]:
+    """
+    Return the compiled validator of a survey version, or None.
+    """
+    return VALIDATORS.get(version)
+
+
+def survey_errors(version: str, survey) -> List[str]:
+    """
+    Return the schema violations of `survey` for its `version`.
+    """
+    validator = get_validator(version)
+    if validator is None:
+        return []
+
+    return [
+        f'{error.json_path}: {error.message}'
+        for error in sorted(
+            validator.iter_errors(survey),
+            key=lambda error: error.json_path
+        )
+    ]
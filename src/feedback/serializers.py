@@ -4,7 +4,10 @@ Serializers for the Feedback app.
 
 from rest_framework import serializers
 
+from analytics.serializers import DateOrDateTimeField
+from core.fastpath import ValuesSerializer, format_datetime
 from core.models import SatisfactionSurveyResponse
+from feedback.schemas import survey_errors
 
 
 class SatisfactionSurveyResponseSerializer(serializers.ModelSerializer):
@@ -19,3 +22,99 @@ class SatisfactionSurveyResponseSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'survey': {'required': True}
         }
+
+    def validate(self, attrs):
+        errors = survey_errors(attrs['version'], attrs['survey'])
+        if errors:
+            raise serializers.ValidationError({'survey': errors})
+        return attrs
+
+
+class StaffSurveyResponseSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the staff listing of SatisfactionSurveyResponse.
+    """
+
+    class Meta:
+        model = SatisfactionSurveyResponse
+        fields = ('id', 'user', 'version', 'survey', 'completed_at')
+        read_only_fields = fields
+
+
+class StaffSurveyResponseValuesSerializer(ValuesSerializer):
+    """
+    Read-only fast path equivalent of `StaffSurveyResponseSerializer`.
+    """
+    lookups = ('id', 'user_id', 'version', 'survey', 'completed_at')
+
+    def to_representation(self, row):
+        return {
+            'id': row[0],
+            'user': row[1],
+            'version': row[2],
+            'survey': row[3],
+            'completed_at': format_datetime(row[4]),
+        }
+
+
+class SurveyResponseFilterSerializer(serializers.Serializer):
+    """
+    Serializer for the survey response filter query parameters.
+    """
+    start = DateOrDateTimeField(
+        required=False,
+        help_text='Start of the range, inclusive.'
+    )
+    end = DateOrDateTimeField(
+        required=False,
+        help_text='End of the range, exclusive.'
+    )
+    version = serializers.CharField(
+        required=False,
+        help_text='Survey version (exact match).'
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # `from` and `to` are reserved words in Python, see
+        # analytics.serializers.MetricsQuerySerializer.
+        self.fields['from'] = self.fields.pop('start')
+        self.fields['to'] = self.fields.pop('end')
+
+    def validate(self, attrs):
+        start, end = attrs.get('start'), attrs.get('end')
+        if start and end and start >= end:
+            raise serializers.ValidationError(
+                {'from': '`from` must be before `to`.'}
+            )
+        return attrs
+
+
+class RatingStatsQuerySerializer(SurveyResponseFilterSerializer):
+    """
+    Serializer for the rating statistics query parameters.
+    """
+    path = serializers.CharField(
+        default='rating_items',
+        allow_blank=True,
+        help_text='Dotted path of the object holding the ratings; empty '
+                  'for the top level of the survey.'
+    )
+    percentiles = serializers.CharField(
+        default='25,50,75,90',
+        help_text='Comma separated percentiles between 0 and 100.'
+    )
+
+    def validate_path(self, value):
+        return [key for key in value.split('.') if key]
+
+    def validate_percentiles(self, value):
+        try:
+            percentiles = [float(p) for p in value.split(',') if p.strip()]
+        except ValueError:
+            raise serializers.ValidationError('Percentiles must be numbers.')
+        if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+            raise serializers.ValidationError(
+                'Percentiles must be between 0 and 100.'
+            )
+        return percentiles
@@ -2,6 +2,9 @@
 Test the feedback API.
 """
 
+import json
+from datetime import datetime, timezone as dt_timezone
+
 from django.test import TestCase
 from django.urls import reverse
 from django.contrib.auth import get_user_model
@@ -10,9 +13,12 @@ from rest_framework import status
 from rest_framework.test import APIClient
 
 from core.models import SatisfactionSurveyResponse
+from core.tests.utils import QueryBudgetMixin
 
 
 FEEDBACK_URL = reverse('feedback:feedback-list')
+RATINGS_URL = reverse('feedback:feedback-staff-ratings')
+STAFF_FEEDBACK_URL = reverse('feedback:feedback-staff-list')
 
 
 def create_user(**params):
@@ -57,7 +63,7 @@ class PublicFeedbackApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class FeedbackApiTests(TestCase):
+class FeedbackApiTests(QueryBudgetMixin, TestCase):
     """
     Test the feedback API (Authenticated).
     """
@@ -132,3 +138,287 @@ class FeedbackApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(len(res.data), len(feedback))
         self.assertEqual(res.data[0]['survey'], feedback[0].survey)
+
+    def test_get_past_feedback_query_count(self):
+        """
+        Test listing feedback runs one query regardless of row count.
+        """
+        self.assertConstantQueries(
+            lambda i: SatisfactionSurveyResponse.objects.create(
+                user=self.user,
+                version='1.0',
+                survey={'q1': i}
+            ),
+            lambda: self.client.get(FEEDBACK_URL),
+            budget=1,
+        )
+
+
+class SurveySchemaTests(TestCase):
+    """
+    Test survey validation and rating extraction.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='test@example.com')
+        self.client.force_authenticate(user=self.user)
+
+    def test_invalid_survey_rejected(self):
+        """
+        Test surveys violating their version schema are rejected.
+        """
+        payload = {
+            'version': '1.0',
+            'survey': {'rating_items': {'q1': 9}, 'comments': 1},
+        }
+
+        res = self.client.post(FEEDBACK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['survey']), 2)
+        self.assertFalse(SatisfactionSurveyResponse.objects.exists())
+
+    def test_sus_survey_validated(self):
+        """
+        Test SUS surveys need an integer rating for each of the ten
+        questions.
+        """
+        ratings = {f'q{i}': 3 for i in range(1, 11)}
+        survey = {
+            'rating_items': ratings,
+            'meta': {
+                'feature': 'chat',
+                'locale': 'es-419',
+                'session_id': None,
+                'user_type': 'unknown',
+            },
+            'comments': '',
+        }
+
+        res = self.client.post(
+            FEEDBACK_URL,
+            {'version': 'sus-1.0', 'survey': survey},
+            format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+        survey['rating_items'] = {**ratings, 'q1': 6}
+        del survey['rating_items']['q10']
+        res = self.client.post(
+            FEEDBACK_URL,
+            {'version': 'sus-1.0', 'survey': survey},
+            format='json'
+        )
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(len(res.data['survey']), 2)
+        self.assertEqual(SatisfactionSurveyResponse.objects.count(), 1)
+
+    def test_unknown_version_not_validated(self):
+        """
+        Test versions without a schema are stored as they are.
+        """
+        payload = {'version': 'beta', 'survey': {'rating_items': 'none'}}
+
+        res = self.client.post(FEEDBACK_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_validators_are_cached(self):
+        """
+        Test each version schema is compiled once.
+        """
+        from feedback.schemas import get_validator
+
+        self.assertIs(get_validator('1.0'), get_validator('1.0'))
+        self.assertIsNone(get_validator('unknown'))
+
+    def test_ratings_extracted(self):
+        """
+        Test numeric ratings are stored in the rating table and kept in
+        sync with the survey.
+        """
+        payload = {
+            'version': '1.0',
+            'survey': {'rating_items': {'q1': 4, 'q2': 5}, 'comments': ''},
+        }
+
+        self.client.post(FEEDBACK_URL, payload, format='json')
+
+        response = SatisfactionSurveyResponse.objects.get()
+        self.assertEqual(
+            dict(response.ratings.values_list('question', 'value')),
+            {'q1': 4.0, 'q2': 5.0}
+        )
+
+        response.survey = {'rating_items': {'q1': '3', 'q3': 'n/a'}}
+        response.save()
+
+        self.assertEqual(
+            dict(response.ratings.values_list('question', 'value')),
+            {'q1': 3.0}
+        )
+
+
+class StaffRatingStatsApiTests(TestCase):
+    """
+    Test the staff rating statistics API.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = create_user(email='user@example.com')
+        self.staff = create_user(email='staff@example.com', is_staff=True)
+        self.client.force_authenticate(user=self.staff)
+
+        for ratings, version, day in (
+            ({'q1': 1, 'q2': 5}, '1.0', 1),
+            ({'q1': 2, 'q2': '4'}, '1.0', 2),
+            ({'q1': 4, 'q2': 'n/a'}, '1.0', 3),
+            ({'q1': 5}, '2.0', 3),
+            ({'q1': 5}, '1.0', 20),
+        ):
+            response = SatisfactionSurveyResponse.objects.create(
+                user=self.user,
+                version=version,
+                survey={'rating_items': ratings, 'comments': 'Ok'}
+            )
+            SatisfactionSurveyResponse.objects.filter(
+                pk=response.pk
+            ).update(
+                completed_at=datetime(2026, 1, day, tzinfo=dt_timezone.utc)
+            )
+
+    def test_staff_required(self):
+        """
+        Test regular users cannot read the statistics.
+        """
+        self.client.force_authenticate(user=self.user)
+
+        res = self.client.get(RATINGS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_rating_stats(self):
+        """
+        Test the statistics per question over a range and version.
+        """
+        res = self.client.get(RATINGS_URL, {
+            'from': '2026-01-01',
+            'to': '2026-01-10',
+            'version': '1.0',
+            'percentiles': '50',
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['responses'], 3)
+        self.assertEqual(list(res.data['questions']), ['q1', 'q2'])
+        q1 = res.data['questions']['q1']
+        self.assertEqual(q1['count'], 3)
+        self.assertAlmostEqual(q1['mean'], 7 / 3)
+        self.assertEqual((q1['min'], q1['max']), (1, 4))
+        self.assertAlmostEqual(q1['stddev'], 1.527525, places=5)
+        self.assertEqual(q1['percentiles'], {'p50': 2})
+        q2 = res.data['questions']['q2']
+        self.assertEqual(q2['count'], 2)
+        self.assertEqual(q2['mean'], 4.5)
+
+    def test_rating_stats_from_survey_path(self):
+        """
+        Test ratings outside `rating_items` are read from the JSON.
+        """
+        SatisfactionSurveyResponse.objects.create(
+            user=self.user,
+            version='1.0',
+            survey={'extra': {'q1': 2}}
+        )
+
+        res = self.client.get(RATINGS_URL, {'path': 'extra'})
+
+        self.assertEqual(res.data['questions']['q1']['count'], 1)
+
+    def test_invalid_percentiles(self):
+        """
+        Test percentiles outside 0-100 are rejected.
+        """
+        res = self.client.get(RATINGS_URL, {'percentiles': '50,101'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StaffFeedbackListApiTests(TestCase):
+    """
+    Test the staff survey response listing.
+    """
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = create_user(email='staff@example.com', is_staff=True)
+        self.client.force_authenticate(user=self.staff)
+
+        self.responses = []
+        for i, day in enumerate((3, 1, 2)):
+            user = create_user(email=f'user{i}@example.com')
+            response = SatisfactionSurveyResponse.objects.create(
+                user=user,
+                version='1.0' if i else '2.0',
+                survey={'q1': i}
+            )
+            SatisfactionSurveyResponse.objects.filter(
+                pk=response.pk
+            ).update(
+                completed_at=datetime(2026, 1, day, tzinfo=dt_timezone.utc)
+            )
+            self.responses.append(response)
+
+    def test_staff_required(self):
+        """
+        Test regular users cannot list every response.
+        """
+        self.client.force_authenticate(
+            user=create_user(email='other@example.com')
+        )
+
+        res = self.client.get(STAFF_FEEDBACK_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_cursor_pagination(self):
+        """
+        Test responses of every user are paged oldest first.
+        """
+        res = self.client.get(STAFF_FEEDBACK_URL, {'page_size': 2})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [row['survey']['q1'] for row in res.data['results']],
+            [1, 2]
+        )
+        self.assertIsNotNone(res.data['next'])
+
+        res = self.client.get(res.data['next'])
+
+        self.assertEqual(
+            [row['survey']['q1'] for row in res.data['results']],
+            [0]
+        )
+        self.assertIsNone(res.data['next'])
+
+    def test_ndjson_stream(self):
+        """
+        Test every matching response is streamed as one JSON line.
+        """
+        res = self.client.get(
+            STAFF_FEEDBACK_URL,
+            {'format': 'ndjson', 'version': '1.0'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.streaming)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(res.streaming_content).decode().splitlines()
+        rows = [json.loads(line) for line in lines]
+        self.assertEqual([row['survey']['q1'] for row in rows], [1, 2])
+        self.assertEqual(rows[0]['id'], self.responses[1].pk)
+        self.assertEqual(rows[0]['user'], self.responses[1].user_id)
+        self.assertEqual(rows[0]['completed_at'], '2026-01-01T00:00:00Z')
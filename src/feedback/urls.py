@@ -11,6 +11,12 @@ from feedback import views
 
 router = DefaultRouter()
 
+router.register(
+    'staff',
+    views.StaffSurveyResponseViewSet,
+    basename='feedback-staff'
+)
+
 router.register(
     '',
     views.SatisfactionSurveyResponseViewSet,
@@ -2,13 +2,32 @@
 Views for the feedback app.
 """
 
+from django.http import StreamingHttpResponse
+
+from drf_spectacular.types import OpenApiTypes
+from drf_spectacular.utils import extend_schema
+
 from rest_framework import viewsets, mixins
-from rest_framework import authentication, permissions
+from rest_framework import permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
 
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from core.models import SatisfactionSurveyResponse
+from core.renderers import NDJSONRenderer
 
+from feedback.pagination import SurveyResponseCursorPagination
+from feedback.queries import get_rating_stats
 from feedback.serializers import (
+    RatingStatsQuerySerializer,
     SatisfactionSurveyResponseSerializer,
+    StaffSurveyResponseSerializer,
+    StaffSurveyResponseValuesSerializer,
+    SurveyResponseFilterSerializer,
 )
 
 
@@ -21,7 +40,10 @@ class SatisfactionSurveyResponseViewSet(
     Viewset for SatisfactionSurveyResponse model.
     """
     serializer_class = SatisfactionSurveyResponseSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
     queryset = SatisfactionSurveyResponse.objects.all()
 
@@ -36,3 +58,101 @@ class SatisfactionSurveyResponseViewSet(
         Save the satisfaction survey response with the current user.
         """
         serializer.save(user=self.request.user)
+
+
+class StaffSurveyResponseViewSet(viewsets.GenericViewSet):
+    """
+    Viewset for staff access to every survey response.
+    """
+    serializer_class = StaffSurveyResponseSerializer
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
+    permission_classes = [permissions.IsAdminUser]
+    renderer_classes = [
+        *api_settings.DEFAULT_RENDERER_CLASSES,
+        NDJSONRenderer,
+    ]
+    pagination_class = SurveyResponseCursorPagination
+    queryset = SatisfactionSurveyResponse.objects.all()
+
+    def get_filtered_queryset(self, query):
+        """
+        Return the responses matching the validated filter `query`.
+        """
+        queryset = self.get_queryset()
+        if query.get('start'):
+            queryset = queryset.filter(completed_at__gte=query['start'])
+        if query.get('end'):
+            queryset = queryset.filter(completed_at__lt=query['end'])
+        if query.get('version'):
+            queryset = queryset.filter(version=query['version'])
+        return queryset
+
+    @extend_schema(parameters=[SurveyResponseFilterSerializer])
+    def list(self, request):
+        """
+        List every survey response, oldest first, a cursor page at a time.
+
+        With `?format=ndjson` (or `Accept: application/x-ndjson`) every
+        matching response is streamed instead, one JSON object per line,
+        straight from a server-side cursor.
+
+        Query parameters:
+        - from: start of the range, inclusive
+        - to: end of the range, exclusive
+        - version: survey version
+        - cursor, page_size: pagination (JSON only)
+        """
+        serializer = SurveyResponseFilterSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        queryset = self.get_filtered_queryset(serializer.validated_data)
+
+        renderer = request.accepted_renderer
+        if isinstance(renderer, NDJSONRenderer):
+            rows = StaffSurveyResponseValuesSerializer(
+                queryset.order_by(*self.pagination_class.ordering)
+            ).iterator()
+            return StreamingHttpResponse(
+                renderer.stream(rows),
+                content_type=renderer.media_type
+            )
+
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @extend_schema(
+        parameters=[RatingStatsQuerySerializer],
+        responses=OpenApiTypes.OBJECT,
+    )
+    @action(detail=False, methods=['get'])
+    def ratings(self, request):
+        """
+        Return count, mean, min, max, standard deviation and percentiles
+        of every numeric rating question, computed in the database.
+
+        Query parameters:
+        - from: start of the range, inclusive
+        - to: end of the range, exclusive
+        - version: survey version
+        - path: dotted path of the ratings object (default: rating_items)
+        - percentiles: comma separated, 0-100 (default: 25,50,75,90)
+        """
+        serializer = RatingStatsQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        query = serializer.validated_data
+        queryset = self.get_filtered_queryset(query)
+
+        return Response({
+            'from': query.get('start'),
+            'to': query.get('end'),
+            'version': query.get('version'),
+            'responses': queryset.count(),
+            'questions': get_rating_stats(
+                queryset,
+                query['path'],
+                query['percentiles'],
+            ),
+        })
@@ -48,10 +48,10 @@ def create_document(**params):
         'id': '1',
         'title': 'Test document',
         'repository_uri': 'https://example.com',
-        'repository_id': 'repo_1',
         'status': 'L',
     }
     defaults.update(params)
+    defaults.setdefault('repository_id', f"repo_{defaults['id']}")
     document = Document.objects.create(**defaults)
     return document
 
@@ -3,11 +3,15 @@ Views for the recommender API.
 """
 
 from rest_framework import viewsets, generics
-from rest_framework import authentication, permissions
+from rest_framework import permissions
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework import status
 
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+)
 from core.models import UserProfile, Document
 from core.services.ragflow_service import RAGFlowService
 
@@ -59,7 +63,10 @@ class CreateUserProfileView(generics.CreateAPIView):
     """
     View for creating user profiles.
     """
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = serializers.UserProfileSerializer
 
@@ -83,7 +90,10 @@ class ManageUserProfileView(generics.RetrieveUpdateAPIView):
     """
     View for managing user profiles.
     """
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = serializers.UserProfileSerializer
 
@@ -103,7 +113,10 @@ class DocumentRecommendationViewSet(viewsets.GenericViewSet):
     ViewSet for document recommendations.
     Returns recommended documents based on user profile.
     """
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = serializers.RecommendationSerializer
 
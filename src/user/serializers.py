@@ -9,6 +9,8 @@ from django.contrib.auth import (
 
 from rest_framework import serializers
 
+from core.authentication import get_refresh_token_user
+
 
 class UserSerializer(serializers.ModelSerializer):
     """
@@ -123,3 +125,23 @@ class AnonymousAuthTokenSerializer(serializers.Serializer):
 
         attrs['user'] = user
         return attrs
+
+
+class RefreshTokenSerializer(serializers.Serializer):
+    """
+    Serializer for refreshing a signed access token.
+    """
+    refresh = serializers.CharField(trim_whitespace=False)
+
+    def validate(self, attrs):
+        """
+        Validate the refresh token and load its user.
+        """
+        user = get_refresh_token_user(attrs.get('refresh'))
+
+        if not user:
+            msg = 'Invalid or expired refresh token.'
+            raise serializers.ValidationError(msg, code='authorization')
+
+        attrs['user'] = user
+        return attrs
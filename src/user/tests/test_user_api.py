@@ -12,6 +12,7 @@ from rest_framework import status
 from user.serializers import UserSerializer
 
 from core.models import FieldOfStudy
+from core.tests.utils import QueryBudgetMixin
 
 
 CREATE_USER_URL = reverse('user:create')
@@ -29,7 +30,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicUserApiTests(TestCase):
+class PublicUserApiTests(QueryBudgetMixin, TestCase):
     """
     Test the public features of the user API (unauthenticated).
     """
@@ -186,6 +187,22 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(res.data, serializer.data)
 
+    def test_list_all_users_query_count(self):
+        """
+        Test listing users runs one query regardless of row count.
+        """
+        field = FieldOfStudy.objects.create(name='Field', description='')
+
+        self.assertConstantQueries(
+            lambda i: create_user(
+                email=f'user{i}@example.com',
+                password='password1234',
+                field_of_study=field,
+            ),
+            lambda: self.client.get(LIST_URL),
+            budget=1,
+        )
+
 
 class PublicAnonymousUserApiTests(TestCase):
     """
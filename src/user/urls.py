@@ -22,6 +22,21 @@ urlpatterns = [
         views.CreateAnonymousTokenView.as_view(),
         name='token-anonymous'
     ),
+    path(
+        'token/signed/',
+        views.CreateSignedTokenView.as_view(),
+        name='token-signed'
+    ),
+    path(
+        'token-anonymous/signed/',
+        views.CreateAnonymousSignedTokenView.as_view(),
+        name='token-anonymous-signed'
+    ),
+    path(
+        'token/refresh/',
+        views.RefreshSignedTokenView.as_view(),
+        name='token-refresh'
+    ),
     path('me/', views.ManageUserView.as_view(), name='me'),
     path('list/', views.ListUsersView.as_view(), name='list')
 ]
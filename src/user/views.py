@@ -2,16 +2,24 @@
 Views for the user API.
 """
 
-from rest_framework import generics, authentication, permissions
+from rest_framework import generics, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 from django.contrib.auth import get_user_model
 
+from core.authentication import (
+    CachedTokenAuthentication,
+    SignedTokenAuthentication,
+    create_token_pair,
+)
+
 from user.serializers import (
     UserSerializer,
     AnonymousUserSerializer,
     AuthTokenSerializer,
-    AnonymousAuthTokenSerializer
+    AnonymousAuthTokenSerializer,
+    RefreshTokenSerializer,
 )
 
 
@@ -45,18 +53,52 @@ class CreateAnonymousTokenView(ObtainAuthToken):
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
 
 
+class CreateSignedTokenView(ObtainAuthToken):
+    """
+    Create a signed access and refresh token pair for the user.
+    """
+    serializer_class = AuthTokenSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response(create_token_pair(serializer.validated_data['user']))
+
+
+class CreateAnonymousSignedTokenView(CreateSignedTokenView):
+    """
+    Create a signed access and refresh token pair for the anonymous user.
+    """
+    serializer_class = AnonymousAuthTokenSerializer
+
+
+class RefreshSignedTokenView(CreateSignedTokenView):
+    """
+    Exchange a refresh token for a new signed token pair.
+    """
+    serializer_class = RefreshTokenSerializer
+
+
 class ManageUserView(generics.RetrieveUpdateAPIView):
     """
     Manage the authenticated user.
     """
     serializer_class = UserSerializer
-    authentication_classes = [authentication.TokenAuthentication]
+    authentication_classes = [
+        CachedTokenAuthentication,
+        SignedTokenAuthentication,
+    ]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         """
         Retrieve and return the authenticated user.
         """
+        authenticator = self.request.successful_authenticator
+        if isinstance(authenticator, SignedTokenAuthentication):
+            # Signed tokens only carry claims; load the full user row.
+            return get_user_model().objects.get(pk=self.request.user.pk)
         return self.request.user
 
     def get_serializer_class(self):
@@ -70,4 +112,14 @@ class ListUsersView(generics.ListAPIView):
     List all registered users
     """
     serializer_class = UserSerializer
-    queryset = get_user_model().objects.filter(is_anonymous=False)
+    queryset = get_user_model().objects.filter(is_anonymous=False).only(
+        'id',
+        'email',
+        'name',
+        'first_name',
+        'last_name',
+        'education_level',
+        'field_of_study',
+        'is_staff',
+        'is_author',
+    ).order_by('id')